@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Concurrent typing sessions on one event loop.
+
+Starts N ``cat`` processes on their own pseudo terminals and types the same
+paced text into each, first one session at a time and then all at once,
+and reports the wall time and the scheduler lateness of each run.
+
+Usage:
+    python benchmarks/bench_async.py [--sessions 50] [--chars 100] [--speed 0.01]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from type_simulator.text_typer.async_engine import (  # noqa: E402
+    AsyncTypist,
+    run_sessions,
+)
+from type_simulator.text_typer.parser import CommandParser  # noqa: E402
+from type_simulator.text_typer.pty_backend import PtyBackend  # noqa: E402
+
+
+async def run(n: int, limit, toks, speed: float):
+    backends = [PtyBackend(["cat"]) for _ in range(n)]
+    typists = [AsyncTypist(b, speed, 0) for b in backends]
+    try:
+        start = time.perf_counter()
+        await run_sessions([(t, toks) for t in typists], limit=limit)
+        elapsed = time.perf_counter() - start
+    finally:
+        for b in backends:
+            b.close()
+    stats = [t.scheduler.stats() for t in typists]
+    mean = sum(s.mean_lateness for s in stats) / n
+    worst = max(s.max_lateness for s in stats)
+    return elapsed, mean, worst
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sessions", type=int, default=50)
+    ap.add_argument("--chars", type=int, default=100)
+    ap.add_argument("--speed", type=float, default=0.01)
+    args = ap.parse_args()
+
+    line = ("lorem ipsum " * (args.chars // 12 + 1))[: args.chars - 1]
+    toks = CommandParser().parse(line + "\n")
+    for label, limit in (("sequential", 1), ("concurrent", None)):
+        elapsed, mean, worst = asyncio.run(
+            run(args.sessions, limit, toks, args.speed)
+        )
+        print(
+            f"{label:<11} {args.sessions} sessions: {elapsed:6.2f}s, "
+            f"lateness mean {mean * 1e3:.2f}ms max {worst * 1e3:.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Selection copy benchmark: xclip/xsel subprocesses vs the in-process owner.
+
+Sets the PRIMARY selection N times with short code-like strings, once by
+spawning xclip/xsel per copy (what TextToken used to do per character) and
+once through XSelectionClipboard, then reads the value back with a fresh
+connection to check it is actually served.  Needs a running X server
+(e.g. ``Xvfb :99 & DISPLAY=:99 python benchmarks/bench_clipboard.py``).
+
+Usage:
+    python benchmarks/bench_clipboard.py [--copies 500]
+"""
+
+import argparse
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from type_simulator.text_typer.clipboard import XSelectionClipboard  # noqa: E402
+
+TOOLS = {
+    "xclip": ["xclip", "-selection", "primary"],
+    "xsel": ["xsel", "--primary", "--input"],
+}
+
+
+def subprocess_copy(args):
+    def copy(text: str) -> None:
+        proc = subprocess.Popen(args, stdin=subprocess.PIPE)
+        proc.communicate(text.encode())
+
+    return copy
+
+
+def timed(copy, copies: int) -> float:
+    start = time.perf_counter()
+    for i in range(copies):
+        copy(f"f(a[{i}]);")
+    return (time.perf_counter() - start) / copies
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--copies", type=int, default=500)
+    args = ap.parse_args()
+
+    print(f"{'strategy':>14} {'us/copy':>10}")
+    for name, cmd in TOOLS.items():
+        if shutil.which(name):
+            per = timed(subprocess_copy(cmd), args.copies)
+            print(f"{name:>14} {per * 1e6:>10.1f}")
+        else:
+            print(f"{name:>14} {'not installed':>10}")
+    try:
+        owner = XSelectionClipboard(("PRIMARY",))
+    except Exception as e:
+        print(f"{'in-process':>14} unavailable ({e})")
+        return
+    per = timed(owner.copy, args.copies)
+    print(f"{'in-process':>14} {per * 1e6:>10.1f}")
+    reader = XSelectionClipboard(("PRIMARY",))
+    print("read back:", reader.paste())
+    reader.close()
+    owner.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Parser throughput benchmark.
+
+Builds either a spec-heavy corpus (short literal runs separated by waits,
+key combos, mouse actions, random/variable/speed macros and invalid specs)
+or a prose corpus (paragraphs of plain text with an occasional macro) and
+reports how many megabytes per second CommandParser.parse gets through,
+both end to end and for the spec-decoding stage on its own.
+
+Usage:
+    python benchmarks/bench_parser.py [--corpus specs|prose] [--size-mb 4]
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from type_simulator.text_typer.parser import CommandParser  # noqa: E402
+
+SPEC_SNIPPETS = [
+    "ab{WAIT_0.1}",
+    "c{<ctrl>+<shift>+t}",
+    "{MOUSE_MOVE_10_20}d",
+    "{MOUSE_CLICK_left}",
+    "e{RANDOM_8_alpha}",
+    "{SET_user=admin}f",
+    "{GET_user}",
+    "{SPEED_0.05_0.01}g",
+    "{<enter>}",
+    "{ <alt> + x }",
+    "{NOT_A_SPEC}",
+]
+
+
+PROSE_PARAGRAPH = (
+    "The quick brown fox jumps over the lazy dog while the editor scrolls "
+    "past another line of carefully typed demo text. Typing simulators spend "
+    "most of their input on ordinary sentences like this one, with commas, "
+    "full stops and the odd number such as 42 or 3.14 sprinkled in.\n"
+)
+
+
+def build_corpus(size_bytes: int) -> str:
+    block = "".join(SPEC_SNIPPETS)
+    return block * max(1, size_bytes // len(block))
+
+
+def build_prose(size_bytes: int) -> str:
+    # One macro every ~20 paragraphs, as in a typical demo script
+    block = PROSE_PARAGRAPH * 20 + "{WAIT_0.5}{<enter>}"
+    return block * max(1, size_bytes // len(block))
+
+
+def best_of(rounds: int, fn) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure_parse(corpus: str, rounds: int) -> float:
+    parser = CommandParser()
+    return best_of(rounds, lambda: parser.parse(corpus))
+
+
+def measure_specs(specs: list, rounds: int) -> float:
+    parse_spec = CommandParser()._parse_spec
+
+    def run() -> None:
+        for spec in specs:
+            parse_spec(spec)
+
+    return best_of(rounds, run)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--corpus", choices=["specs", "prose"], default="specs")
+    ap.add_argument("--size-mb", type=float, default=4.0)
+    ap.add_argument("--rounds", type=int, default=3)
+    args = ap.parse_args()
+
+    build = build_prose if args.corpus == "prose" else build_corpus
+    corpus = build(int(args.size_mb * 1024 * 1024))
+    mb = len(corpus.encode("utf-8")) / (1024 * 1024)
+    specs = re.findall(r"\{([^}]*)\}", corpus)
+    spec_mb = sum(len(s) + 2 for s in specs) / (1024 * 1024)
+
+    parse_secs = measure_parse(corpus, args.rounds)
+    spec_secs = measure_specs(specs, args.rounds)
+
+    print(f"corpus:       {mb:.2f} MB, {len(specs)} specs")
+    print(f"parse:        {mb / parse_secs:.2f} MB/s ({parse_secs:.3f}s)")
+    print(
+        f"spec decode:  {spec_mb / spec_secs:.2f} MB/s, "
+        f"{len(specs) / spec_secs:,.0f} specs/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Special-character paste benchmark for TextToken.
+
+Types code-like text full of ``{}()[];:`` characters against a no-op
+backend.  The selection copy is replaced by a real ``cat`` subprocess per
+call, which costs about as much as spawning xclip/xsel, and the script
+reports characters per second with one paste per character
+(``paste_run_limit = 1``) and with coalesced runs.
+
+Usage:
+    python benchmarks/bench_paste.py [--repeat 20] [--limit 64]
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from type_simulator.text_typer import token as token_mod  # noqa: E402
+
+SAMPLE = """\
+int sum(const struct item *items, size_t n) {
+    int total = 0;
+    for (size_t i = 0; i < n; i++) {
+        if (items[i].value != NULL) { total += f(items[i].value); }
+    }
+    return total;
+}
+def load(path: str) -> dict:
+    with open(path) as fh:
+        return {k: v for k, v in json.load(fh).items() if v}
+"""
+
+
+class NullBackend:
+    def write(self, message, interval=0.0):
+        pass
+
+    def hotkey(self, *keys):
+        pass
+
+    def press(self, key):
+        pass
+
+
+class Executor:
+    def __init__(self, limit: int) -> None:
+        self.backend = NullBackend()
+        self.typing_speed = 0.0
+        self.typing_variance = 0.0
+        self.clipboard = None
+        self.pynput = None
+        self.paste_run_limit = limit
+        self.copies = 0
+
+
+def spawn_copy(executor: Executor):
+    def copy(text: str) -> bool:
+        executor.copies += 1
+        proc = subprocess.Popen(
+            ["cat"], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL
+        )
+        proc.communicate(text.encode())
+        return proc.returncode == 0
+
+    return copy
+
+
+def run(text: str, limit: int):
+    executor = Executor(limit)
+    token_mod._copy_to_primary_x11 = spawn_copy(executor)
+    start = time.perf_counter()
+    token_mod.TextToken(text).execute(executor)
+    return len(text) / (time.perf_counter() - start), executor.copies
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--limit", type=int, default=token_mod.PASTE_RUN_LIMIT)
+    args = ap.parse_args()
+
+    text = SAMPLE * args.repeat
+    print(f"{'mode':>12} {'chars/s':>10} {'copies':>8}")
+    for name, limit in (("per char", 1), (f"runs <= {args.limit}", args.limit)):
+        rate, copies = run(text, limit)
+        print(f"{name:>12} {rate:>10.0f} {copies:>8}")
+
+
+if __name__ == "__main__":
+    main()
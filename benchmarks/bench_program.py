@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Token list vs. compiled Program memory benchmark.
+
+Parses a spec-heavy corpus, then measures (with tracemalloc) the heap held
+by the token tree and by the equivalent compiled Program, along with the
+serialised size and how long pickling and loading each form takes.
+
+Usage:
+    python benchmarks/bench_program.py [--size-mb 4]
+"""
+
+import argparse
+import gc
+import pickle
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from type_simulator.text_typer.parser import CommandParser  # noqa: E402
+from type_simulator.text_typer.program import Program  # noqa: E402
+
+SNIPPET = (
+    "ab{WAIT_0.1}c{<ctrl>+<shift>+t}{MOUSE_MOVE_10_20}d{MOUSE_CLICK_left}"
+    "e{RANDOM_8_alpha}{SET_user=admin}f{GET_user}{SPEED_0.05_0.01}g{<enter>}"
+    "{REPEAT_3}x{<tab>}{/REPEAT}"
+)
+
+
+def traced(build):
+    """Return (result, bytes still allocated by *build*)."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--size-mb", type=float, default=4.0)
+    args = ap.parse_args()
+
+    corpus = SNIPPET * max(1, int(args.size_mb * 1024 * 1024) // len(SNIPPET))
+    tokens = CommandParser().parse(corpus)
+    program = Program.compile(tokens)
+    n = len(program)
+
+    # Measure each form rebuilt from its serialised bytes so that only the
+    # representation itself is counted
+    token_bytes = pickle.dumps(tokens, protocol=pickle.HIGHEST_PROTOCOL)
+    program_bytes = program.to_bytes()
+    del tokens, program
+    _, token_heap = traced(lambda: pickle.loads(token_bytes))
+    _, program_heap = traced(lambda: Program.from_bytes(bytearray(program_bytes)))
+
+    print(f"instructions:   {n:,}")
+    print(
+        f"token tree:     {token_heap / n:6.1f} B/instr heap, "
+        f"{len(token_bytes) / 1e6:7.2f} MB pickled, "
+        f"load {timed(lambda: pickle.loads(token_bytes)):.3f}s"
+    )
+    print(
+        f"program:        {program_heap / n:6.1f} B/instr heap, "
+        f"{len(program_bytes) / 1e6:7.2f} MB serialised, "
+        f"load {timed(lambda: Program.from_bytes(program_bytes)):.3f}s"
+    )
+    print(f"heap reduction: x{token_heap / program_heap:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+REPEAT block stress benchmark.
+
+Parses scripts with many sequential and deeply nested {REPEAT_n} blocks at
+two sizes and asserts that the per-block cost stays flat, i.e. that
+CommandParser builds repeat bodies in linear time.
+
+Usage:
+    python benchmarks/bench_repeat.py [--blocks 100000] [--depth 10000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from type_simulator.text_typer.parser import CommandParser  # noqa: E402
+
+# Allowed growth of the per-block cost between the small and the full run.
+# Linear parsing stays close to 1x; the old slicing approach grew ~10x.
+MAX_SLOWDOWN = 3.0
+
+
+def sequential(n: int) -> str:
+    return "intro{WAIT_0.1}" + "{REPEAT_2}ab{<tab>}{/REPEAT}x" * n
+
+
+def nested(depth: int) -> str:
+    return "{REPEAT_2}a" * depth + "core" + "b{/REPEAT}" * depth
+
+
+def best_time(text: str, rounds: int = 3) -> float:
+    parser = CommandParser()
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        parser.parse(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def check(name: str, build, size: int) -> bool:
+    small = size // 10
+    t_small = best_time(build(small))
+    t_full = best_time(build(size))
+    slowdown = (t_full / size) / (t_small / small)
+    ok = slowdown <= MAX_SLOWDOWN
+    print(
+        f"{name:<10} {small:>8} blocks {t_small:7.3f}s | "
+        f"{size:>8} blocks {t_full:7.3f}s | "
+        f"per-block x{slowdown:.2f} {'ok' if ok else 'NOT LINEAR'}"
+    )
+    return ok
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--blocks", type=int, default=100_000)
+    ap.add_argument("--depth", type=int, default=10_000)
+    args = ap.parse_args()
+
+    ok = check("sequential", sequential, args.blocks)
+    ok &= check("nested", nested, args.depth)
+    assert ok, "REPEAT parsing does not scale linearly"
+
+
+if __name__ == "__main__":
+    main()
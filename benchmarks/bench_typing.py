@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Inter-key interval benchmark for TextToken.
+
+Types a block of plain text against a fake backend that behaves like
+pyautogui.write (a fixed pause per call plus the requested interval per
+key) and reports the measured seconds per key next to the requested
+typing speed, for the old one-call-per-character loop and for the batched
+TextToken.
+
+Usage:
+    python benchmarks/bench_typing.py [--chars 300] [--call-overhead 0.01]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from type_simulator.text_typer.token import TextToken, draw_intervals  # noqa: E402
+
+SPEEDS = [0.0, 0.001, 0.005, 0.02]
+
+
+class FakeBackend:
+    """pyautogui-like write(): ``call_overhead`` per call, then per-key sleeps."""
+
+    def __init__(self, call_overhead: float) -> None:
+        self.call_overhead = call_overhead
+        self.keys = 0
+
+    def write(self, message, interval=0.0):
+        for _ in message:
+            self.keys += 1
+            time.sleep(interval)
+        time.sleep(self.call_overhead)  # pyautogui.PAUSE
+
+
+class Executor:
+    def __init__(self, backend, speed: float) -> None:
+        self.backend = backend
+        self.typing_speed = speed
+        self.typing_variance = speed / 3
+        self.clipboard = None
+        self.pynput = None
+
+
+def per_key(text: str, executor: Executor) -> None:
+    """The previous TextToken loop: one backend call per character."""
+    delays = draw_intervals(
+        len(text), executor.typing_speed, executor.typing_variance
+    )
+    for ch, delay in zip(text, delays):
+        executor.backend.write(ch, interval=delay)
+
+
+def batched(text: str, executor: Executor) -> None:
+    TextToken(text).execute(executor)
+
+
+def seconds_per_key(run, text: str, speed: float, overhead: float) -> float:
+    backend = FakeBackend(overhead)
+    start = time.perf_counter()
+    run(text, Executor(backend, speed))
+    return (time.perf_counter() - start) / backend.keys
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--chars", type=int, default=300)
+    ap.add_argument(
+        "--call-overhead",
+        type=float,
+        default=0.01,
+        help="fixed pause per backend call (pyautogui.PAUSE defaults to 0.1)",
+    )
+    args = ap.parse_args()
+
+    words = "the quick brown fox jumps over the lazy dog "
+    text = (words * (args.chars // len(words) + 1))[: args.chars]
+    print(f"{'speed':>8} {'per-key call':>14} {'batched':>10}   (seconds per key)")
+    for speed in SPEEDS:
+        old = seconds_per_key(per_key, text, speed, args.call_overhead)
+        new = seconds_per_key(batched, text, speed, args.call_overhead)
+        print(f"{speed:>8.3f} {old:>14.4f} {new:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Keystroke throughput of XTestBackend vs pyautogui under Xvfb.
+
+Sends the same text through each backend with no per-key interval and
+reports keystrokes per second.  pyautogui is measured with its default
+``PAUSE`` and with ``PAUSE = 0``.  Needs an X server with XTEST; when
+$DISPLAY is unset an Xvfb is started for the run if one is installed.
+
+Usage:
+    python benchmarks/bench_xtest.py [--chars 2000]
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+XVFB_DISPLAY = ":97"
+
+
+def keys_per_second(backend, text: str) -> float:
+    start = time.perf_counter()
+    backend.write(text)
+    return len(text) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--chars", type=int, default=2000)
+    args = ap.parse_args()
+
+    xvfb = None
+    if "DISPLAY" not in os.environ:
+        if not shutil.which("Xvfb"):
+            sys.exit("No $DISPLAY and no Xvfb installed")
+        xvfb = subprocess.Popen(["Xvfb", XVFB_DISPLAY, "-screen", "0", "1024x768x24"])
+        os.environ["DISPLAY"] = XVFB_DISPLAY
+        time.sleep(1)
+    try:
+        from type_simulator.text_typer.xtest_backend import XTestBackend
+
+        words = "the quick brown fox jumps over the lazy dog "
+        text = (words * (args.chars // len(words) + 1))[: args.chars]
+        print(f"{'backend':>22} {'keys/s':>10}")
+        xt = XTestBackend()
+        print(f"{'XTestBackend':>22} {keys_per_second(xt, text):>10.0f}")
+        xt.close()
+
+        import pyautogui
+
+        sample = text[:200]  # pyautogui is slow enough that 200 keys suffice
+        for pause in (pyautogui.PAUSE, 0.0):
+            pyautogui.PAUSE = pause
+            rate = keys_per_second(pyautogui, sample)
+            print(f"{f'pyautogui PAUSE={pause}':>22} {rate:>10.0f}")
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+
+if __name__ == "__main__":
+    main()
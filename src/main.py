@@ -29,8 +29,29 @@ def print_profiles() -> None:
     print("\nUse with: --profile <name>")
 
 
-def print_stats(text: str, start_time: float, end_time: float) -> None:
-    """Print typing statistics."""
+def estimate_text(
+    text: str,
+    typing_speed: float,
+    typing_variance: float,
+    cache=None,
+    source_path=None,
+    optimizer=None,
+):
+    """Statically estimate the duration and keystrokes needed to type *text*."""
+    from type_simulator.text_typer.analyzer import estimate
+    from type_simulator.text_typer.includes import ModuleCache
+    from type_simulator.text_typer.parser import CommandParser
+
+    parser = CommandParser()
+    tokens = cache.get_or_parse(parser, text) if cache else parser.parse(text)
+    tokens = ModuleCache(cache).resolve(tokens, source=source_path)
+    if optimizer is not None:
+        tokens = optimizer.optimize(tokens)
+    return estimate(tokens, typing_speed, typing_variance)
+
+
+def print_stats(text: str, start_time: float, end_time: float, estimate=None) -> None:
+    """Print typing statistics, alongside the static estimate if given."""
     duration = end_time - start_time
     char_count = len(text)
     word_count = len(text.split())
@@ -50,9 +71,207 @@ def print_stats(text: str, start_time: float, end_time: float) -> None:
     print(f"  Time elapsed:     {duration:.2f}s")
     print(f"  Speed:            {cps:.1f} chars/sec")
     print(f"  WPM:              {wpm:.1f}")
+    if estimate is not None:
+        print(
+            f"  Keystrokes:       {estimate.min_keystrokes}-{estimate.max_keystrokes}"
+        )
+        print(
+            f"  Estimated time:   {estimate.expected_seconds:.2f}s "
+            f"({estimate.min_seconds:.2f}s-{estimate.max_seconds:.2f}s)"
+        )
     print("-" * 40)
 
 
+def compile_scripts(args) -> int:
+    """
+    Warm the compile cache for each input file and everything it includes;
+    return an exit status.
+    """
+    from type_simulator.text_typer.cache import CompileCache
+    from type_simulator.text_typer.includes import ModuleCache
+    from type_simulator.text_typer.parser import CommandParser
+    from utils.text_input import TextInputError, read_file
+
+    cache = CompileCache(args.cache_dir)
+    includes = ModuleCache(cache, args.strict)
+    parser = CommandParser(args.strict)
+    status = 0
+    for path in args.inputs:
+        try:
+            text = read_file(path)
+            program = cache.get_or_compile(parser, text)
+            if program.has_includes:
+                includes.resolve(program.tokens(), source=path)
+        except (TextInputError, ValueError) as e:
+            logging.error("Could not compile %s: %s", path, e)
+            status = 1
+            continue
+        key = cache.key(text, args.strict)
+        print(f"{path}: {len(program)} instructions -> {key[:16]}")
+    return status
+
+
+def run_batch_manifest(args) -> int:
+    """Run the jobs of ``args.manifest``, print a report; return an exit status."""
+    import json
+    from dataclasses import asdict
+
+    from type_simulator.batch import format_report, load_manifest, run_batch
+
+    try:
+        jobs = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        logging.error("Could not read manifest: %s", e)
+        return 2
+    compile_cache = None
+    if not args.no_cache:
+        from type_simulator.text_typer.cache import CompileCache
+
+        compile_cache = CompileCache(args.cache_dir)
+    displays = args.displays.split(",") if args.displays else None
+    start = time.perf_counter()
+    try:
+        results = run_batch(
+            jobs,
+            workers=args.workers,
+            displays=displays,
+            screen=args.xvfb_screen,
+            cache=compile_cache,
+            log_level=getattr(logging, args.log_level),
+        )
+    except RuntimeError as e:  # e.g. Xvfb missing
+        logging.error("Batch run failed: %s", e)
+        return 1
+    print(format_report(results, time.perf_counter() - start))
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as fh:
+            for result in results:
+                fh.write(json.dumps(asdict(result)) + "\n")
+    return 0 if all(r.ok for r in results) else 1
+
+
+def run_daemon(args) -> int:
+    """Serve typing jobs on a Unix socket until shut down."""
+    from type_simulator.daemon import serve
+
+    compile_cache = None
+    if not args.no_cache:
+        from type_simulator.text_typer.cache import CompileCache
+
+        compile_cache = CompileCache(args.cache_dir)
+    try:
+        serve(args.socket, compile_cache)
+    except KeyboardInterrupt:
+        pass
+    except RuntimeError as e:  # e.g. another daemon owns the socket
+        logging.error("Could not start the daemon: %s", e)
+        return 1
+    return 0
+
+
+def _submitted_job(args) -> dict:
+    """The daemon job described by the main options."""
+    if args.input is not None:
+        source = args.input
+    elif not sys.stdin.isatty():
+        source = sys.stdin.read()
+    else:
+        raise ValueError("No input: pass --input or pipe a script to STDIN")
+    # The daemon resolves paths from its own working directory
+    if os.path.isfile(source):
+        source = os.path.abspath(source)
+    job = {"input": source, "mode": args.mode, "wait": args.wait}
+    optional = {
+        "output": os.path.abspath(args.output) if args.output else None,
+        "editor": args.editor_script,
+        "profile": args.profile,
+        "speed": args.speed,
+        "variance": args.variance,
+        "id": args.job_id,
+    }
+    job.update({k: v for k, v in optional.items() if v is not None})
+    return job
+
+
+def _format_event(event: dict) -> str:
+    name = event.get("event")
+    if name == "queued":
+        return f"{event['id']}: queued (position {event['position']})"
+    if name == "progress":
+        return (
+            f"{event['id']}: {event['tokens']} tokens, "
+            f"{event['seconds']:.1f}s of ~{event['estimate']:.1f}s"
+        )
+    if name == "finished":
+        if event["state"] == "failed":
+            return f"{event['id']}: failed: {event['error']}"
+        return f"{event['id']}: {event['state']} in {event['seconds']:.2f}s"
+    if "job" in event or "jobs" in event:
+        jobs = event.get("jobs", [event.get("job")])
+        return "\n".join(
+            f"{j['id']:<16}{j['state']:<11}{j['tokens']:>8} tokens "
+            f"{j['seconds']:>8.2f}s  {j['error']}".rstrip()
+            for j in jobs
+        )
+    return f"{event['id']}: {name}"
+
+
+def run_client(args) -> int:
+    """Send a submit/status/cancel request to the daemon; return an exit status."""
+    import json
+
+    from type_simulator.daemon import request
+
+    if args.command == "submit":
+        try:
+            job = _submitted_job(args)
+        except ValueError as e:
+            logging.error(str(e))
+            return 2
+        req = {
+            "op": "submit",
+            "job": job,
+            "priority": args.priority,
+            "follow": not args.detach,
+        }
+    elif args.command == "status":
+        req = {"op": "status", "id": args.job_id}
+    else:
+        req = {"op": "cancel", "id": args.job_id}
+
+    job_id = None
+    status = 1
+    try:
+        for reply in request(req, args.socket):
+            if getattr(args, "json", False):
+                print(json.dumps(reply), flush=True)
+            if reply.get("ok") is False:
+                logging.error("Daemon: %s", reply["error"])
+                return 1
+            if reply.get("event") == "finished":
+                status = 0 if reply["state"] == "done" else 1
+            elif "id" in reply and "event" not in reply:
+                job_id = reply["id"]
+                if args.command == "submit" and args.detach:
+                    status = 0
+                    if not args.json:
+                        print(job_id)
+                continue
+            elif args.command != "submit":
+                status = 0
+            if not getattr(args, "json", False):
+                print(_format_event(reply), flush=True)
+    except ConnectionError as e:
+        logging.error(str(e))
+        return 2
+    except KeyboardInterrupt:
+        if job_id is not None:
+            # Leaving a followed job cancels it
+            list(request({"op": "cancel", "id": job_id}, args.socket))
+        return 130
+    return status
+
+
 def main() -> None:
     """
     Parse CLI args, configure logging, and run the simulator.
@@ -60,12 +279,25 @@ def main() -> None:
     parser = TypeSimulatorParser()
     args = parser.parse()  # --version is handled here by argparse
 
+    from utils import timing
+
+    timing.milestone("arguments parsed")
+
     # configure logging
     logging.basicConfig(
         level=getattr(logging, args.log_level),
         format="%(asctime)s [%(levelname)s] %(message)s",
     )
 
+    if args.command == "compile":
+        sys.exit(compile_scripts(args))
+    if args.command == "batch":
+        sys.exit(run_batch_manifest(args))
+    if args.command == "serve":
+        sys.exit(run_daemon(args))
+    if args.command in ("submit", "status", "cancel"):
+        sys.exit(run_client(args))
+
     # Handle --list-profiles
     if args.list_profiles:
         print_profiles()
@@ -102,36 +334,60 @@ def main() -> None:
         logging.error(str(e))
         sys.exit(1)
 
+    # Script file the text came from, so {INCLUDE} paths resolve next to it
+    source_path = (
+        args.input if args.input is not None and os.path.isfile(args.input) else None
+    )
+
     # Determine output file for direct mode
     output_file = args.output if args.mode == "direct" else None
     if args.mode == "direct" and not output_file:
         logging.error("In direct mode, --output must be specified.")
         sys.exit(2)
 
-    # import the simulator only when actually running
-    from type_simulator.type_simulator import TypeSimulator
+    compile_cache = None
+    if not args.no_cache:
+        from type_simulator.text_typer.cache import CompileCache
 
-    simulator = TypeSimulator(
-        editor_script_path=args.editor_script,
-        file_path=output_file,  # Only used in direct mode
-        text=text,  # Already processed text
-        typing_speed=typing_speed,
-        typing_variance=typing_variance,
-        wait=args.wait,
-        mode=args.mode,
-    )
+        compile_cache = CompileCache(args.cache_dir)
+
+    optimizer = None
+    if args.optimize:
+        from type_simulator.text_typer.optimizer import Optimizer
+
+        optimizer = Optimizer(args.disabled_passes, typing_speed, typing_variance)
 
     if args.dry_run:
+        from type_simulator.text_typer.analyzer import format_estimate
         from type_simulator.validation import validate_inputs
 
         is_valid, errors, warnings = validate_inputs(
             args.mode, args.output, args.editor_script, text
         )
         if is_valid:
+            try:
+                with timing.phase("parse"):
+                    estimate = estimate_text(
+                        text,
+                        typing_speed,
+                        typing_variance,
+                        compile_cache,
+                        source_path,
+                        optimizer,
+                    )
+            except ValueError as e:  # e.g. a missing or cyclic {INCLUDE}
+                logging.error(f"Validation error: {e}")
+                logging.error("Dry run validation failed")
+                sys.exit(1)
             logging.info("Dry run validation successful")
+            if optimizer is not None:
+                logging.info("Optimizer %s", optimizer.last_report.summary())
+            logging.info("Estimated typing time: %s", format_estimate(estimate))
             if warnings:
                 for w in warnings:
                     logging.warning(f"Validation warning: {w}")
+            if args.timing_report:
+                print(timing.TIMINGS.summary())
             sys.exit(0)
         else:
             for e in errors:
@@ -141,6 +397,26 @@ def main() -> None:
             logging.error("Dry run validation failed")
             sys.exit(1)
 
+    # import the simulator only when actually running
+    with timing.phase("imports"):
+        from type_simulator.type_simulator import TypeSimulator
+
+    simulator = TypeSimulator(
+        editor_script_path=args.editor_script,
+        file_path=output_file,  # Only used in direct mode
+        text=text,  # Already processed text
+        typing_speed=typing_speed,
+        typing_variance=typing_variance,
+        wait=args.wait,
+        mode=args.mode,
+        compile_cache=compile_cache,
+        optimizer=optimizer,
+        source_path=source_path,
+        paste_run_limit=args.paste_run_limit,
+        input_backend=args.backend,
+        fsync=args.fsync,
+    )
+
     # Normal execution mode
     start_time = time.time()
     try:
@@ -152,7 +428,17 @@ def main() -> None:
 
     # Print statistics if requested
     if args.stats:
-        print_stats(text, start_time, end_time)
+        estimate = simulator.estimate
+        if estimate is None:
+            try:
+                estimate = estimate_text(
+                    text, typing_speed, typing_variance, compile_cache, source_path
+                )
+            except ValueError:
+                estimate = None
+        print_stats(text, start_time, end_time, estimate)
+    if args.timing_report:
+        print(timing.TIMINGS.summary())
 
 
 if __name__ == "__main__":
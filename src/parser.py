@@ -14,6 +14,18 @@ VERSION = "2.0.0"
 # Available typing profiles
 TYPING_PROFILES = ["human", "fast", "slow", "robotic", "hunt_and_peck"]
 
+# Optimizer passes that --disable-pass accepts
+OPTIMIZER_PASSES = [
+    "drop_empty_text",
+    "unwrap_repeats",
+    "hoist_text",
+    "fold_waits",
+    "drop_dead_speed",
+]
+
+# Input paths --backend accepts ("auto" ranks them by a cached probe)
+INPUT_BACKENDS = ["auto", "keys", "paste", "unicode", "pynput"]
+
 
 class TypeSimulatorParser(argparse.ArgumentParser):
     """
@@ -43,6 +55,16 @@ Examples:
   # Use repeat blocks in input
   python -m src.main --mode direct --output demo.txt --input "{REPEAT_3}Hello {/REPEAT}"
 
+  # Pre-compile scripts into the cache so later runs skip parsing
+  python -m src.main compile demo/demo_macro.txt
+
+  # Run a JSONL manifest of jobs on 4 workers, each with its own Xvfb
+  python -m src.main batch jobs.jsonl -j 4
+
+  # Keep a warm daemon running and send it jobs
+  python -m src.main serve &
+  python -m src.main --mode direct --output out.txt --input script.txt submit
+
 Available Profiles:
   human        - Natural typing with realistic variations
   fast         - Quick professional typing
@@ -185,6 +207,16 @@ Available Profiles:
             default=False,
         )
 
+        self.add_argument(
+            "--timing-report",
+            action="store_true",
+            help=(
+                "Show startup timings (imports, parsing, backend init, editor "
+                "launch) and the time to the first keystroke."
+            ),
+            default=False,
+        )
+
         # list profiles
         self.add_argument(
             "--list-profiles",
@@ -193,6 +225,209 @@ Available Profiles:
             default=False,
         )
 
+        # compiled-script cache
+        self.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="Always re-parse the input instead of using the compile cache.",
+            default=False,
+        )
+        self.add_argument(
+            "--cache-dir",
+            help=(
+                "Directory for compiled scripts "
+                "(default: $XDG_CACHE_HOME/type_simulator/compiled)."
+            ),
+            default=None,
+        )
+
+        # clipboard paste of special characters; imported here, once main()
+        # has put src/ on sys.path (token.py pulls in no GUI modules)
+        from type_simulator.text_typer.token import PASTE_RUN_LIMIT
+
+        self.add_argument(
+            "--paste-run-limit",
+            type=int,
+            default=PASTE_RUN_LIMIT,
+            metavar="N",
+            help=(
+                "Paste runs of special characters such as {}()[];: (and the "
+                "short text between them) up to N characters long with a "
+                "single clipboard operation (default: %(default)s; 1 pastes "
+                "them one by one)."
+            ),
+        )
+
+        self.add_argument(
+            "--backend",
+            choices=INPUT_BACKENDS,
+            default="auto",
+            help=(
+                "How characters reach the window: 'auto' picks the fastest "
+                "working path per character class (probed once, cached for a "
+                "day), the others force key events, selection paste, "
+                "Ctrl+Shift+U hex entry or pynput (default: auto)."
+            ),
+        )
+
+        self.add_argument(
+            "--fsync",
+            action="store_true",
+            default=False,
+            help=(
+                "In direct mode, flush the output file to disk before it "
+                "atomically replaces the target."
+            ),
+        )
+
+        # optimizer
+        self.add_argument(
+            "--optimize",
+            action="store_true",
+            help=(
+                "Run optimizer passes (fold waits, drop dead speed changes, "
+                "unwrap trivial repeats, ...) over the parsed script."
+            ),
+            default=False,
+        )
+        self.add_argument(
+            "--disable-pass",
+            action="append",
+            choices=list(OPTIMIZER_PASSES),
+            metavar="PASS",
+            dest="disabled_passes",
+            default=[],
+            help=(
+                "Skip one optimizer pass (repeatable). "
+                f"One of: {', '.join(OPTIMIZER_PASSES)}."
+            ),
+        )
+
+        # subcommands
+        commands = self.add_subparsers(
+            dest="command", metavar="COMMAND", parser_class=argparse.ArgumentParser
+        )
+        compile_cmd = commands.add_parser(
+            "compile",
+            help="Parse scripts ahead of time and store them in the compile cache.",
+        )
+        compile_cmd.add_argument("inputs", nargs="+", help="Script files to compile.")
+        compile_cmd.add_argument(
+            "--strict",
+            action="store_true",
+            default=False,
+            help="Compile with the strict parser.",
+        )
+        compile_cmd.add_argument(
+            "--cache-dir",
+            # Unset unless given here, so the main --cache-dir still applies
+            default=argparse.SUPPRESS,
+            help="Directory for compiled scripts.",
+        )
+
+        batch_cmd = commands.add_parser(
+            "batch",
+            help=(
+                "Run the jobs of a JSONL manifest on a pool of workers, "
+                "each with its own Xvfb display."
+            ),
+        )
+        batch_cmd.add_argument(
+            "manifest",
+            help=(
+                "JSONL file, one job per line with 'input' and optionally "
+                "'mode', 'profile', 'output', 'editor', 'speed', 'variance', "
+                "'wait' and 'id'."
+            ),
+        )
+        batch_cmd.add_argument(
+            "-j",
+            "--workers",
+            type=int,
+            default=None,
+            help="Number of worker processes (default: CPU count).",
+        )
+        batch_cmd.add_argument(
+            "--displays",
+            default=None,
+            metavar="LIST",
+            help=(
+                "Comma-separated existing X displays (e.g. ':1,:2'), one per "
+                "worker, instead of starting an Xvfb for each."
+            ),
+        )
+        batch_cmd.add_argument(
+            "--xvfb-screen",
+            default="1280x800x24",
+            metavar="WxHxD",
+            help="Screen geometry of the Xvfb displays (default: 1280x800x24).",
+        )
+        batch_cmd.add_argument(
+            "--report",
+            default=None,
+            metavar="FILE",
+            help="Also write the per-job results to FILE as JSONL.",
+        )
+        batch_cmd.add_argument(
+            "--cache-dir",
+            # Unset unless given here, so the main --cache-dir still applies
+            default=argparse.SUPPRESS,
+            help="Directory for compiled scripts.",
+        )
+
+        socket_help = "Unix socket of the daemon (default: per-user runtime path)."
+        serve_cmd = commands.add_parser(
+            "serve",
+            help="Run a warm daemon that accepts typing jobs on a Unix socket.",
+        )
+        serve_cmd.add_argument("--socket", default=None, help=socket_help)
+        serve_cmd.add_argument(
+            "--cache-dir",
+            # Unset unless given here, so the main --cache-dir still applies
+            default=argparse.SUPPRESS,
+            help="Directory for compiled scripts.",
+        )
+
+        submit_cmd = commands.add_parser(
+            "submit",
+            help=(
+                "Send the job described by the main options (--input, --mode, "
+                "--output, --profile, ...) to the daemon and follow it."
+            ),
+        )
+        submit_cmd.add_argument("--socket", default=None, help=socket_help)
+        submit_cmd.add_argument(
+            "--priority",
+            type=int,
+            default=0,
+            help="Jobs with a higher priority run first (default: 0).",
+        )
+        submit_cmd.add_argument(
+            "--id", dest="job_id", default=None, help="Job id (default: assigned)."
+        )
+        submit_cmd.add_argument(
+            "--detach",
+            action="store_true",
+            default=False,
+            help="Print the job id and return instead of following the job.",
+        )
+        submit_cmd.add_argument(
+            "--json",
+            action="store_true",
+            default=False,
+            help="Print the daemon's events as JSON lines.",
+        )
+
+        status_cmd = commands.add_parser(
+            "status", help="Show the daemon's jobs, or one job."
+        )
+        status_cmd.add_argument("job_id", nargs="?", default=None, help="Job id.")
+        status_cmd.add_argument("--socket", default=None, help=socket_help)
+
+        cancel_cmd = commands.add_parser("cancel", help="Cancel a daemon job.")
+        cancel_cmd.add_argument("job_id", help="Job id.")
+        cancel_cmd.add_argument("--socket", default=None, help=socket_help)
+
     def parse(self):
         """Parse and return command-line arguments."""
         return self.parse_args()
@@ -0,0 +1,464 @@
+# src/type_simulator/batch.py
+"""
+Batch runs from a JSONL manifest.
+
+Each manifest line describes one job::
+
+    {"input": "demo/intro.txt", "mode": "gui", "profile": "fast",
+     "output": "out/intro.txt", "editor": "xterm -e vim"}
+
+:func:`run_batch` reads every input and compiles it once in the parent,
+saving the programs to a scratch directory that the workers memory-map
+read-only (``Program.load``), so all workers share one copy of each
+program.  N worker processes each get their own display, an Xvfb started
+with ``-displayfd`` (which picks a free display number) unless existing
+displays are given.  The workers take jobs from a single queue ordered
+longest-estimated-first, so the long jobs do not end up at the tail of
+the run, and report a :class:`JobResult` for each.  GUI jobs with a vi/vim
+editor reuse the worker's warm editor window (see :mod:`editor_pool`).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from type_simulator.xvfb import DEFAULT_SCREEN, XvfbDisplay
+
+logger = logging.getLogger(__name__)
+
+MODES = ("gui", "terminal", "direct", "focus")
+# Seconds between liveness checks of the workers while waiting for results
+POLL_INTERVAL = 1.0
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+@dataclass
+class Job:
+    """One manifest entry; ``id`` defaults to ``"line-<n>"``."""
+
+    input: str
+    mode: str = "gui"
+    profile: Optional[str] = None
+    output: Optional[str] = None
+    editor: Optional[str] = None
+    speed: Optional[float] = None
+    variance: Optional[float] = None
+    wait: float = 0.0
+    id: str = ""
+
+    @classmethod
+    def from_dict(cls, data: dict, line: int = 0) -> "Job":
+        """Validate one decoded manifest line."""
+        if not isinstance(data, dict):
+            raise ValueError("a job must be a JSON object")
+        unknown = set(data) - {f.name for f in fields(cls)}
+        if unknown:
+            raise ValueError(f"unknown field(s): {', '.join(sorted(unknown))}")
+        if not isinstance(data.get("input"), str):
+            raise ValueError("'input' (text or file path) is required")
+        for name in ("mode", "profile", "output", "editor"):
+            if not isinstance(data.get(name, ""), (str, type(None))):
+                raise ValueError(f"'{name}' must be a string")
+        for name in ("speed", "variance"):
+            value = data.get(name)
+            if value is not None and not _is_number(value):
+                raise ValueError(f"'{name}' must be a number")
+        wait = data.get("wait", 0.0)
+        if not _is_number(wait) or wait < 0:
+            raise ValueError("'wait' must be a non-negative number of seconds")
+        if not isinstance(data.get("id", ""), (str, int)):
+            raise ValueError("'id' must be a string")
+        job = cls(**data)
+        if job.mode not in MODES:
+            raise ValueError(f"mode must be one of {', '.join(MODES)}")
+        if job.mode == "direct" and not job.output:
+            raise ValueError("direct mode needs an 'output'")
+        if job.profile is not None:
+            from type_simulator.profiles import get_profile
+
+            if get_profile(job.profile) is None:
+                raise ValueError(f"unknown profile {job.profile!r}")
+        job.id = str(job.id or f"line-{line}")
+        return job
+
+    def typing_params(self) -> Tuple[float, float]:
+        """(speed, variance) from the profile, overridden by the job."""
+        speed, variance = 0.15, 0.05
+        if self.profile:
+            from type_simulator.profiles import get_profile
+
+            profile = get_profile(self.profile)
+            speed, variance = profile.speed, profile.variance
+        if self.speed is not None:
+            speed = float(self.speed)
+        if self.variance is not None:
+            variance = float(self.variance)
+        return speed, variance
+
+
+@dataclass
+class JobResult:
+    """Outcome of one job; times are in seconds."""
+
+    id: str
+    ok: bool
+    seconds: float = 0.0
+    estimate: float = 0.0
+    worker: Optional[int] = None
+    display: Optional[str] = None
+    output: Optional[str] = None
+    error: str = ""
+
+
+def load_manifest(path: str | Path) -> List[Job]:
+    """
+    Read a JSONL manifest; blank lines are skipped.
+
+    Raises
+    ------
+    ValueError
+        On the first malformed line, with its line number.
+    """
+    jobs = []
+    with open(path, encoding="utf-8") as fh:
+        for lineno, line in enumerate(fh, 1):
+            if not line.strip():
+                continue
+            try:
+                jobs.append(Job.from_dict(json.loads(line), lineno))
+            except (ValueError, TypeError) as e:
+                raise ValueError(f"{path}:{lineno}: {e}") from None
+    ids = [job.id for job in jobs]
+    if len(set(ids)) != len(ids):
+        raise ValueError(f"{path}: job ids must be unique")
+    return jobs
+
+
+def read_input(job: Job) -> Tuple[str, Optional[str]]:
+    """The script text of *job* and the file it came from, if any."""
+    from utils.text_input import read_file
+
+    # A path or literal text; stdin belongs to the batch, not the jobs
+    source = job.input if os.path.isfile(job.input) else None
+    text = read_file(source) if source else job.input
+    return text, source
+
+
+def compile_text(text: str, source: Optional[str], parser, includes, cache=None):
+    """Compile *text*, resolving its includes relative to *source*."""
+    from type_simulator.text_typer.program import Program
+
+    if cache is not None:
+        program = cache.get_or_compile(parser, text)
+    else:
+        program = Program.compile(parser.parse(text))
+    if program.has_includes:
+        program = Program.compile(includes.resolve(program.tokens(), source=source))
+    return program
+
+
+def prepare(
+    jobs: Sequence[Job], program_dir: str | Path, cache=None
+) -> Tuple[List[dict], List[JobResult]]:
+    """
+    Read and compile each job's input (each distinct input only once) and
+    save the programs to *program_dir*.
+
+    Returns the runnable tasks ordered longest-estimated-first and the
+    results of the jobs that failed to load or compile.
+    """
+    from type_simulator.text_typer.analyzer import estimate
+    from type_simulator.text_typer.includes import ModuleCache
+    from type_simulator.text_typer.parser import CommandParser
+    from type_simulator.text_typer.program import Program
+
+    parser = CommandParser()
+    includes = ModuleCache(cache)
+    programs: Dict[Tuple[str, Optional[str]], Tuple[str, Program]] = {}
+    tasks, failed = [], []
+    for job in jobs:
+        try:
+            text, source = read_input(job)
+            # Includes resolve relative to the script's directory
+            base = os.path.dirname(os.path.abspath(source)) if source else None
+            key = (text, base)
+            if key not in programs:
+                program = compile_text(text, source, parser, includes, cache)
+                path = os.path.join(str(program_dir), f"{len(programs)}.tsc")
+                program.save(path)
+                programs[key] = (path, program)
+            path, program = programs[key]
+            speed, variance = job.typing_params()
+            expected = estimate(program.tokens(), speed, variance).expected_seconds
+        except Exception as e:
+            logger.error("Job %s: could not load input: %s", job.id, e)
+            failed.append(JobResult(job.id, False, output=job.output, error=str(e)))
+            continue
+        tasks.append(
+            {
+                "job": asdict(job),
+                "text": text,
+                "source": source,
+                "program": path,
+                "speed": speed,
+                "variance": variance,
+                "estimate": expected,
+            }
+        )
+    tasks.sort(key=lambda t: t["estimate"], reverse=True)
+    logger.info(
+        "Compiled %d distinct program(s) for %d job(s)", len(programs), len(jobs)
+    )
+    return tasks, failed
+
+
+class WarmEditor:
+    """
+    The warm editor of one worker (or daemon): a single-slot EditorPool on
+    its display, rebuilt when a job asks for a different editor command.
+    """
+
+    def __init__(self, display: Optional[str]) -> None:
+        self.display = display
+        self.pool = None
+        self.broken = not display  # no display, or pooling failed before
+
+    def lease(self, job: Job):
+        """A lease for *job*, or None if it has to launch its own editor."""
+        from type_simulator.editor_manager import EditorManager
+        from type_simulator.editor_pool import EditorPool, is_vim
+
+        cmd = job.editor or EditorManager.DEFAULT_CMD
+        if self.broken or job.mode != "gui" or not is_vim(cmd):
+            return None
+        if self.pool is None or self.pool.editor_cmd != cmd:
+            self.close()
+            try:
+                self.pool = EditorPool(editor_cmd=cmd, displays=[self.display])
+            except Exception as e:
+                logger.warning("No warm editor, launching per job: %s", e)
+                self.broken = True
+                return None
+        return self.pool.lease()
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
+
+def _run_task(
+    task: dict, worker: int, display: Optional[str], editor: WarmEditor
+) -> JobResult:
+    from contextlib import nullcontext
+
+    from type_simulator.text_typer.program import Program
+    from type_simulator.type_simulator import TypeSimulator
+
+    job = Job(**task["job"])
+    start = time.perf_counter()
+    error = ""
+    try:
+        lease = editor.lease(job)
+        with lease if lease is not None else nullcontext():
+            simulator = TypeSimulator(
+                file_path=job.output,
+                text=task["text"],
+                mode=job.mode,
+                editor_cmd=job.editor,
+                typing_speed=task["speed"],
+                typing_variance=task["variance"],
+                wait=job.wait,
+                source_path=task["source"],
+                program=Program.load(task["program"]),
+                editor_lease=lease,
+            )
+            simulator.run()
+    except Exception as e:
+        error = str(e) or type(e).__name__
+        logger.error("Job %s failed: %s", job.id, error)
+    return JobResult(
+        job.id,
+        not error,
+        time.perf_counter() - start,
+        task["estimate"],
+        worker,
+        display,
+        job.output,
+        error,
+    )
+
+
+def _worker(index, display, tasks, results, log_level) -> None:
+    """Worker process: run tasks from *tasks* until the ``None`` sentinel."""
+    if display:
+        # Before anything imports the GUI stack, which binds to $DISPLAY
+        os.environ["DISPLAY"] = display
+    # Inputs are already read; keeps TypeSimulator from consulting stdin
+    sys.stdin.close()
+    logging.basicConfig(
+        level=log_level,
+        format=f"%(asctime)s [%(levelname)s] [worker {index}] %(message)s",
+    )
+    editor = WarmEditor(display)
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            results.put(("start", index, task["job"]["id"]))
+            results.put(("done", index, _run_task(task, index, display, editor)))
+    finally:
+        editor.close()
+
+
+def run_batch(
+    jobs: Sequence[Job],
+    workers: Optional[int] = None,
+    displays: Optional[Sequence[str]] = None,
+    screen: str = DEFAULT_SCREEN,
+    cache=None,
+    log_level: int = logging.INFO,
+) -> List[JobResult]:
+    """
+    Run *jobs* on a pool of worker processes and return one result per job,
+    in manifest order.
+
+    Parameters
+    ----------
+    workers :
+        Number of worker processes (default: CPU count, at most one per job).
+    displays :
+        Existing X displays to bind the workers to, one per worker, instead
+        of starting an Xvfb for each.  Not needed if every job is direct.
+    screen :
+        Geometry of the Xvfb screens.
+    cache :
+        Optional ``CompileCache`` used while compiling the inputs.
+    """
+    with tempfile.TemporaryDirectory(prefix="type_simulator_batch_") as tmp:
+        tasks, failed = prepare(jobs, tmp, cache)
+        done: Dict[str, JobResult] = {r.id: r for r in failed}
+        if tasks:
+            done.update(_dispatch(tasks, workers, displays, screen, log_level))
+    return [done[job.id] for job in jobs]
+
+
+def _dispatch(tasks, workers, displays, screen, log_level) -> Dict[str, JobResult]:
+    if displays:
+        workers = len(displays)
+    n = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+    needs_display = any(t["job"]["mode"] != "direct" for t in tasks)
+    servers: List[XvfbDisplay] = []
+    ctx = multiprocessing.get_context("spawn")
+    task_q, result_q = ctx.Queue(), ctx.Queue()
+    procs = []
+    try:
+        if displays:
+            names = list(displays)
+        elif needs_display:
+            for _ in range(n):
+                servers.append(XvfbDisplay(screen))
+            names = [s.name for s in servers]
+        else:
+            names = [None] * n
+        for task in tasks:  # already longest-first
+            task_q.put(task)
+        for _ in range(n):
+            task_q.put(None)
+        for i, name in enumerate(names):
+            proc = ctx.Process(
+                target=_worker,
+                args=(i, name, task_q, result_q, log_level),
+                daemon=True,
+            )
+            proc.start()
+            procs.append(proc)
+        logger.info("Running %d job(s) on %d worker(s)", len(tasks), n)
+        return _collect(tasks, procs, names, result_q)
+    finally:
+        for proc in procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+        for server in servers:
+            server.stop()
+
+
+def _collect(tasks, procs, names, result_q) -> Dict[str, JobResult]:
+    """Gather results; jobs of a worker that died are reported as failed."""
+    estimates = {t["job"]["id"]: t for t in tasks}
+    results: Dict[str, JobResult] = {}
+    running: Dict[int, str] = {}  # worker -> job id
+    while len(results) < len(tasks):
+        try:
+            kind, worker, payload = result_q.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            for i, proc in enumerate(procs):
+                if not proc.is_alive() and i in running:
+                    job_id = running.pop(i)
+                    results[job_id] = JobResult(
+                        job_id,
+                        False,
+                        estimate=estimates[job_id]["estimate"],
+                        worker=i,
+                        display=names[i],
+                        output=estimates[job_id]["job"]["output"],
+                        error=f"worker exited with code {proc.exitcode}",
+                    )
+            if not any(p.is_alive() for p in procs) and result_q.empty():
+                for job_id, task in estimates.items():
+                    results.setdefault(
+                        job_id,
+                        JobResult(
+                            job_id,
+                            False,
+                            estimate=task["estimate"],
+                            output=task["job"]["output"],
+                            error="no worker left to run the job",
+                        ),
+                    )
+            continue
+        if kind == "start":
+            running[worker] = payload
+        else:
+            running.pop(worker, None)
+            results[payload.id] = payload
+    return results
+
+
+def format_report(results: Sequence[JobResult], wall_seconds: float) -> str:
+    """Per-job outcome plus the totals of a batch run."""
+    lines = ["\n📦 Batch Report:", "-" * 60]
+    for r in results:
+        mark = "✓" if r.ok else "✗"
+        where = f"worker {r.worker}" if r.worker is not None else "not run"
+        detail = f"-> {r.output}" if r.ok and r.output else r.error
+        lines.append(
+            f"  {mark} {r.id:<16} {r.seconds:7.2f}s (est {r.estimate:7.2f}s) "
+            f"{where:<9} {detail}"
+        )
+    ok = sum(r.ok for r in results)
+    busy = sum(r.seconds for r in results)
+    workers = len({r.worker for r in results if r.worker is not None}) or 1
+    rate = len(results) / wall_seconds if wall_seconds > 0 else 0.0
+    utilisation = busy / (wall_seconds * workers) if wall_seconds > 0 else 0.0
+    lines.append("-" * 60)
+    lines.append(
+        f"  {ok} ok, {len(results) - ok} failed in {wall_seconds:.2f}s "
+        f"({rate:.2f} jobs/s, {workers} worker(s), {utilisation:.0%} busy)"
+    )
+    return "\n".join(lines)
@@ -0,0 +1,539 @@
+# src/type_simulator/daemon.py
+"""
+Long-running typing daemon.
+
+Every ``python -m src.main`` run pays for interpreter startup, the GUI
+imports, the clipboard probe and argument parsing before the first key.
+``serve`` pays them once: the daemon keeps the GUI stack, the clipboard,
+the parser, the compiled programs and (for vi/vim) a warm editor window,
+and runs jobs sent to a Unix domain socket one at a time, highest priority
+first and in submission order within a priority.
+
+The protocol is JSON lines.  A client connects, sends one request and
+reads replies until the daemon closes the connection::
+
+    {"op": "submit", "job": {"input": "...", "mode": "direct",
+     "output": "out.txt"}, "priority": 0, "follow": true}
+    {"op": "status"}                 {"op": "status", "id": "job-3"}
+    {"op": "cancel", "id": "job-3"}  {"op": "shutdown"}
+
+Jobs take the fields of a batch manifest line (see :class:`batch.Job`).
+Every request is answered with ``{"ok": true, ...}`` or
+``{"ok": false, "error": "..."}``.  A followed submission then streams
+``queued``, ``started``, ``progress`` and a final ``finished`` event.  A
+running job is cancelled between two tokens.
+"""
+
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds between progress events of a running job
+PROGRESS_INTERVAL = 0.2
+# Finished jobs kept for status queries
+HISTORY = 1000
+# Compiled programs (includes unresolved) kept in memory, keyed by text
+PROGRAM_CACHE = 64
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = (
+    "queued",
+    "running",
+    "done",
+    "failed",
+    "cancelled",
+)
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+def default_socket_path() -> str:
+    """``$XDG_RUNTIME_DIR/type_simulator.sock``, else a per-user /tmp path."""
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime and os.path.isdir(runtime):
+        return os.path.join(runtime, "type_simulator.sock")
+    return f"/tmp/type_simulator-{os.getuid()}.sock"
+
+
+# ─────────────────────────── Client ───────────────────────────
+def request(req: dict, socket_path: Optional[str] = None) -> Iterator[dict]:
+    """
+    Send one request to the daemon and yield its replies.
+
+    Raises
+    ------
+    ConnectionError
+        If no daemon listens on *socket_path*.
+    """
+    path = socket_path or default_socket_path()
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            sock.connect(path)
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            raise ConnectionError(f"No daemon listening on {path}: {e}") from None
+        sock.sendall(json.dumps(req).encode() + b"\n")
+        sock.shutdown(socket.SHUT_WR)
+        with sock.makefile("r", encoding="utf-8") as replies:
+            for line in replies:
+                yield json.loads(line)
+    finally:
+        sock.close()
+
+
+# ─────────────────────────── Queue ───────────────────────────
+class JobCancelled(Exception):
+    """Raised inside a running job once it has been cancelled."""
+
+
+class JobRecord:
+    """A submitted job, its place in the queue and its progress."""
+
+    def __init__(self, job, priority: int, seq: int) -> None:
+        self.job = job
+        self.priority = priority
+        self.seq = seq
+        self.state = QUEUED
+        self.submitted = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.tokens = 0
+        self.estimate = 0.0
+        self.error = ""
+        self.cancel_requested = threading.Event()
+        self.listeners: List[Callable[[dict], None]] = []
+
+    @property
+    def id(self) -> str:
+        return self.job.id
+
+    def status(self) -> dict:
+        end = self.finished or time.time()
+        return {
+            "id": self.id,
+            "state": self.state,
+            "priority": self.priority,
+            "mode": self.job.mode,
+            "output": self.job.output,
+            "tokens": self.tokens,
+            "estimate": round(self.estimate, 3),
+            "seconds": round(end - self.started, 3) if self.started else 0.0,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """
+    Priority queue of :class:`JobRecord` (higher priority first, FIFO
+    within a priority) that also remembers recently finished jobs.
+    """
+
+    def __init__(self, history: int = HISTORY) -> None:
+        self._history = history
+        self._records: "OrderedDict[str, JobRecord]" = OrderedDict()
+        self._pending: List[JobRecord] = []
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._closed = False
+
+    def submit(
+        self,
+        data: dict,
+        priority: int = 0,
+        listener: Optional[Callable[[dict], None]] = None,
+    ) -> JobRecord:
+        """
+        Validate and enqueue a job; *listener* receives its events.
+
+        Raises
+        ------
+        ValueError
+            For an invalid job or priority, or the id of a job that has
+            not finished.
+        """
+        from type_simulator.batch import Job
+
+        if not isinstance(priority, int) or isinstance(priority, bool):
+            raise ValueError("'priority' must be an integer")
+        with self._cond:
+            if self._closed:
+                raise ValueError("the daemon is shutting down")
+            self._seq += 1
+            data = dict(data)
+            data.setdefault("id", f"job-{self._seq}")
+            job = Job.from_dict(data, self._seq)
+            old = self._records.get(job.id)
+            if old is not None and old.state not in FINISHED:
+                raise ValueError(f"job {job.id!r} is already {old.state}")
+            record = JobRecord(job, priority, self._seq)
+            if listener is not None:
+                record.listeners.append(listener)
+            self._records.pop(job.id, None)
+            self._records[job.id] = record
+            self._pending.append(record)
+            self._pending.sort(key=lambda r: (-r.priority, r.seq))
+            position = self._pending.index(record)
+            self._cond.notify()
+        self.publish(record, {"event": "queued", "position": position})
+        return record
+
+    def next(self, timeout: Optional[float] = None) -> Optional[JobRecord]:
+        """Take the next job, marking it running; None once closed."""
+        with self._cond:
+            while not self._pending:
+                if self._closed or not self._cond.wait(timeout):
+                    return None
+            record = self._pending.pop(0)
+            record.state = RUNNING
+            record.started = time.time()
+        self.publish(record, {"event": "started"})
+        return record
+
+    def cancel(self, job_id: str) -> JobRecord:
+        """
+        Cancel a queued job now, or ask a running one to stop.
+
+        Raises
+        ------
+        KeyError
+            For an unknown job id.
+        """
+        with self._cond:
+            record = self._records[job_id]
+            record.cancel_requested.set()
+            if record.state != QUEUED:
+                return record
+            self._pending.remove(record)
+        self.finish(record, CANCELLED)
+        return record
+
+    def get(self, job_id: str) -> JobRecord:
+        with self._cond:
+            return self._records[job_id]
+
+    def records(self) -> List[JobRecord]:
+        with self._cond:
+            return list(self._records.values())
+
+    def finish(self, record: JobRecord, state: str, error: str = "") -> None:
+        record.state = state
+        record.error = error
+        record.finished = time.time()
+        self.publish(record, {"event": "finished", **record.status()})
+        with self._cond:
+            record.listeners.clear()
+            finished = [r for r in self._records.values() if r.state in FINISHED]
+            for old in finished[: max(0, len(finished) - self._history)]:
+                del self._records[old.id]
+
+    def publish(self, record: JobRecord, event: dict) -> None:
+        event.setdefault("id", record.id)
+        for listener in list(record.listeners):
+            try:
+                listener(event)
+            except Exception:  # the client went away; the job goes on
+                record.listeners.remove(listener)
+
+    def close(self) -> List[JobRecord]:
+        """Refuse new jobs and return the ones still queued."""
+        with self._cond:
+            self._closed = True
+            pending, self._pending = self._pending, []
+            self._cond.notify_all()
+        return pending
+
+
+# ─────────────────────────── Server ───────────────────────────
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                req = json.loads(line)
+                if not isinstance(req, dict):
+                    raise ValueError("a request must be a JSON object")
+                self.server.typing_daemon.handle(req, self._send)
+            except OSError:  # client disconnected
+                return
+            except Exception as e:
+                if isinstance(e, KeyError):
+                    error = f"unknown job {e}"
+                elif isinstance(e, ValueError):
+                    error = str(e)
+                else:  # a malformed request must not kill the connection
+                    logger.debug("Bad request %r", line, exc_info=True)
+                    error = f"bad request: {e}"
+                try:
+                    self._send({"ok": False, "error": error})
+                except OSError:
+                    return
+
+    def _send(self, message: dict) -> None:
+        self.wfile.write(json.dumps(message).encode() + b"\n")
+        self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class TypingDaemon:
+    """
+    Runs typing jobs from a Unix socket in one warm process.
+
+    Parameters
+    ----------
+    socket_path :
+        Where to listen (default :func:`default_socket_path`).
+    cache :
+        Optional ``CompileCache`` consulted before compiling a script.
+    display :
+        X display for GUI jobs and the warm editor (default ``$DISPLAY``).
+    """
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = None,
+        cache=None,
+        display: Optional[str] = None,
+    ) -> None:
+        from type_simulator.batch import WarmEditor
+        from type_simulator.text_typer.includes import ModuleCache
+        from type_simulator.text_typer.parser import CommandParser
+
+        self.socket_path = socket_path or default_socket_path()
+        self.cache = cache
+        self.queue = JobQueue()
+        self._parser = CommandParser()
+        self._includes = ModuleCache(cache)
+        self._programs: "OrderedDict[str, object]" = OrderedDict()
+        self._editor = WarmEditor(display or os.environ.get("DISPLAY"))
+        self._server: Optional[_Server] = None
+        self._runner: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------ #
+    def serve_forever(self) -> None:
+        """Listen and run jobs until a ``shutdown`` request or SIGINT."""
+        self.start()
+        try:
+            self._server.serve_forever()
+        finally:
+            self.close()
+
+    def start(self) -> None:
+        """Bind the socket and start the job runner."""
+        _claim_socket(self.socket_path)
+        old_umask = os.umask(0o177)  # the socket is for this user only
+        try:
+            self._server = _Server(self.socket_path, _Handler)
+        finally:
+            os.umask(old_umask)
+        self._server.typing_daemon = self
+        self._warm_up()
+        self._runner = threading.Thread(
+            target=self._run_jobs, name="typing-daemon-runner", daemon=True
+        )
+        self._runner.start()
+        logger.info("Typing daemon listening on %s", self.socket_path)
+
+    def shutdown(self) -> None:
+        """Stop accepting requests; serve_forever then returns."""
+        if self._server is not None:
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+    def close(self) -> None:
+        """Cancel the remaining jobs and release the socket and editor."""
+        for record in self.queue.close():
+            record.cancel_requested.set()
+            self.queue.finish(record, CANCELLED, "daemon shut down")
+        for record in self.queue.records():
+            if record.state == RUNNING:
+                record.cancel_requested.set()
+        if self._runner is not None:
+            self._runner.join(timeout=10)
+        if self._server is not None:
+            self._server.server_close()
+            self._server = None
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+        self._editor.close()
+
+    # ------------------------------------------------------------------ #
+    def handle(self, req: dict, send: Callable[[dict], None]) -> None:
+        """Answer one request through *send*."""
+        op = req.get("op")
+        if op == "submit":
+            self._submit(req, send)
+        elif op == "status":
+            if req.get("id") is not None:
+                send({"ok": True, "job": self.queue.get(str(req["id"])).status()})
+            else:
+                jobs = [r.status() for r in self.queue.records()]
+                send({"ok": True, "jobs": jobs})
+        elif op == "cancel":
+            record = self.queue.cancel(str(req.get("id")))
+            send({"ok": True, "job": record.status()})
+        elif op == "ping":
+            send({"ok": True, "pid": os.getpid()})
+        elif op == "shutdown":
+            send({"ok": True})
+            self.shutdown()
+        else:
+            raise ValueError(f"unknown op {op!r}")
+
+    def _submit(self, req: dict, send: Callable[[dict], None]) -> None:
+        job = req.get("job")
+        if not isinstance(job, dict):
+            raise ValueError("'job' must be a JSON object")
+        if not req.get("follow", True):
+            record = self.queue.submit(job, req.get("priority", 0))
+            send({"ok": True, "id": record.id})
+            return
+        events: "queue.Queue[dict]" = queue.Queue()
+        record = self.queue.submit(job, req.get("priority", 0), events.put)
+        send({"ok": True, "id": record.id})
+        while True:
+            event = events.get()
+            try:
+                send(event)
+            except OSError:
+                logger.debug("Client of job %s went away", record.id)
+                return
+            if event["event"] == "finished":
+                return
+
+    # ------------------------------------------------------------------ #
+    def _warm_up(self) -> None:
+        """Import the GUI stack and probe the clipboard before the first job."""
+        if not os.environ.get("DISPLAY"):
+            return
+        start = time.perf_counter()
+        try:
+            import pyautogui  # noqa: F401
+
+            from type_simulator.text_typer.__main__ import _probe_clipboard
+
+            _probe_clipboard()
+        except Exception as e:
+            logger.warning("Could not warm up the GUI stack: %s", e)
+            return
+        logger.info("GUI stack warm in %.0f ms", (time.perf_counter() - start) * 1e3)
+
+    def _run_jobs(self) -> None:
+        while True:
+            record = self.queue.next()
+            if record is None:
+                return
+            self._run(record)
+
+    def _run(self, record: JobRecord) -> None:
+        from contextlib import nullcontext
+
+        from type_simulator.batch import read_input
+        from type_simulator.text_typer.analyzer import estimate
+        from type_simulator.type_simulator import TypeSimulator
+
+        job = record.job
+        last = [0.0]
+
+        def progress(tokens: int) -> None:
+            record.tokens = tokens
+            if record.cancel_requested.is_set():
+                raise JobCancelled()
+            now = time.monotonic()
+            if now - last[0] >= PROGRESS_INTERVAL:
+                last[0] = now
+                self.queue.publish(
+                    record,
+                    {
+                        "event": "progress",
+                        "tokens": tokens,
+                        "seconds": round(time.time() - record.started, 3),
+                        "estimate": round(record.estimate, 3),
+                    },
+                )
+
+        try:
+            text, source = read_input(job)
+            program = self._compile(text, source)
+            speed, variance = job.typing_params()
+            record.estimate = estimate(
+                program.tokens(), speed, variance
+            ).expected_seconds
+            lease = self._editor.lease(job)
+            with lease if lease is not None else nullcontext():
+                TypeSimulator(
+                    file_path=job.output,
+                    text=text,
+                    mode=job.mode,
+                    editor_cmd=job.editor,
+                    typing_speed=speed,
+                    typing_variance=variance,
+                    wait=job.wait,
+                    source_path=source,
+                    program=program,
+                    editor_lease=lease,
+                    progress=progress,
+                ).run()
+        except Exception as e:
+            if record.cancel_requested.is_set():
+                logger.info("Job %s cancelled", record.id)
+                self.queue.finish(record, CANCELLED)
+            else:
+                error = str(e) or type(e).__name__
+                logger.error("Job %s failed: %s", record.id, error)
+                self.queue.finish(record, FAILED, error)
+            return
+        self.queue.finish(record, DONE)
+
+    def _compile(self, text: str, source: Optional[str]):
+        from type_simulator.text_typer.program import Program
+
+        program = self._programs.pop(text, None)
+        if program is None:
+            if self.cache is not None:
+                program = self.cache.get_or_compile(self._parser, text)
+            else:
+                program = Program.compile(self._parser.parse(text))
+        self._programs[text] = program
+        while len(self._programs) > PROGRAM_CACHE:
+            self._programs.popitem(last=False)
+        if program.has_includes:
+            # Resolved per job: ModuleCache re-reads included files that
+            # changed since the last job, relative to this job's source
+            resolved = self._includes.resolve(program.tokens(), source=source)
+            program = Program.compile(resolved)
+        return program
+
+
+def _claim_socket(path: str) -> None:
+    """Remove a stale socket file; refuse if a daemon still answers on it."""
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        os.unlink(path)
+    else:
+        raise RuntimeError(f"A daemon is already listening on {path}")
+    finally:
+        probe.close()
+
+
+def serve(socket_path: Optional[str] = None, cache=None) -> None:
+    """Run a daemon in the foreground until shut down."""
+    # Scripts come over the socket; keeps TypeSimulator from reading stdin
+    sys.stdin.close()
+    TypingDaemon(socket_path, cache).serve_forever()
@@ -6,16 +6,26 @@ import subprocess
 import time
 from typing import Optional
 
+from type_simulator.window_ready import READY_TIMEOUT, WindowWatcher, rule_for
+from utils import timing
+
 
 class EditorManager:
     """
-    Launches the editor in an xterm window and focuses it (best-effort).
+    Launches the editor in an xterm window and waits until it is ready.
+
+    Readiness is observed on the X server (see :mod:`window_ready`): the
+    window is mapped, focused and, for editors that retitle it, shows the
+    file name.  Without a reachable X server it falls back to fixed sleeps.
     """
 
     DEFAULT_CMD = 'xterm -fa "Monospace" -fs 10 -e vi'
 
-    def __init__(self, editor_cmd: Optional[str] = None):
+    def __init__(
+        self, editor_cmd: Optional[str] = None, ready_timeout: float = READY_TIMEOUT
+    ):
         self.editor_cmd = editor_cmd or self.DEFAULT_CMD
+        self.ready_timeout = ready_timeout
 
     # ------------------------------------------------------------------ #
     def open_editor(
@@ -27,12 +37,47 @@ class EditorManager:
         # stringify every element for neat logging
         logging.info("Launching editor: %s", " ".join(map(str, cmd)))
 
+        name = os.path.basename(str(file_path))
+        watcher = self._watcher()
+        start = time.perf_counter()
         proc = subprocess.Popen(cmd)
-        time.sleep(2)  # allow the window to appear
+        if watcher is None:
+            time.sleep(2)  # allow the window to appear
+            self._focus_window(name)
+            return proc
 
-        self._focus_window(os.path.basename(str(file_path)))
+        try:
+            window = watcher.wait_ready(
+                pid=proc.pid,
+                name=name,
+                rule=rule_for(self.editor_cmd),
+                timeout=self.ready_timeout,
+            )
+        except BaseException:
+            proc.terminate()
+            raise
+        finally:
+            watcher.close()
+        seconds = time.perf_counter() - start
+        timing.record("editor ready", seconds)
+        logging.info(
+            "Editor window 0x%x (%r) ready in %.0f ms",
+            window.window_id,
+            window.title,
+            seconds * 1e3,
+        )
         return proc
 
+    # ------------------------------------------------------------------ #
+    @staticmethod
+    def _watcher() -> Optional[WindowWatcher]:
+        """Subscribe to the X server before launching, if it is reachable."""
+        try:
+            return WindowWatcher()
+        except Exception as exc:  # noqa: BLE001 - no Xlib, no $DISPLAY, ...
+            logging.debug("Cannot watch X windows (%s); using fixed sleeps", exc)
+            return None
+
     # ------------------------------------------------------------------ #
     @staticmethod
     def _focus_window(window_name: str) -> None:
@@ -0,0 +1,334 @@
+# src/type_simulator/editor_pool.py
+"""
+Warm pool of editor windows.
+
+Launching ``xterm -e vi`` (and an X server for it) for every run costs
+seconds.  EditorPool keeps K slots ready, each an idle vi/vim window on
+its own display with an XTEST keyboard bound to that display.  A run
+leases a slot, which is retargeted to the output file with ``:e!``; the
+run saves with ``:w`` instead of quitting, and on release the slot is
+wiped back to an empty buffer.  Slots whose editor or server died, or
+that have served ``max_uses`` runs, are relaunched::
+
+    with EditorPool(size=4) as pool:
+        with pool.lease() as lease:
+            TypeSimulator(path, text, editor_lease=lease).run()
+"""
+
+import logging
+import os
+import queue
+import shlex
+import subprocess
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+
+from type_simulator.editor_manager import EditorManager
+from type_simulator.window_ready import WindowWatcher, rule_for
+from utils.inotify import PathWatch
+from type_simulator.xvfb import DEFAULT_SCREEN, XvfbDisplay
+
+logger = logging.getLogger(__name__)
+
+# Runs served by one editor process before it is relaunched
+MAX_USES = 100
+# Seconds to wait for a new editor window to be mapped and focused
+LAUNCH_TIMEOUT = 10.0
+# Seconds to wait for ``:w`` to reach the file
+SAVE_TIMEOUT = 5.0
+# Stat polling interval where inotify is unavailable
+SAVE_POLL = 0.005
+# Interval for checking the editor is alive while waiting for the save event
+HEALTH_POLL = 0.1
+
+# Characters vim's fnameescape() protects in file names
+_VIM_SPECIAL = set(" \t\n*?[{`$\\%#'\"|!<")
+
+
+def vim_escape(path: str) -> str:
+    """Escape *path* for use in a vim ex command line."""
+    return "".join("\\" + ch if ch in _VIM_SPECIAL else ch for ch in path)
+
+
+def is_vim(editor_cmd: str) -> bool:
+    """Whether *editor_cmd* runs vi or vim (the editors the pool can drive)."""
+    return any(
+        os.path.basename(word) in ("vi", "vim", "nvim")
+        for word in shlex.split(editor_cmd)
+    )
+
+
+class EditorSlot:
+    """
+    One pooled editor window.  ``backend`` is a keyboard bound to the slot's
+    display, for typing into the editor while it is leased.
+    """
+
+    def __init__(
+        self,
+        index: int,
+        editor_cmd: str,
+        display: Optional[str],
+        screen: str,
+        backend_factory: Callable,
+    ) -> None:
+        self.index = index
+        self.editor_cmd = editor_cmd
+        self._screen = screen
+        self._backend_factory = backend_factory
+        # Displays handed in are not ours to restart
+        self._own_server = display is None
+        self.server: Optional[XvfbDisplay] = None
+        self.display = display
+        self.proc: Optional[subprocess.Popen] = None
+        self.backend = None
+        self.uses = 0
+        self.path: Optional[Path] = None
+        self.launch()
+
+    # ------------------------------------------------------------------ #
+    def launch(self) -> None:
+        """(Re)start the server if it is ours and dead, then the editor."""
+        self.stop_editor()
+        if self._own_server and (self.server is None or not self.server.alive()):
+            self.server = XvfbDisplay(self._screen)
+            self.display = self.server.name
+            self._close_backend()
+        env = dict(os.environ, DISPLAY=self.display)
+        watcher = self._watch()
+        start = time.perf_counter()
+        try:
+            self.proc = subprocess.Popen(shlex.split(self.editor_cmd), env=env)
+            watcher.wait_ready(
+                pid=self.proc.pid,
+                rule=rule_for(self.editor_cmd),
+                timeout=LAUNCH_TIMEOUT,
+            )
+        except Exception:
+            self.stop_editor()
+            raise
+        finally:
+            watcher.close()
+        if self.backend is None:
+            self.backend = self._backend_factory(self.display)
+        self.uses = 0
+        logger.info(
+            "Editor slot %d ready on %s in %.0f ms",
+            self.index,
+            self.display,
+            (time.perf_counter() - start) * 1e3,
+        )
+
+    def healthy(self) -> bool:
+        server_ok = self.server is None or self.server.alive()
+        return server_ok and self.proc is not None and self.proc.poll() is None
+
+    def open(self, path) -> None:
+        """Point the editor at *path*, discarding whatever it showed before."""
+        self.path = Path(path)
+        self._ex(f"e! {vim_escape(str(self.path))}")
+
+    def save(self, timeout: float = SAVE_TIMEOUT) -> bool:
+        """Write the buffer with ``:w``; True once the file has been written."""
+        path = self.path
+        before = _stat(path)
+        try:
+            watch = PathWatch(path)
+        except OSError:
+            watch = None
+        try:
+            self._ex("w!")
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                if watch is not None:
+                    remaining = deadline - time.monotonic()
+                    events = watch.read(max(0.0, min(remaining, HEALTH_POLL)))
+                    if any(e.saves and watch.is_target(e) for e in events):
+                        return True
+                elif _stat(path) != before:
+                    return True
+                else:
+                    time.sleep(SAVE_POLL)
+                if not self.healthy():
+                    break
+        finally:
+            if watch is not None:
+                watch.close()
+        logger.warning("Editor slot %d did not save %s in time", self.index, path)
+        return False
+
+    def reset(self) -> None:
+        """Drop all buffers, leaving an empty one (nothing is written)."""
+        self._ex("%bwipeout!")
+        self.path = None
+
+    def stop_editor(self) -> None:
+        if self.proc is not None and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+        self.proc = None
+
+    def close(self) -> None:
+        self.stop_editor()
+        self._close_backend()
+        if self.server is not None:
+            self.server.stop()
+
+    # ------------------------------------------------------------------ #
+    def _ex(self, command: str) -> None:
+        self.backend.press("esc")
+        self.backend.write(f":{command}\n")
+
+    def _watch(self) -> WindowWatcher:
+        # Subscribed before the editor starts, so its window cannot be missed
+        return WindowWatcher(self.display)
+
+    def _close_backend(self) -> None:
+        close = getattr(self.backend, "close", None)
+        if close is not None:
+            try:
+                close()
+            except Exception:
+                logger.debug("Closing the slot keyboard failed", exc_info=True)
+        self.backend = None
+
+
+def _stat(path: Optional[Path]):
+    try:
+        st = path.stat()
+        return st.st_mtime_ns, st.st_size, st.st_ino
+    except (OSError, AttributeError):
+        return None
+
+
+def _xtest_backend(display: str):
+    from type_simulator.text_typer.xtest_backend import XTestBackend
+
+    return XTestBackend(display)
+
+
+class EditorLease:
+    """A slot lent to one run; releases the slot when the ``with`` ends."""
+
+    def __init__(self, pool: "EditorPool", slot: EditorSlot) -> None:
+        self.pool = pool
+        self.slot = slot
+        self.failed = False
+
+    @property
+    def backend(self):
+        return self.slot.backend
+
+    @property
+    def proc(self) -> subprocess.Popen:
+        return self.slot.proc
+
+    @property
+    def editor_cmd(self) -> str:
+        return self.slot.editor_cmd
+
+    def open(self, path) -> None:
+        self.slot.open(path)
+
+    def save(self) -> bool:
+        return self.slot.save()
+
+    def __enter__(self) -> "EditorLease":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.pool.release(self, failed=self.failed or exc_type is not None)
+
+
+class EditorPool:
+    """
+    K warm vi/vim windows, each on its own display.
+
+    Parameters
+    ----------
+    size :
+        Number of slots (ignored when *displays* is given).
+    editor_cmd :
+        Editor command; must run vi or vim.
+    displays :
+        Existing displays to host the slots, one each; by default every slot
+        starts a private Xvfb.
+    screen :
+        Geometry of the private Xvfb screens.
+    max_uses :
+        Leases after which a slot's editor is relaunched.
+    backend_factory :
+        Builds the keyboard for a display name (default: XTestBackend).
+    """
+
+    def __init__(
+        self,
+        size: int = 1,
+        editor_cmd: str = EditorManager.DEFAULT_CMD,
+        displays: Optional[Sequence[str]] = None,
+        screen: str = DEFAULT_SCREEN,
+        max_uses: int = MAX_USES,
+        backend_factory: Callable = _xtest_backend,
+    ) -> None:
+        if not is_vim(editor_cmd):
+            raise ValueError(f"EditorPool can only drive vi/vim, not {editor_cmd!r}")
+        self.editor_cmd = editor_cmd
+        self.max_uses = max_uses
+        hosts = list(displays) if displays else [None] * size
+        self.slots: List[EditorSlot] = []
+        self._idle: "queue.Queue[EditorSlot]" = queue.Queue()
+        try:
+            for i, display in enumerate(hosts):
+                slot = EditorSlot(i, editor_cmd, display, screen, backend_factory)
+                self.slots.append(slot)
+                self._idle.put(slot)
+        except BaseException:
+            self.close()
+            raise
+
+    def lease(self, timeout: Optional[float] = None) -> EditorLease:
+        """
+        Take an idle slot, waiting up to *timeout* seconds for one.  A slot
+        that died while idle is relaunched first.
+        """
+        try:
+            slot = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("No idle editor in the pool") from None
+        if not slot.healthy():
+            logger.info("Editor slot %d died while idle; relaunching", slot.index)
+            try:
+                slot.launch()
+            except BaseException:
+                self._idle.put(slot)
+                raise
+        slot.uses += 1
+        return EditorLease(self, slot)
+
+    def release(self, lease: EditorLease, failed: bool = False) -> None:
+        """Return a slot clean, relaunching it if it is worn out or broken."""
+        slot = lease.slot
+        try:
+            if failed or not slot.healthy() or slot.uses >= self.max_uses:
+                slot.launch()
+            else:
+                slot.reset()
+        except Exception:
+            logger.exception("Could not recycle editor slot %d", slot.index)
+        self._idle.put(slot)
+
+    def close(self) -> None:
+        for slot in self.slots:
+            slot.close()
+        self.slots = []
+
+    def __enter__(self) -> "EditorPool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
@@ -2,8 +2,126 @@
 from __future__ import annotations
 
 import logging
+import os
+import tempfile
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
+
+# Bytes buffered by AtomicWriter before a write to the temp file
+BUFFER_SIZE = 1 << 20
+
+
+class AtomicWriter:
+    """
+    Text sink that replaces *path* atomically.
+
+    Text is written through a buffered stream to a temporary file in the
+    target's directory; :meth:`commit` renames it over the target, so
+    readers (and a crash) only ever see the old or the complete new file.
+    Use as a context manager: the file is committed when the block exits
+    normally and discarded when it raises.
+
+    Parameters
+    ----------
+    path :
+        Target file.
+    fsync :
+        When *True*, flush the data and the directory entry to disk before
+        returning from :meth:`commit`.
+    encoding :
+        Text encoding of the written file.
+    buffer_size :
+        Size of the write buffer in bytes.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        fsync: bool = False,
+        encoding: str = "utf-8",
+        buffer_size: int = BUFFER_SIZE,
+    ) -> None:
+        self.path = Path(path)
+        self.fsync = fsync
+        self.written = 0  # characters in the temp file
+        fd, tmp = tempfile.mkstemp(
+            dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp"
+        )
+        self._tmp = Path(tmp)
+        self._fh = os.fdopen(
+            fd, "w+", encoding=encoding, newline="", buffering=buffer_size
+        )
+
+    def write(self, text: str) -> int:
+        self._fh.write(text)
+        self.written += len(text)
+        return len(text)
+
+    def getvalue(self) -> str:
+        """Everything written so far (read back from the temp file)."""
+        return "".join(self.chunks())
+
+    def chunks(self, size: int = BUFFER_SIZE) -> Iterator[str]:
+        """Everything written so far, read back in pieces of *size* characters."""
+        fh = self._fh
+        fh.flush()
+        fh.seek(0)
+        try:
+            while True:
+                chunk = fh.read(size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            fh.seek(0, os.SEEK_END)
+
+    def discard(self) -> None:
+        """Drop everything written so far."""
+        self._fh.seek(0)
+        self._fh.truncate()
+        self.written = 0
+
+    def commit(self) -> None:
+        """Close the temp file and move it over the target."""
+        fh = self._fh
+        fh.flush()
+        if self.fsync:
+            os.fsync(fh.fileno())
+        fh.close()
+        try:
+            mode = self.path.stat().st_mode & 0o7777
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(self._tmp, mode)  # mkstemp creates the file as 0600
+        os.replace(self._tmp, self.path)
+        if self.fsync and hasattr(os, "O_DIRECTORY"):
+            dir_fd = os.open(self.path.parent, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        logging.debug("Wrote %d characters to %s", self.written, self.path)
+
+    def abort(self) -> None:
+        """Close and delete the temp file, leaving the target untouched."""
+        self._fh.close()
+        self._tmp.unlink(missing_ok=True)
+
+    def __enter__(self) -> "AtomicWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            try:
+                self.commit()
+            except BaseException:
+                self.abort()
+                raise
+        else:
+            self.abort()
 
 
 class FileManager:
@@ -56,12 +174,26 @@ class FileManager:
         logging.debug("Loaded %d characters from %s", len(data), path)
         return data
 
-    def save_text(self, data: str, *, encoding: str = "utf-8") -> None:
-        """Write *data* to the file, overwriting any existing content."""
-        path = self._assert_path()
-        with path.open("w", encoding=encoding) as fh:
-            fh.write(data)
-        logging.debug("Wrote %d characters to %s", len(data), path)
+    def save_text(
+        self, data: str, *, encoding: str = "utf-8", fsync: bool = False
+    ) -> None:
+        """Atomically replace the file's content with *data*."""
+        self._assert_path()
+        with self.open_atomic(encoding=encoding, fsync=fsync) as out:
+            out.write(data)
+
+    def open_atomic(
+        self, *, encoding: str = "utf-8", fsync: bool = False
+    ) -> AtomicWriter:
+        """
+        Open an :class:`AtomicWriter` that replaces the file when its
+        ``with`` block completes, for output produced incrementally.
+        """
+        path = self.file_path
+        if not path:
+            raise FileNotFoundError("File path has not been set.")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return AtomicWriter(path, fsync=fsync, encoding=encoding)
 
     # ------------------------------------------------------------------ #
     # Internal utilities
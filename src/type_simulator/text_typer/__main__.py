@@ -1,54 +1,204 @@
+import io
 import os
+import atexit
 import logging
+import threading
+from typing import Callable, Iterable, List, Optional, TextIO, Union
 
 from type_simulator.text_typer.clipboard import (
     PyperclipClipboard,
     PlatformClipboard,
     TkClipboard,
+    XSelectionClipboard,
 )
+from type_simulator.text_typer.analyzer import CostEstimate, estimate
+from type_simulator.text_typer.cache import CompileCache
+from type_simulator.text_typer.includes import ModuleCache
+from type_simulator.text_typer.optimizer import Optimizer, count_tokens
 from type_simulator.text_typer.parser import CommandParser
-from type_simulator.text_typer.token import Token
+from type_simulator.text_typer.program import OP_END, OP_LOOP, Program
+from type_simulator.text_typer.routing import select_routes
+from type_simulator.text_typer.scheduler import DeadlineScheduler
+from type_simulator.text_typer.token import PASTE_RUN_LIMIT, RepeatToken, Token
+from utils import timing
 
 logger = logging.getLogger(__name__)
 
 
-# ─────────────────────────── Typist ───────────────────────────
-class Typist:
-    def __init__(
-        self, typing_speed=0.15, typing_variance=0.05, backend=None, strict=False
-    ):
-        self.typing_speed, self.typing_variance = typing_speed, typing_variance
-        if backend is None:
-            if "DISPLAY" not in os.environ and os.name != "nt":
-                raise RuntimeError("No DISPLAY; use Xvfb or supply backend")
-            import pyautogui as pg
+# Marks a lazily resolved value that has not been looked up yet
+_UNSET = object()
+_process_clipboard = _UNSET
+_process_pynput = _UNSET
 
-            backend = pg
-        self.backend = backend
-        # clipboard: try pyperclip, platform, tk
-        self.clipboard = None
-        for strat in (PyperclipClipboard, PlatformClipboard, TkClipboard):
+
+def _probe_clipboard():
+    """
+    Try in-process X selection, pyperclip, platform, tk; memoized.  The X
+    selection owner hands its text to xclip/xsel at exit, so the clipboard
+    outlives the process as it does with the tool-based strategies.
+    """
+    global _process_clipboard
+    if _process_clipboard is _UNSET:
+        _process_clipboard = None
+        for strat in (
+            XSelectionClipboard,
+            PyperclipClipboard,
+            PlatformClipboard,
+            TkClipboard,
+        ):
             try:
-                self.clipboard = strat()
+                if strat is XSelectionClipboard:
+                    _process_clipboard = strat(persist=True)
+                    atexit.register(_process_clipboard.close)
+                else:
+                    _process_clipboard = strat()
                 logger.info("Using %s clipboard", strat.__name__)
                 break
             except Exception as e:
                 logger.debug("%s unavailable: %s", strat.__name__, e)
+    return _process_clipboard
+
+
+def _probe_pynput():
+    """Create the pynput keyboard controller once per process."""
+    global _process_pynput
+    if _process_pynput is _UNSET:
         try:
             from pynput.keyboard import Controller as PC
 
-            self.pynput = PC()
+            _process_pynput = PC()
             logger.info("Using pynput")
         except Exception:
-            self.pynput = None
+            _process_pynput = None
+    return _process_pynput
+
+
+# ─────────────────────────── Typist ───────────────────────────
+class Typist:
+    def __init__(
+        self,
+        typing_speed=0.15,
+        typing_variance=0.05,
+        backend=None,
+        strict=False,
+        paste_run_limit=PASTE_RUN_LIMIT,
+        input_backend=None,
+        progress: Optional[Callable[[int], None]] = None,
+    ):
+        self.typing_speed, self.typing_variance = typing_speed, typing_variance
+        # Most problematic characters sent with one selection copy + paste
+        self.paste_run_limit = paste_run_limit
+        if backend is None:
+            if "DISPLAY" not in os.environ and os.name != "nt":
+                raise RuntimeError("No DISPLAY; use Xvfb or supply backend")
+            from type_simulator.text_typer.pyautogui_backend import (
+                PyAutoGUIBackend,
+            )
+
+            backend = PyAutoGUIBackend()
+        self.backend = backend
+        # Clipboard and pynput are resolved on first access (see properties)
+        self._clipboard = _UNSET
+        self._pynput = _UNSET
         self.strict = strict
+        # Absolute-deadline timing for every key event and wait; a backend
+        # with its own (virtual) clock is timed on that clock, without spinning
+        clock = getattr(backend, "clock", None)
+        if clock is None:
+            self.scheduler = DeadlineScheduler()
+        else:
+            self.scheduler = DeadlineScheduler(
+                spin_ns=0, clock=clock.monotonic_ns, sleep=clock.sleep
+            )
+        # None keeps the fixed fallback chain; "auto" ranks the input paths
+        # on first use, any other routing.METHODS name forces that path
+        self.input_backend = input_backend
+        self.routes = None
+        # Called with the number of tokens run so far after each token; an
+        # exception it raises stops the run (used to cancel daemon jobs)
+        self.progress = progress
+
+    @property
+    def clipboard(self):
+        """First working clipboard strategy, or None; probed once per process."""
+        if self._clipboard is _UNSET:
+            self._clipboard = _probe_clipboard()
+        return self._clipboard
+
+    @clipboard.setter
+    def clipboard(self, value) -> None:
+        self._clipboard = value
+
+    @property
+    def pynput(self):
+        """pynput keyboard controller, or None; created once per process."""
+        if self._pynput is _UNSET:
+            self._pynput = _probe_pynput()
+        return self._pynput
+
+    @pynput.setter
+    def pynput(self, value) -> None:
+        self._pynput = value
 
-    def execute(self, toks: list[Token]):
+    def _prepare(self) -> None:
+        self.scheduler.reset()
+        if self.input_backend is not None and self.routes is None:
+            self.routes = select_routes(self, self.input_backend)
+            logger.info("Input paths: %s", self.routes)
+        timing.milestone("first keystroke")
+
+    def execute(self, toks: Union[Program, Iterable[Token]]) -> int:
+        """Execute tokens as they arrive; *toks* may be a lazy iterator."""
+        if isinstance(toks, Program):
+            return self.run_program(toks)
+        self._prepare()
+        count = 0
         for t in toks:
+            # A REPEAT counts the tokens its iterations run, as in run_program
+            count += count_tokens([t])[1] if isinstance(t, RepeatToken) else 1
             try:
                 t.execute(self)
             except Exception as e:
                 logger.error("Token exec error: %s", e)
+            if self.progress is not None:
+                self.progress(count)
+        return count
+
+    def run_program(self, program: Program) -> int:
+        """
+        Interpret compiled bytecode.  Each non-loop instruction is decoded
+        into a transient token and executed; LOOP/END drive a counter stack.
+        """
+        self._prepare()
+        opcodes, operands = program.opcodes, program.operands
+        loops = []  # [remaining iterations, pc of the first body instruction]
+        count = 0
+        pc, end = 0, len(opcodes)
+        while pc < end:
+            op = opcodes[pc]
+            if op == OP_LOOP:
+                end_pc = operands[pc]
+                if operands[end_pc] <= 0:
+                    pc = end_pc + 1
+                    continue
+                loops.append([operands[end_pc], pc + 1])
+            elif op == OP_END:
+                top = loops[-1]
+                top[0] -= 1
+                if top[0] > 0:
+                    pc = top[1]
+                    continue
+                loops.pop()
+            else:
+                count += 1
+                try:
+                    program.token_at(pc).execute(self)
+                except Exception as e:
+                    logger.error("Token exec error: %s", e)
+                if self.progress is not None:
+                    self.progress(count)
+            pc += 1
+        return count
 
 
 # ─────────────────────────── Facade ───────────────────────────
@@ -60,18 +210,141 @@ class TextTyper:
         typing_variance=0.05,
         backend=None,
         strict=False,
+        cache: Optional[CompileCache] = None,
+        optimizer: Optional[Optimizer] = None,
+        source_path: Optional[Union[str, os.PathLike]] = None,
+        includes: Optional[ModuleCache] = None,
+        paste_run_limit: int = PASTE_RUN_LIMIT,
+        input_backend: Optional[str] = None,
+        program: Optional[Program] = None,
+        progress: Optional[Callable[[int], None]] = None,
     ):
         self.text = text
         self.typing_speed = typing_speed
         self.typing_variance = typing_variance
         self.backend = backend
         self.strict = strict
+        self.cache = cache
+        self.optimizer = optimizer
+        # File the text was read from; anchors relative {INCLUDE} paths
+        self.source_path = source_path
+        if includes is None:
+            includes = ModuleCache(cache, strict)
+        self.includes = includes
+        # A precompiled program (e.g. shared by a batch run) replaces parsing
+        self._program: Optional[Program] = program
+        # (text, cache entry or None) of the last compile cache lookup
+        self._cache_hit: Optional[tuple] = None
         self._parser = CommandParser(strict)
-        self._typist = Typist(typing_speed, typing_variance, backend, strict)
+        with timing.phase("backend init"):
+            self._typist = Typist(
+                typing_speed,
+                typing_variance,
+                backend,
+                strict,
+                paste_run_limit,
+                input_backend,
+                progress,
+            )
         if self.backend is None:
             self.backend = self._typist.backend
 
-    def simulate_typing(self):
-        toks = self._parser.parse(self.text)
-        logger.info("Parsed %d tokens", len(toks))
-        self._typist.execute(toks)
+    def estimate(self) -> CostEstimate:
+        """Statically estimate the duration and keystrokes of ``self.text``."""
+        if self.compiled:
+            toks = self.program().tokens()
+        else:
+            toks = self.tokens()
+        return estimate(toks, self.typing_speed, self.typing_variance)
+
+    @property
+    def compiled(self) -> bool:
+        """
+        Whether typing runs the compiled program rather than a token stream:
+        with a precompiled program, an optimizer, or a compile cache entry
+        for the text.  On a cache miss the text is streamed instead.
+        """
+        return (
+            self._program is not None
+            or self.optimizer is not None
+            or self._cached() is not None
+        )
+
+    def _cached(self) -> Optional[Program]:
+        """The compile cache entry for ``self.text``, looked up once."""
+        if self.cache is None:
+            return None
+        if self._cache_hit is None or self._cache_hit[0] is not self.text:
+            key = self.cache.key(self.text, self.strict)
+            self._cache_hit = (self.text, self.cache.load(key))
+        return self._cache_hit[1]
+
+    def tokens(self) -> List[Token]:
+        """Parse ``self.text``, splice in includes and run the optimizer."""
+        with timing.phase("parse"):
+            return self._tokens()
+
+    def _tokens(self) -> List[Token]:
+        if self.cache is not None:
+            toks = self.cache.get_or_compile(self._parser, self.text).tokens()
+        else:
+            toks = self._parser.parse(self.text)
+        toks = self.includes.resolve(toks, source=self.source_path)
+        if self.optimizer is not None:
+            toks = self.optimizer.optimize(toks)
+        return toks
+
+    def program(self) -> Program:
+        """Compiled form of :meth:`tokens`, built (or loaded) once."""
+        if self._program is None:
+            if self.cache is not None and self.optimizer is None:
+                with timing.phase("parse"):
+                    program = self._cached()
+                    if program is None:
+                        program = self.cache.get_or_compile(self._parser, self.text)
+                    if program.has_includes:
+                        program = Program.compile(
+                            self.includes.resolve(
+                                program.tokens(), source=self.source_path
+                            )
+                        )
+            else:
+                program = Program.compile(self.tokens())
+            self._program = program
+        return self._program
+
+    def simulate_typing(self, stream: Optional[TextIO] = None):
+        """
+        Type ``self.text`` (or the contents of *stream*).  Tokens are parsed
+        lazily, so typing starts after the first chunk has been read.  With
+        a compile cache entry or an optimizer the whole program is loaded
+        (or compiled) up front and run as bytecode instead; on a cache miss
+        the entry is compiled in the background for the next run.
+        """
+        filler = None
+        if stream is None and self.compiled:
+            toks = self.program()
+        else:
+            if stream is None and self.cache is not None:
+                filler = threading.Thread(
+                    target=self._fill_cache, name="compile-cache", daemon=True
+                )
+                filler.start()
+            source = stream if stream is not None else io.StringIO(self.text)
+            toks = self.includes.iter_resolve(
+                self._parser.iter_parse(source), source=self.source_path
+            )
+            if self.optimizer is not None:
+                toks = self.optimizer.optimize(toks)
+        count = self._typist.execute(toks)
+        if filler is not None:
+            filler.join()
+        logger.info("Executed %d tokens", count)
+        logger.info("Timing: %s", self._typist.scheduler.stats().summary())
+
+    def _fill_cache(self) -> None:
+        """Compile ``self.text`` into the cache; runs beside streaming."""
+        try:
+            self.cache.get_or_compile(CommandParser(self.strict), self.text)
+        except Exception as e:  # the streamed run reports parse errors
+            logger.debug("Could not fill the compile cache: %s", e)
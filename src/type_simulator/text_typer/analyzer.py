@@ -0,0 +1,269 @@
+"""
+Static cost analysis of token programs.
+
+Walks a parsed token tree once and predicts how long executing it will take
+and how many keystrokes it sends, without typing anything.  REPEAT blocks are
+not expanded: a body is costed once on entry and (if it changes the typing
+speed or variables) once more in its steady state, then multiplied.
+"""
+
+import string
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from type_simulator.text_typer.token import (
+    PROBLEMATIC_CHARS,
+    KeyToken,
+    MouseClickToken,
+    MouseMoveToken,
+    RandomTextToken,
+    RepeatToken,
+    SpeedToken,
+    TextToken,
+    Token,
+    VariableToken,
+    WaitToken,
+)
+
+RANDOM_CHARSETS = {
+    "alphanumeric": string.ascii_letters + string.digits,
+    "alpha": string.ascii_letters,
+    "numeric": string.digits,
+}
+
+
+@dataclass(frozen=True)
+class CostEstimate:
+    """Predicted duration (seconds) and keystroke counts of a program."""
+
+    min_seconds: float = 0.0
+    expected_seconds: float = 0.0
+    max_seconds: float = 0.0
+    min_keystrokes: int = 0
+    max_keystrokes: int = 0
+    characters: int = 0
+
+    def __add__(self, other: "CostEstimate") -> "CostEstimate":
+        return CostEstimate(
+            self.min_seconds + other.min_seconds,
+            self.expected_seconds + other.expected_seconds,
+            self.max_seconds + other.max_seconds,
+            self.min_keystrokes + other.min_keystrokes,
+            self.max_keystrokes + other.max_keystrokes,
+            self.characters + other.characters,
+        )
+
+    def __mul__(self, n: int) -> "CostEstimate":
+        return CostEstimate(
+            self.min_seconds * n,
+            self.expected_seconds * n,
+            self.max_seconds * n,
+            self.min_keystrokes * n,
+            self.max_keystrokes * n,
+            self.characters * n,
+        )
+
+
+# (typing_speed, typing_variance, sorted variable items)
+_State = Tuple[float, float, Tuple[Tuple[str, str], ...]]
+
+
+def char_interval(speed: float, variance: float) -> Tuple[float, float, float]:
+    """
+    Return (min, expected, max) of ``max(0, speed + variance * U)`` for U
+    uniform on [-1, 1], i.e. the per-key delay TextToken draws.
+    """
+    lo, hi = speed - variance, speed + variance
+    if variance <= 0 or lo >= 0:
+        expected = max(0.0, speed)
+    elif hi <= 0:
+        expected = 0.0
+    else:
+        # Only the positive part of the uniform range contributes
+        expected = hi * hi / (4 * variance)
+    return max(0.0, lo), expected, max(0.0, hi)
+
+
+def _text_cost(text: str, speed: float, variance: float) -> CostEstimate:
+    n = len(text)
+    if not n:
+        return CostEstimate()
+    special = sum(1 for ch in text if ch in PROBLEMATIC_CHARS)
+    plain = n - special
+    lo, mid, hi = char_interval(speed, variance)
+    # Plain keys and Enter wait one drawn interval.  Problematic characters
+    # are pasted (one hotkey, one typing_speed pause) or, failing that, typed
+    # as Ctrl+Shift+U <hex> <space> with two pauses.
+    hex_keys = sum(len(f"{ord(ch):x}") + 2 for ch in text if ch in PROBLEMATIC_CHARS)
+    return CostEstimate(
+        min_seconds=plain * lo + special * speed,
+        expected_seconds=plain * mid + special * speed,
+        max_seconds=plain * hi + special * 2 * speed,
+        min_keystrokes=n,
+        max_keystrokes=plain + hex_keys,
+        characters=n,
+    )
+
+
+def _random_cost(tok: RandomTextToken, speed: float, variance: float) -> CostEstimate:
+    if tok.charset.startswith("custom:"):
+        chars = tok.charset[7:]
+    else:
+        chars = RANDOM_CHARSETS.get(tok.charset, RANDOM_CHARSETS["alphanumeric"])
+    if not chars or tok.length <= 0:
+        return CostEstimate()
+    # Cost the cheapest and the most expensive character of the charset
+    cheapest = min(chars, key=lambda c: c in PROBLEMATIC_CHARS)
+    priciest = max(chars, key=lambda c: c in PROBLEMATIC_CHARS)
+    low = _text_cost(cheapest, speed, variance) * tok.length
+    high = _text_cost(priciest, speed, variance) * tok.length
+    share = sum(1 for c in chars if c in PROBLEMATIC_CHARS) / len(chars)
+    expected = (
+        low.expected_seconds * (1 - share) + high.expected_seconds * share
+    )
+    return CostEstimate(
+        low.min_seconds,
+        expected,
+        high.max_seconds,
+        low.min_keystrokes,
+        high.max_keystrokes,
+        tok.length,
+    )
+
+
+class _Frame:
+    """A token list being walked, with its cost and state so far."""
+
+    __slots__ = ("tokens", "key", "i", "total", "speed", "variance", "variables")
+
+    def __init__(self, tokens: List[Token], key, state: _State) -> None:
+        self.tokens, self.key, self.i = tokens, key, 0
+        self.total = CostEstimate()
+        self.speed, self.variance, env = state
+        self.variables = dict(env)
+
+    def state(self) -> _State:
+        return (self.speed, self.variance, tuple(sorted(self.variables.items())))
+
+
+class CostAnalyzer:
+    """
+    Single-pass cost model for token trees.
+
+    Parameters mirror the Typist: the starting typing speed and variance.
+    """
+
+    def __init__(self, typing_speed: float = 0.15, typing_variance: float = 0.05):
+        self.typing_speed = typing_speed
+        self.typing_variance = typing_variance
+        self._memo: Dict[Tuple[int, _State], Tuple[CostEstimate, _State]] = {}
+        self._pinned: List[object] = []  # keep memoized bodies alive (ids)
+
+    def analyze(self, tokens: Iterable[Token]) -> CostEstimate:
+        """Return the cost estimate for executing *tokens* from the start."""
+        self._memo.clear()
+        self._pinned.clear()
+        state: _State = (self.typing_speed, self.typing_variance, ())
+        cost, _ = self._walk(list(tokens), state)
+        return cost
+
+    def _walk(self, tokens: List[Token], state: _State) -> Tuple[CostEstimate, _State]:
+        """
+        Cost of *tokens* from *state*.  REPEAT bodies are walked on an
+        explicit stack, so nesting depth is not bound by the recursion limit.
+        Each body is costed once on entry and, if repeated, once more in its
+        steady state (SPEED/SET assignments are absolute, so from the second
+        iteration on every pass starts and ends in the same state).
+        """
+        # (frame, REPEAT whose body is being costed, cost of its first pass)
+        stack: list = []
+        done = self._enter(tokens, state, stack)
+        while stack:
+            frame, repeat, first = stack[-1]
+            if done is not None:
+                # The body of ``repeat`` has just been costed
+                cost, after = done
+                done = None
+                if first is None and repeat.count > 1:
+                    stack[-1] = (frame, repeat, cost)
+                    done = self._enter(repeat.tokens, after, stack)
+                    continue
+                if first is not None:
+                    cost = first + cost * (repeat.count - 1)
+                frame.total += cost
+                frame.speed, frame.variance, env = after
+                frame.variables = dict(env)
+                stack[-1] = (frame, None, None)
+            body = self._scan(frame)
+            if body is not None:
+                stack[-1] = (frame, body, None)
+                done = self._enter(body.tokens, frame.state(), stack)
+                continue
+            stack.pop()
+            done = (frame.total, frame.state())
+            self._memo[frame.key] = done
+            self._pinned.append(frame.tokens)
+        return done
+
+    def _enter(self, tokens: List[Token], state: _State, stack: list):
+        """The memoized cost of *tokens*, or None after pushing a frame."""
+        key = (id(tokens), state)
+        if key in self._memo:
+            return self._memo[key]
+        stack.append((_Frame(tokens, key, state), None, None))
+        return None
+
+    @staticmethod
+    def _scan(frame: _Frame) -> Optional[RepeatToken]:
+        """Cost tokens up to the next non-empty REPEAT, which is returned."""
+        tokens = frame.tokens
+        while frame.i < len(tokens):
+            tok = tokens[frame.i]
+            frame.i += 1
+            speed, variance = frame.speed, frame.variance
+            if isinstance(tok, TextToken):
+                frame.total += _text_cost(tok.text, speed, variance)
+            elif isinstance(tok, WaitToken):
+                frame.total += CostEstimate(tok.seconds, tok.seconds, tok.seconds)
+            elif isinstance(tok, KeyToken):
+                frame.total += CostEstimate(min_keystrokes=1, max_keystrokes=1)
+            elif isinstance(tok, MouseMoveToken):
+                frame.total += CostEstimate(tok.duration, tok.duration, tok.duration)
+            elif isinstance(tok, MouseClickToken):
+                pause = tok.interval * max(0, tok.clicks - 1)
+                frame.total += CostEstimate(pause, pause, pause)
+            elif isinstance(tok, RandomTextToken):
+                frame.total += _random_cost(tok, speed, variance)
+            elif isinstance(tok, SpeedToken):
+                frame.speed = tok.speed
+                if tok.variance is not None:
+                    frame.variance = tok.variance
+            elif isinstance(tok, VariableToken):
+                if tok.action == "set":
+                    frame.variables[tok.name] = tok.value or ""
+                else:
+                    value = frame.variables.get(tok.name, "")
+                    frame.total += _text_cost(value, speed, variance)
+            elif isinstance(tok, RepeatToken) and tok.count > 0:
+                return tok
+        return None
+
+
+def estimate(
+    tokens: Iterable[Token],
+    typing_speed: float = 0.15,
+    typing_variance: float = 0.05,
+) -> CostEstimate:
+    """Convenience wrapper around :class:`CostAnalyzer`."""
+    return CostAnalyzer(typing_speed, typing_variance).analyze(tokens)
+
+
+def format_estimate(est: Optional[CostEstimate]) -> str:
+    """One-line human readable summary of an estimate."""
+    if est is None:
+        return "n/a"
+    return (
+        f"{est.expected_seconds:.2f}s expected "
+        f"({est.min_seconds:.2f}s-{est.max_seconds:.2f}s), "
+        f"{est.min_keystrokes}-{est.max_keystrokes} keystrokes"
+    )
@@ -0,0 +1,330 @@
+"""
+asyncio execution engine.
+
+:class:`Typist` blocks in ``time.sleep`` for every wait and key interval, so
+a process drives one session at a time.  :class:`AsyncTypist` runs the same
+tokens, but each token executes against a recorder that turns its backend
+and scheduler calls into a short list of operations, which are then played
+against an async *target* with every wait awaited.  Tokens therefore make
+exactly the same decisions (intervals, speed changes, variables) as under
+:class:`Typist`, deadlines follow the same :class:`DeadlineScheduler` rules,
+and one event loop can drive many sessions, each with its own display or
+pseudo-terminal::
+
+    sessions = [(AsyncTypist(PtyBackend(["vim", f]), 0.05), tokens) for f in files]
+    asyncio.run(run_sessions(sessions))
+
+Async targets implement ``write_batch``, ``press``, ``hotkey``, ``moveTo``
+and ``click`` as coroutines; :class:`AsyncAdapter` wraps a non-blocking sync
+backend such as :class:`XTestBackend` or :class:`VirtualDocument`.  Sessions
+type with key events only: paste, hex entry and pynput go through state
+shared by the whole desktop (the selection, the focused window), which
+concurrent sessions would race for.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Iterable, List, Optional, Tuple, Union
+
+from type_simulator.text_typer.program import OP_END, OP_LOOP, Program
+from type_simulator.text_typer.routing import forced_routes
+from type_simulator.text_typer.scheduler import MAX_LAG_NS, DeadlineScheduler
+from type_simulator.text_typer.token import RepeatToken, Token
+from utils import timing
+
+logger = logging.getLogger(__name__)
+
+# A recorded backend or scheduler call: (name, *arguments)
+Op = Tuple
+
+
+class AsyncDeadlineScheduler(DeadlineScheduler):
+    """
+    :class:`DeadlineScheduler` whose waits are awaited, so other sessions
+    run in the meantime.  There is no spinning: it would block the loop.
+    """
+
+    def __init__(
+        self,
+        max_lag_ns: int = MAX_LAG_NS,
+        clock: Callable[[], int] = time.monotonic_ns,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        super().__init__(0, max_lag_ns, clock, sleep)
+
+    async def asleep(self, seconds: float) -> None:
+        """Wait until ``seconds`` after the previous deadline."""
+        target = self._advance(seconds)
+        # Always yield, so sessions without delays still take turns
+        await self._sleep(max(0, target - self._clock()) / 1e9)
+        self._record(self._clock() - target)
+
+
+async def paced(
+    text: str,
+    delays,
+    send: Callable[[str], Awaitable[None]],
+    clock: Callable[[], float] = time.monotonic,
+) -> None:
+    """
+    Send *text* via *send*, waiting ``delays[i]`` after the i-th character.
+    Characters without a delay between them are sent together, and waits
+    are measured from one deadline to the next so they do not drift.
+    """
+    deadline = clock()
+    start = 0
+    for i, delay in enumerate(delays):
+        if delay <= 0 and i < len(text) - 1:
+            continue
+        await send(text[start : i + 1])
+        start = i + 1
+        deadline += delay
+        await asyncio.sleep(max(0.0, deadline - clock()))
+
+
+class AsyncAdapter:
+    """
+    Async target around a sync backend whose calls return quickly (e.g.
+    :class:`XTestBackend` on its own display, or :class:`VirtualDocument`).
+    Key intervals are awaited here instead of slept in the backend; mouse
+    moves and multi-clicks, which the backend paces itself, run in a thread.
+    """
+
+    def __init__(self, backend) -> None:
+        self.backend = backend
+
+    async def write_batch(self, text: str, delays) -> None:
+        write_batch = getattr(self.backend, "write_batch", None)
+
+        async def send(chunk: str) -> None:
+            if write_batch is not None:
+                write_batch(chunk, [0.0] * len(chunk))
+            else:
+                self.backend.write(chunk)
+
+        await paced(text, delays, send)
+
+    async def press(self, key: str) -> None:
+        self.backend.press(key)
+
+    async def hotkey(self, *keys: str) -> None:
+        self.backend.hotkey(*keys)
+
+    async def moveTo(self, x: int, y: int, duration: float = 0.0) -> None:
+        await asyncio.to_thread(self.backend.moveTo, x, y, duration=duration)
+
+    async def click(self, button: str = "left", clicks: int = 1, interval=0.0):
+        await asyncio.to_thread(
+            self.backend.click, button=button, clicks=clicks, interval=interval
+        )
+
+
+class _Recorder:
+    """
+    Executor handed to the tokens: its ``backend`` and ``scheduler`` are
+    itself and record calls as ops; every other attribute (speed, routes,
+    variables, ...) is read from and written to the AsyncTypist.
+    """
+
+    def __init__(self, typist: "AsyncTypist") -> None:
+        object.__setattr__(self, "_typist", typist)
+        object.__setattr__(self, "ops", [])
+
+    @property
+    def backend(self) -> "_Recorder":
+        return self
+
+    @property
+    def scheduler(self) -> "_Recorder":
+        return self
+
+    def __getattr__(self, name: str):
+        return getattr(self._typist, name)
+
+    def __setattr__(self, name: str, value) -> None:
+        setattr(self._typist, name, value)
+
+    def take(self) -> List[Op]:
+        ops = self.ops
+        object.__setattr__(self, "ops", [])
+        return ops
+
+    # backend
+    def write(self, message: str, interval: float = 0.0) -> None:
+        self.ops.append(("write", message, [interval] * len(message)))
+
+    def write_batch(self, text: str, delays) -> None:
+        self.ops.append(("write_batch", text, delays))
+
+    def press(self, key: str) -> None:
+        self.ops.append(("press", key))
+
+    def hotkey(self, *keys: str) -> None:
+        self.ops.append(("hotkey", keys))
+
+    def moveTo(self, x: int, y: int, duration: float = 0.0) -> None:
+        self.ops.append(("moveTo", x, y, duration))
+
+    def click(self, button: str = "left", clicks: int = 1, interval=0.0):
+        self.ops.append(("click", button, clicks, interval))
+
+    # scheduler
+    def sleep(self, seconds: float) -> None:
+        self.ops.append(("sleep", seconds))
+
+    def reserve(self, seconds: float) -> float:
+        return seconds  # booked when the write_batch op is played
+
+    def mark(self, seconds: float) -> None:
+        self.ops.append(("mark", seconds))
+
+
+class AsyncTypist:
+    """
+    Coroutine counterpart of :class:`Typist` for one session.
+
+    Parameters
+    ----------
+    target :
+        Async backend receiving the key and mouse events.
+    typing_speed, typing_variance :
+        Seconds per key and its random variation, as for :class:`Typist`.
+    scheduler :
+        Deadline scheduler; a fresh :class:`AsyncDeadlineScheduler` by
+        default.
+    """
+
+    def __init__(
+        self,
+        target,
+        typing_speed=0.15,
+        typing_variance=0.05,
+        scheduler: Optional[AsyncDeadlineScheduler] = None,
+    ):
+        self.target = target
+        self.typing_speed, self.typing_variance = typing_speed, typing_variance
+        self.scheduler = scheduler if scheduler is not None else (
+            AsyncDeadlineScheduler()
+        )
+        self.routes = forced_routes("keys")
+        self.clipboard = self.pynput = None
+        self._recorder = _Recorder(self)
+
+    async def aexecute(self, toks: Union[Program, Iterable[Token]]) -> int:
+        """Execute tokens (or a compiled program); returns the token count."""
+        if isinstance(toks, Program):
+            return await self.arun_program(toks)
+        self._prepare()
+        count = 0
+        for t in toks:
+            if isinstance(t, RepeatToken):
+                # Run nested REPEATs from bytecode instead of recursing; like
+                # run_program, count the body tokens each iteration executed
+                count += await self._interpret(Program.compile([t]))
+                continue
+            count += 1
+            try:
+                await self._run(t)
+            except Exception as e:
+                logger.error("Token exec error: %s", e)
+        return count
+
+    async def arun_program(self, program: Program) -> int:
+        """Interpret compiled bytecode, as :meth:`Typist.run_program`."""
+        self._prepare()
+        return await self._interpret(program)
+
+    def _prepare(self) -> None:
+        self.scheduler.reset()
+        timing.milestone("first keystroke")
+
+    async def _interpret(self, program: Program) -> int:
+        """Run *program* on a LOOP/END counter stack; returns the count."""
+        opcodes, operands = program.opcodes, program.operands
+        loops = []  # [remaining iterations, pc of the first body instruction]
+        count = 0
+        pc, end = 0, len(opcodes)
+        while pc < end:
+            op = opcodes[pc]
+            if op == OP_LOOP:
+                end_pc = operands[pc]
+                if operands[end_pc] <= 0:
+                    pc = end_pc + 1
+                    continue
+                loops.append([operands[end_pc], pc + 1])
+            elif op == OP_END:
+                top = loops[-1]
+                top[0] -= 1
+                if top[0] > 0:
+                    pc = top[1]
+                    continue
+                loops.pop()
+            else:
+                count += 1
+                try:
+                    await self._run(program.token_at(pc))
+                except Exception as e:
+                    logger.error("Token exec error: %s", e)
+            pc += 1
+        return count
+
+    async def _run(self, token: Token) -> None:
+        error = None
+        try:
+            token.execute(self._recorder)
+        except Exception as e:
+            error = e  # play what the token did before failing, as Typist
+        await self._play(self._recorder.take())
+        if error is not None:
+            raise error
+
+    async def _play(self, ops: List[Op]) -> None:
+        target, scheduler = self.target, self.scheduler
+        for op in ops:
+            name = op[0]
+            if name == "sleep":
+                await scheduler.asleep(op[1])
+            elif name == "mark":
+                scheduler.mark(op[1])
+            elif name == "write_batch":
+                text, delays = op[1], op[2]
+                total = sum(delays)
+                if total > 0:
+                    scale = scheduler.reserve(total) / total
+                    if scale != 1.0:
+                        delays = [d * scale for d in delays]
+                await target.write_batch(text, delays)
+            elif name == "write":
+                await target.write_batch(op[1], op[2])
+            elif name == "press":
+                await target.press(op[1])
+            elif name == "hotkey":
+                await target.hotkey(*op[1])
+            elif name == "moveTo":
+                await target.moveTo(op[1], op[2], duration=op[3])
+            elif name == "click":
+                await target.click(button=op[1], clicks=op[2], interval=op[3])
+
+
+async def run_sessions(
+    sessions: Iterable[Tuple[AsyncTypist, Union[Program, Iterable[Token]]]],
+    limit: Optional[int] = None,
+) -> List[Union[int, BaseException]]:
+    """
+    Run ``(typist, tokens)`` pairs concurrently, at most *limit* at a time.
+
+    Returns each session's token count, or the exception it failed with;
+    one failing session does not stop the others.
+    """
+    semaphore = asyncio.Semaphore(limit) if limit else None
+
+    async def run(typist: AsyncTypist, toks) -> int:
+        if semaphore is None:
+            return await typist.aexecute(toks)
+        async with semaphore:
+            return await typist.aexecute(toks)
+
+    return await asyncio.gather(
+        *(run(typist, toks) for typist, toks in sessions), return_exceptions=True
+    )
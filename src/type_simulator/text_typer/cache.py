@@ -0,0 +1,132 @@
+"""
+On-disk cache of compiled token programs.
+
+Entries hold serialised :class:`Program` bytecode and are keyed by a SHA-256
+of the source text, the parser and bytecode format versions and the strict
+flag, so any change to one of them simply misses the cache.
+The directory is bounded in size; the least recently used entries are
+evicted first (a cache hit refreshes the entry's mtime).
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Union
+
+from type_simulator.text_typer.parser import PARSER_VERSION, CommandParser
+from type_simulator.text_typer.program import FORMAT_VERSION, Program
+from type_simulator.text_typer.token import Token
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = (
+    Path(os.environ.get("XDG_CACHE_HOME", "~/.cache")).expanduser()
+    / "type_simulator"
+    / "compiled"
+)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256MB
+ENTRY_SUFFIX = ".tsc"
+
+
+class CompileCache:
+    """
+    Size-bounded LRU cache of compiled ``CommandParser.parse`` results.
+
+    Parameters
+    ----------
+    cache_dir :
+        Directory holding the entries; created on first store.
+    max_bytes :
+        Upper bound on the total size of all entries.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Union[str, Path]] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.cache_dir = (
+            Path(cache_dir).expanduser() if cache_dir else DEFAULT_CACHE_DIR
+        )
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(text: str, strict: bool = False) -> str:
+        """Return the cache key for *text* parsed with the given strictness."""
+        h = hashlib.sha256()
+        h.update(f"{PARSER_VERSION}\0{FORMAT_VERSION}\0{int(strict)}\0".encode())
+        h.update(text.encode("utf-8", "surrogatepass"))
+        return h.hexdigest()
+
+    def load(self, key: str) -> Optional[Program]:
+        """Return the cached program for *key*, or None on a miss."""
+        path = self._path(key)
+        try:
+            program = Program.from_bytes(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except Exception as e:  # corrupt or from an incompatible build
+            logger.debug("Dropping unreadable cache entry %s: %s", path, e)
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        return program
+
+    def store(self, key: str, program: Program) -> None:
+        """Persist *program* under *key*, then evict down to the size bound."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(program.to_bytes())
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def get_or_compile(self, parser: CommandParser, text: str) -> Program:
+        """Return the program for *text*, compiling and storing it on a miss."""
+        key = self.key(text, parser.strict)
+        program = self.load(key)
+        if program is not None:
+            logger.debug("Compile cache hit %s", key[:12])
+            return program
+        logger.debug("Compile cache miss %s", key[:12])
+        program = Program.compile(parser.parse(text))
+        try:
+            self.store(key, program)
+        except OSError as e:
+            logger.warning("Could not write compile cache: %s", e)
+        return program
+
+    def get_or_parse(self, parser: CommandParser, text: str) -> List[Token]:
+        """Like :meth:`get_or_compile`, but decompiled into a token list."""
+        return self.get_or_compile(parser, text).tokens()
+
+    def evict(self) -> None:
+        """Delete least recently used entries until under ``max_bytes``."""
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob(f"*{ENTRY_SUFFIX}"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, path))
+            total += st.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            logger.debug("Evicted cache entry %s", path.name)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{ENTRY_SUFFIX}"
@@ -1,7 +1,13 @@
 import os
+import queue
 import shutil
+import logging
+import threading
 import subprocess
 from abc import ABC, abstractmethod
+from typing import Optional, Sequence
+
+logger = logging.getLogger(__name__)
 
 
 # ─────────────────────── Clipboard Strategies ───────────────────────
@@ -77,3 +83,286 @@ class TkClipboard(ClipboardStrategy):
     def paste(self) -> str:
         self._tk.update()
         return self._tk.clipboard_get()
+
+
+class XSelectionClipboard(ClipboardStrategy):
+    """
+    In-process owner of X11 selections (python-xlib).
+
+    A hidden window on a persistent X connection owns the selections and a
+    daemon thread answers SelectionRequest events with the current text, so
+    ``copy`` is a memory update (plus a one-off ownership claim) instead of
+    an xclip/xsel fork per call.
+
+    Requests are answered asynchronously, so a paste triggered by a key
+    press may be served after the next ``copy``.  Callers announce each
+    paste with ``expect_paste``; ``copy`` then waits (up to *timeout*) until
+    the announced pastes have been served before replacing the text.
+
+    Text larger than one property is sent and received in INCR chunks.
+    Unlike xclip/xsel, which fork a process that keeps serving the text,
+    the selections are only owned while this process runs: ``close`` hands
+    the text to xclip or xsel when *persist* is set and one is installed,
+    otherwise the selections are empty once the process exits.
+
+    Parameters
+    ----------
+    selections :
+        Selections to own, e.g. ``("PRIMARY",)``; ``paste`` reads the first.
+    display :
+        X display name; defaults to ``$DISPLAY``.
+    timeout :
+        Seconds ``paste`` waits for another owner to answer (per chunk), and
+        ``copy`` for announced pastes to be served.
+    persist :
+        Let ``close`` hand the owned text to xclip/xsel.
+    """
+
+    def __init__(
+        self,
+        selections: Sequence[str] = ("CLIPBOARD",),
+        display: Optional[str] = None,
+        timeout: float = 1.0,
+        persist: bool = False,
+    ):
+        import Xlib.threaded  # noqa: F401  (makes the connection thread-safe)
+        from Xlib import X, Xatom
+        from Xlib import display as xdisplay
+
+        self._X = X
+        self._d = xdisplay.Display(display)
+        atom = self._d.intern_atom
+        self._names = tuple(selections)
+        self._selections = [atom(name) for name in selections]
+        self._targets = atom("TARGETS")
+        self._utf8 = atom("UTF8_STRING")
+        self._string = Xatom.STRING
+        self._text_targets = (self._utf8, Xatom.STRING, atom("TEXT"))
+        self._prop = atom("TYPE_SIMULATOR_SEL")
+        self._incr = atom("INCR")
+        self._atom_type = Xatom.ATOM
+        # Largest property a single ChangeProperty request can carry (bytes);
+        # longer text goes out in INCR chunks of this size
+        self._max_bytes = self._d.info.max_request_length * 4 - 64
+        # PropertyNotify on our own window drives incoming INCR transfers
+        self._window = self._d.screen().root.create_window(
+            0, 0, 1, 1, 0, X.CopyFromParent, event_mask=X.PropertyChangeMask
+        )
+        # Outgoing INCR transfers: (requestor id, property) -> state
+        self._transfers = {}
+        self._chunks: "queue.Queue" = queue.Queue()
+        self._persist = persist
+        self._text = ""
+        self._owned = set()
+        self._lock = threading.Lock()
+        # Announced pastes not served yet; notified as they are answered
+        self._pending = 0
+        self._served = threading.Condition(self._lock)
+        self._replies: "queue.Queue" = queue.Queue()
+        self._timeout = timeout
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._serve, name="x-selection-owner", daemon=True
+        )
+        self._thread.start()
+
+    def copy(self, text: str) -> None:
+        with self._served:
+            if not self._served.wait_for(lambda: not self._pending, self._timeout):
+                logger.debug("%d paste(s) never requested the text", self._pending)
+                self._pending = 0
+            self._text = text
+            missing = [s for s in self._selections if s not in self._owned]
+        if missing:
+            self._claim(missing)
+
+    def expect_paste(self) -> None:
+        """
+        Note that a paste of the current text was just triggered; the next
+        ``copy`` waits until a SelectionRequest for it has been answered.
+        """
+        with self._lock:
+            if self._selections[0] in self._owned:
+                self._pending += 1
+
+    def paste(self) -> str:
+        with self._lock:
+            if self._selections[0] in self._owned:
+                return self._text
+        while not self._replies.empty():
+            self._replies.get_nowait()
+        self._window.convert_selection(
+            self._selections[0], self._utf8, self._prop, self._X.CurrentTime
+        )
+        self._d.flush()
+        try:
+            prop = self._replies.get(timeout=self._timeout)
+        except queue.Empty:
+            raise RuntimeError("No answer from the selection owner")
+        if prop == self._X.NONE:
+            return ""
+        while not self._chunks.empty():
+            self._chunks.get_nowait()
+        reply = self._window.get_full_property(self._prop, self._X.AnyPropertyType)
+        # Deleting the property also asks an INCR owner for the first chunk
+        self._window.delete_property(self._prop)
+        self._d.flush()
+        if reply is not None and reply.property_type == self._incr:
+            value = self._receive_incr()
+        else:
+            value = reply.value if reply is not None else b""
+        return value.decode() if isinstance(value, bytes) else str(value)
+
+    def close(self) -> None:
+        """
+        Give up the selections and stop the event thread; with *persist*,
+        xclip or xsel takes over the text first.
+        """
+        if self._closed:
+            return
+        if self._persist:
+            self._hand_off()
+        self._closed = True
+        from Xlib.protocol import event
+
+        # Wake the thread blocked in next_event()
+        wake = event.ClientMessage(
+            window=self._window, client_type=self._prop, data=(8, bytes(20))
+        )
+        self._window.send_event(wake)
+        self._d.flush()
+        self._thread.join(timeout=self._timeout)
+        self._d.close()
+
+    # ------------------------------------------------------------------ #
+    def _hand_off(self) -> None:
+        from type_simulator.text_typer.token import _selection_tools
+
+        with self._lock:
+            text = self._text
+            owned = [
+                name
+                for name, sel in zip(self._names, self._selections)
+                if sel in self._owned
+            ]
+        for name in owned if text else ():
+            for args in _selection_tools(name.lower()):
+                try:
+                    proc = subprocess.Popen(args, stdin=subprocess.PIPE)
+                    proc.communicate(text.encode())
+                    if proc.returncode == 0:
+                        break
+                except Exception:
+                    logger.debug("%s failed, trying next tool", args[0], exc_info=True)
+            else:
+                logger.debug("%s is lost when the process exits", name)
+
+    def _receive_incr(self) -> bytes:
+        parts = []
+        while True:
+            try:
+                self._chunks.get(timeout=self._timeout)
+            except queue.Empty:
+                raise RuntimeError("INCR transfer from the selection owner stalled")
+            reply = self._window.get_full_property(
+                self._prop, self._X.AnyPropertyType
+            )
+            self._window.delete_property(self._prop)
+            self._d.flush()
+            value = reply.value if reply is not None else b""
+            if not value:
+                return b"".join(parts)
+            parts.append(value if isinstance(value, bytes) else str(value).encode())
+
+    def _claim(self, selections) -> None:
+        for sel in selections:
+            self._window.set_selection_owner(sel, self._X.CurrentTime)
+        # Round trip, so ownership is settled before the caller pastes
+        owners = {sel: self._d.get_selection_owner(sel) for sel in selections}
+        with self._lock:
+            for sel, owner in owners.items():
+                if owner == self._window:
+                    self._owned.add(sel)
+                else:
+                    logger.debug("Could not own selection atom %d", sel)
+
+    def _serve(self) -> None:
+        X = self._X
+        while not self._closed:
+            try:
+                ev = self._d.next_event()
+                if ev.type == X.SelectionRequest:
+                    self._answer(ev)
+                elif ev.type == X.SelectionClear:
+                    with self._lock:
+                        self._owned.discard(ev.atom)
+                elif ev.type == X.SelectionNotify:
+                    self._replies.put(ev.property)
+                elif ev.type == X.PropertyNotify:
+                    self._property_changed(ev)
+            except Exception:
+                if self._closed:
+                    break
+                logger.debug("X selection event failed", exc_info=True)
+
+    def _answer(self, ev) -> None:
+        from Xlib.protocol import event
+
+        X = self._X
+        prop = ev.property or ev.target  # obsolete clients send None
+        with self._served:
+            owned, text = ev.selection in self._owned, self._text
+            if owned and self._pending and ev.target in self._text_targets:
+                self._pending -= 1
+                self._served.notify_all()
+        if not owned:
+            prop = X.NONE
+        elif ev.target == self._targets:
+            targets = [self._targets, *self._text_targets]
+            ev.requestor.change_property(prop, self._atom_type, 32, targets)
+        elif ev.target == self._string:
+            data = text.encode("latin-1", "replace")
+            self._send(ev.requestor, prop, self._string, data)
+        elif ev.target in self._text_targets:
+            self._send(ev.requestor, prop, self._utf8, text.encode())
+        else:
+            prop = X.NONE
+        notify = event.SelectionNotify(
+            time=ev.time,
+            requestor=ev.requestor,
+            selection=ev.selection,
+            target=ev.target,
+            property=prop,
+        )
+        ev.requestor.send_event(notify)
+        self._d.flush()
+
+    def _send(self, requestor, prop, type_, data: bytes) -> None:
+        if len(data) <= self._max_bytes:
+            requestor.change_property(prop, type_, 8, data)
+            return
+        # INCR: announce the size, then write one chunk each time the
+        # requestor deletes the property (see _property_changed)
+        requestor.change_attributes(event_mask=self._X.PropertyChangeMask)
+        self._transfers[(requestor.id, prop)] = [requestor, type_, data, 0]
+        requestor.change_property(prop, self._incr, 32, [len(data)])
+
+    def _property_changed(self, ev) -> None:
+        X = self._X
+        if ev.window == self._window:
+            if ev.atom == self._prop and ev.state == X.PropertyNewValue:
+                self._chunks.put(ev.atom)
+            return
+        key = (ev.window.id, ev.atom)
+        if ev.state != X.PropertyDelete or key not in self._transfers:
+            return
+        requestor, type_, data, offset = self._transfers[key]
+        chunk = data[offset : offset + self._max_bytes]
+        # The empty chunk after the last one ends the transfer
+        if chunk:
+            self._transfers[key][3] = offset + len(chunk)
+        else:
+            del self._transfers[key]
+            requestor.change_attributes(event_mask=X.NoEventMask)
+        requestor.change_property(ev.atom, type_, 8, chunk)
+        self._d.flush()
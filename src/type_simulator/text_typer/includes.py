@@ -0,0 +1,156 @@
+"""
+``{INCLUDE path}`` resolution.
+
+CommandParser turns ``{INCLUDE path}`` into an IncludeToken placeholder, so a
+parsed (and cached) script only depends on its own text.  ModuleCache then
+splices the included scripts in: each file is parsed once per process (and,
+with a CompileCache, once across processes), re-read when the mtime or size
+of it or of anything it includes changes, and include cycles are rejected.
+Relative paths are resolved against the directory of the including file.
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from type_simulator.text_typer.parser import CommandParser
+from type_simulator.text_typer.token import IncludeToken, RepeatToken, Token
+
+logger = logging.getLogger(__name__)
+
+# path -> (mtime_ns, size) of every file a module was built from
+_Deps = Dict[Path, Tuple[int, int]]
+
+
+class IncludeError(ValueError):
+    """Raised for missing, unreadable or cyclic includes."""
+
+
+class ModuleCache:
+    """
+    Per-process cache of resolved include files.
+
+    Parameters
+    ----------
+    compile_cache :
+        Optional ``CompileCache`` used to share parsed files across processes.
+    strict :
+        Parse included files in strict mode.
+    """
+
+    def __init__(self, compile_cache=None, strict: bool = False) -> None:
+        self.compile_cache = compile_cache
+        self.strict = strict
+        self._modules: Dict[Path, Tuple[_Deps, List[Token]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(
+        self,
+        tokens: Iterable[Token],
+        base_dir: Optional[Union[str, Path]] = None,
+        source: Optional[Union[str, Path]] = None,
+    ) -> List[Token]:
+        """
+        Return *tokens* with every IncludeToken (also inside REPEAT bodies)
+        replaced by the included file's tokens.  *source* is the file the
+        tokens came from, if any; it anchors relative paths and takes part
+        in cycle detection.
+        """
+        chain: Tuple[Path, ...] = ()
+        if source is not None:
+            source = Path(source).resolve()
+            chain = (source,)
+            base_dir = base_dir or source.parent
+        base = Path(base_dir) if base_dir else Path.cwd()
+        return self._splice(tokens, base, chain)[0]
+
+    def iter_resolve(
+        self,
+        tokens: Iterable[Token],
+        base_dir: Optional[Union[str, Path]] = None,
+        source: Optional[Union[str, Path]] = None,
+    ) -> Iterator[Token]:
+        """Lazy :meth:`resolve` for token streams (e.g. ``iter_parse``)."""
+        for tok in tokens:
+            if isinstance(tok, (IncludeToken, RepeatToken)):
+                yield from self.resolve([tok], base_dir, source)
+            else:
+                yield tok
+
+    def load(
+        self, path: Union[str, Path], chain: Tuple[Path, ...] = ()
+    ) -> List[Token]:
+        """Return the resolved tokens of the script at *path*."""
+        return self._load(Path(path).resolve(), chain)[0]
+
+    # ------------------------------------------------------------------ #
+    def _load(
+        self, path: Path, chain: Tuple[Path, ...]
+    ) -> Tuple[List[Token], _Deps]:
+        if path in chain:
+            cycle = chain[chain.index(path) :] + (path,)
+            raise IncludeError(f"INCLUDE cycle: {' -> '.join(map(str, cycle))}")
+        entry = self._modules.get(path)
+        if entry is not None and self._fresh(entry[0]):
+            if not entry[0].keys().isdisjoint(chain):
+                raise IncludeError(f"INCLUDE cycle through {path}")
+            self.hits += 1
+            return entry[1], entry[0]
+        self.misses += 1
+
+        from utils.text_input import TextInputError, read_file
+
+        try:
+            st = path.stat()
+            text = read_file(path)
+        except (OSError, TextInputError) as e:
+            raise IncludeError(f"Cannot INCLUDE {path}: {e}") from e
+        parser = CommandParser(self.strict)
+        if self.compile_cache is not None:
+            tokens = self.compile_cache.get_or_compile(parser, text).tokens()
+        else:
+            tokens = parser.parse(text)
+        resolved, deps = self._splice(tokens, path.parent, chain + (path,))
+        deps[path] = (st.st_mtime_ns, st.st_size)
+        self._modules[path] = (deps, resolved)
+        logger.debug("Loaded include %s (%d tokens)", path, len(resolved))
+        return resolved, deps
+
+    @staticmethod
+    def _fresh(deps: _Deps) -> bool:
+        for path, (mtime_ns, size) in deps.items():
+            try:
+                st = os.stat(path)
+            except OSError:
+                return False
+            if st.st_mtime_ns != mtime_ns or st.st_size != size:
+                return False
+        return True
+
+    def _splice(
+        self, tokens: Iterable[Token], base: Path, chain: Tuple[Path, ...]
+    ) -> Tuple[List[Token], _Deps]:
+        deps: _Deps = {}
+        # Explicit stack so deeply nested REPEAT bodies need no recursion.
+        # Each frame: (iterator, spliced tokens, original RepeatToken or None)
+        stack: List[tuple] = [(iter(tokens), [], None)]
+        while True:
+            it, out, repeat = stack[-1]
+            tok = next(it, None)
+            if tok is None:
+                stack.pop()
+                level = CommandParser._merge_text_tokens(out)
+                if not stack:
+                    return level, deps
+                stack[-1][1].append(RepeatToken(repeat.count, level))
+            elif isinstance(tok, IncludeToken):
+                target = Path(tok.path).expanduser()
+                body, sub = self._load((base / target).resolve(), chain)
+                out.extend(body)
+                deps.update(sub)
+            elif isinstance(tok, RepeatToken):
+                stack.append((iter(tok.tokens), [], tok))
+            else:
+                out.append(tok)
@@ -0,0 +1,283 @@
+"""
+Optimizer passes over parsed token lists.
+
+Each pass rewrites one level of the token tree (a REPEAT body or the top
+level) without changing what gets typed; bodies are optimised before the
+block that contains them.  Passes can be switched off individually, and the
+optimizer reports how many tokens, executed token dispatches and seconds of
+estimated runtime it removed.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from type_simulator.text_typer.analyzer import estimate
+from type_simulator.text_typer.token import (
+    KeyToken,
+    MouseClickToken,
+    MouseMoveToken,
+    RepeatToken,
+    SpeedToken,
+    TextToken,
+    Token,
+    VariableToken,
+    WaitToken,
+)
+
+logger = logging.getLogger(__name__)
+
+# Longest text a REPEAT may be expanded into by the hoist_text pass
+HOIST_MAX_CHARS = 64 * 1024
+
+# Tokens whose execution does not read the typing speed
+_SPEED_NEUTRAL = (WaitToken, KeyToken, MouseMoveToken, MouseClickToken)
+
+
+def _merge_text(tokens: List[Token]) -> List[Token]:
+    out: List[Token] = []
+    run: List[str] = []
+    for tok in tokens:
+        if isinstance(tok, TextToken):
+            run.append(tok.text)
+            continue
+        if run:
+            out.append(TextToken("".join(run)))
+            run.clear()
+        out.append(tok)
+    if run:
+        out.append(TextToken("".join(run)))
+    return out
+
+
+def drop_empty_text(tokens: List[Token], top: bool) -> List[Token]:
+    """Remove empty texts and REPEAT blocks whose body ended up empty."""
+    return [
+        tok
+        for tok in tokens
+        if not (isinstance(tok, TextToken) and not tok.text)
+        and not (isinstance(tok, RepeatToken) and not tok.tokens)
+    ]
+
+
+def unwrap_repeats(tokens: List[Token], top: bool) -> List[Token]:
+    """Drop REPEAT blocks that run zero times and inline those that run once."""
+    out: List[Token] = []
+    for tok in tokens:
+        if isinstance(tok, RepeatToken) and tok.count <= 0:
+            continue
+        if isinstance(tok, RepeatToken) and tok.count == 1:
+            out.extend(tok.tokens)
+        else:
+            out.append(tok)
+    return out
+
+
+def hoist_text(tokens: List[Token], top: bool) -> List[Token]:
+    """Replace a REPEAT of constant text by the repeated text itself."""
+    out: List[Token] = []
+    for tok in tokens:
+        if (
+            isinstance(tok, RepeatToken)
+            and tok.tokens
+            and all(isinstance(t, TextToken) for t in tok.tokens)
+        ):
+            text = "".join(t.text for t in tok.tokens)
+            if len(text) * tok.count <= HOIST_MAX_CHARS:
+                out.append(TextToken(text * tok.count))
+                continue
+        out.append(tok)
+    return out
+
+
+def fold_waits(tokens: List[Token], top: bool) -> List[Token]:
+    """Sum consecutive waits into one and drop waits of zero seconds."""
+    out: List[Token] = []
+    for tok in tokens:
+        if isinstance(tok, WaitToken):
+            if out and isinstance(out[-1], WaitToken):
+                out[-1] = WaitToken(out[-1].seconds + tok.seconds)
+                continue
+            out.append(tok)
+        else:
+            if out and isinstance(out[-1], WaitToken) and out[-1].seconds <= 0:
+                out.pop()
+            out.append(tok)
+    if out and isinstance(out[-1], WaitToken) and out[-1].seconds <= 0:
+        out.pop()
+    return out
+
+
+def drop_dead_speed(tokens: List[Token], top: bool) -> List[Token]:
+    """
+    Collapse SPEED changes that are overridden before anything is typed.
+
+    A pending change is held back past tokens that never read the typing
+    speed and emitted just before the next one that might.  A trailing
+    change is kept, collapsed into one SPEED: nothing in the program reads
+    it, but it is the speed a reused Typist or TextTyper is left with.
+    """
+    out: List[Token] = []
+    pending: Optional[SpeedToken] = None
+    for tok in tokens:
+        if isinstance(tok, SpeedToken):
+            if pending is not None and tok.variance is None:
+                tok = SpeedToken(tok.speed, pending.variance)
+            pending = tok
+            continue
+        if pending is not None and not isinstance(tok, _SPEED_NEUTRAL):
+            if not (isinstance(tok, VariableToken) and tok.action == "set"):
+                out.append(pending)
+                pending = None
+        out.append(tok)
+    if pending is not None:
+        out.append(pending)
+    return out
+
+
+PASSES: Dict[str, Callable[[List[Token], bool], List[Token]]] = {
+    "drop_empty_text": drop_empty_text,
+    "unwrap_repeats": unwrap_repeats,
+    "hoist_text": hoist_text,
+    "fold_waits": fold_waits,
+    "drop_dead_speed": drop_dead_speed,
+}
+
+
+@dataclass(frozen=True)
+class OptimizationReport:
+    """Before/after figures of one optimizer run."""
+
+    passes: Tuple[str, ...]
+    tokens_before: int
+    tokens_after: int
+    dispatches_before: int
+    dispatches_after: int
+    seconds_before: float
+    seconds_after: float
+
+    @property
+    def tokens_removed(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+    @property
+    def dispatches_removed(self) -> int:
+        return self.dispatches_before - self.dispatches_after
+
+    @property
+    def seconds_removed(self) -> float:
+        # Rounded so float noise does not show up as "-0.00s"
+        return round(self.seconds_before - self.seconds_after, 9) + 0.0
+
+    def summary(self) -> str:
+        return (
+            f"removed {self.tokens_removed} of {self.tokens_before} tokens, "
+            f"{self.dispatches_removed} of {self.dispatches_before} dispatches, "
+            f"{self.seconds_removed:.2f}s of {self.seconds_before:.2f}s "
+            f"estimated runtime ({', '.join(self.passes) or 'no passes'})"
+        )
+
+
+def count_tokens(tokens: Iterable[Token]) -> Tuple[int, int]:
+    """
+    Return (tokens in the tree, token executions at run time); REPEAT
+    blocks count as one token each but are not dispatched themselves.
+    """
+    static = dynamic = 0
+    # (iterator, dispatches so far at this level, repeat count)
+    stack: List[list] = [[iter(tokens), 0, 1]]
+    while stack:
+        frame = stack[-1]
+        tok = next(frame[0], None)
+        if tok is None:
+            stack.pop()
+            runs = frame[1] * max(0, frame[2])
+            if stack:
+                stack[-1][1] += runs
+            else:
+                dynamic = runs
+            continue
+        static += 1
+        if isinstance(tok, RepeatToken):
+            stack.append([iter(tok.tokens), 0, tok.count])
+        else:
+            frame[1] += 1
+    return static, dynamic
+
+
+class Optimizer:
+    """
+    Runs the enabled passes over every level of a token tree.
+
+    Parameters
+    ----------
+    disabled :
+        Names from :data:`PASSES` to skip.
+    typing_speed, typing_variance :
+        Starting speed used to estimate the runtime for the report.
+    """
+
+    def __init__(
+        self,
+        disabled: Sequence[str] = (),
+        typing_speed: float = 0.15,
+        typing_variance: float = 0.05,
+    ) -> None:
+        unknown = set(disabled) - set(PASSES)
+        if unknown:
+            names = ", ".join(sorted(unknown))
+            raise ValueError(f"Unknown optimizer pass(es): {names}")
+        self.passes = tuple(name for name in PASSES if name not in disabled)
+        self.typing_speed = typing_speed
+        self.typing_variance = typing_variance
+        self.last_report: Optional[OptimizationReport] = None
+
+    def optimize(self, tokens: Iterable[Token]) -> List[Token]:
+        """Return an optimised copy of *tokens*; the input is not modified."""
+        tokens = list(tokens)
+        result = self._rewrite(tokens)
+        self.last_report = self._report(tokens, result)
+        logger.info("Optimizer %s", self.last_report.summary())
+        return result
+
+    def _level(self, tokens: List[Token], top: bool) -> List[Token]:
+        for name in self.passes:
+            tokens = PASSES[name](tokens, top)
+        return _merge_text(tokens)
+
+    def _rewrite(self, tokens: List[Token]) -> List[Token]:
+        # Post-order walk with an explicit stack so deep nesting is fine.
+        # Each frame: (iterator over the source level, rewritten tokens,
+        # repeat count of the block being rebuilt or None at the top).
+        stack: List[tuple] = [(iter(tokens), [], None)]
+        while True:
+            it, out, count = stack[-1]
+            tok = next(it, None)
+            if tok is None:
+                stack.pop()
+                level = self._level(out, top=not stack)
+                if not stack:
+                    return level
+                stack[-1][1].append(RepeatToken(count, level))
+            elif isinstance(tok, RepeatToken):
+                stack.append((iter(tok.tokens), [], tok.count))
+            else:
+                out.append(tok)
+
+    def _report(
+        self, before: List[Token], after: List[Token]
+    ) -> OptimizationReport:
+        static_before, dynamic_before = count_tokens(before)
+        static_after, dynamic_after = count_tokens(after)
+        speed, variance = self.typing_speed, self.typing_variance
+        seconds_before = estimate(before, speed, variance).expected_seconds
+        seconds_after = estimate(after, speed, variance).expected_seconds
+        return OptimizationReport(
+            passes=self.passes,
+            tokens_before=static_before,
+            tokens_after=static_after,
+            dispatches_before=dynamic_before,
+            dispatches_after=dynamic_after,
+            seconds_before=seconds_before,
+            seconds_after=seconds_after,
+        )
@@ -1,6 +1,6 @@
 import re
 import logging
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional, TextIO
 
 from type_simulator.text_typer.token import (
     Token,
@@ -13,10 +13,18 @@ from type_simulator.text_typer.token import (
     RandomTextToken,
     VariableToken,
     SpeedToken,
+    IncludeToken,
 )
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the token tree produced for a given input changes, so that
+# compiled-script caches built by older versions are ignored.
+PARSER_VERSION = "2"
+
+# Characters read per step by CommandParser.iter_parse
+CHUNK_SIZE = 64 * 1024
+
 
 class CommandParser:
     """
@@ -31,8 +39,9 @@ class CommandParser:
     _RE_MOUSE_MOVE = re.compile(r"MOUSE_MOVE_(?P<x>\d+)_(?P<y>\d+)$")
     _RE_MOUSE_CLICK = re.compile(r"MOUSE_CLICK_(?P<btn>\w+)$")
     _RE_SPEC = re.compile(r"<(?P<key>[^>]+)>$")
+    _RE_PLUS = re.compile(r"\s*\+\s*")
+    _RE_SPECIAL = re.compile(r"[{\\]")
     _RE_REPEAT_START = re.compile(r"REPEAT_(?P<count>\d+)$")
-    _RE_REPEAT_END = re.compile(r"/REPEAT$")
     _RE_RANDOM = re.compile(
         r"RANDOM_(?P<length>\d+)(?:_(?P<charset>alphanumeric|alpha|numeric|custom:[^\}]+))?$"
     )
@@ -41,152 +50,276 @@ class CommandParser:
     _RE_SPEED = re.compile(
         r"SPEED_(?P<speed>\d+(?:\.\d+)?)(?:_(?P<variance>\d+(?:\.\d+)?))?$"
     )
+    _RE_INCLUDE = re.compile(r"INCLUDE\s+(?P<path>.+)$")
 
     def __init__(self, strict: bool = False):
         self.strict = strict
 
     def parse(self, text: str) -> List[Token]:
-        tokens: List[Token] = []
-        buffer: List[str] = []
-        idx, length = 0, len(text)
-        repeat_stack: List[tuple] = []  # Stack of (count, start_tokens_idx)
+        return list(self._iter_tokens([text]))
+
+    def iter_parse(
+        self, stream: TextIO, chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[Token]:
+        """
+        Parse a file-like object incrementally, yielding tokens as soon as
+        they are complete.
+
+        Only the current chunk and any open REPEAT blocks are held in
+        memory.  Literal text may be split into several TextTokens at chunk
+        boundaries; executing them back to back types the same characters.
+        In strict mode a ValueError can surface after earlier tokens have
+        already been yielded.
+        """
+        return self._iter_tokens(iter(lambda: stream.read(chunk_size), ""))
+
+    def _iter_tokens(self, chunks: Iterable[str]) -> Iterator[Token]:
+        tokens: List[Token] = []  # completed tokens of the innermost level
+        buffer: List[str] = []  # literal slices of the current text run
+        repeat_stack: List[tuple] = []  # Stack of (count, parent_tokens)
+        pending_text: List[str] = []  # top-level text awaiting merge
+        carry: List[str] = []  # unconsumed tail starting with '{' or '\\'
 
         def flush_buffer() -> None:
             if buffer:
                 tokens.append(TextToken("".join(buffer)))
                 buffer.clear()
 
-        while idx < length:
-            ch = text[idx]
-            # Escape for literal braces or backslash
-            if ch == "\\" and idx + 1 < length and text[idx + 1] in "{}\\":
-                buffer.append(text[idx + 1])
-                idx += 2
-                continue
+        find_special = self._RE_SPECIAL.search
+        it = iter(chunks)
+        chunk = next(it, None)
+        while chunk is not None:
+            nxt = next(it, None)
+            at_eof = nxt is None
+            if carry:
+                # An open '{' needs its '}' before it can be parsed; keep
+                # collecting chunks without re-scanning what we already have.
+                if carry[0][0] == "{" and "}" not in chunk and not at_eof:
+                    carry.append(chunk)
+                    chunk = nxt
+                    continue
+                carry.append(chunk)
+                text = "".join(carry)
+                carry.clear()
+            else:
+                text = chunk
+            idx, length = 0, len(text)
 
-            if ch == "{":
-                flush_buffer()
-                end_idx = text.find("}", idx)
-                if end_idx < 0:
-                    if not self.strict:
-                        # treat unmatched as literal text
-                        buffer.append(text[idx:])
+            while idx < length:
+                # Copy everything up to the next '{' or '\\' in one slice
+                special = find_special(text, idx)
+                if special is None:
+                    buffer.append(text[idx:])
+                    break
+                pos = special.start()
+                if pos > idx:
+                    buffer.append(text[idx:pos])
+                    idx = pos
+                ch = text[idx]
+                # Escape for literal braces or backslash
+                if ch == "\\":
+                    if idx + 1 == length and not at_eof:
+                        carry.append(text[idx:])
                         break
-                    raise ValueError("Unmatched '{' in input")
+                    if idx + 1 < length and text[idx + 1] in "{}\\":
+                        buffer.append(text[idx + 1])
+                        idx += 2
+                        continue
 
-                spec = text[idx + 1 : end_idx]
+                if ch == "{":
+                    flush_buffer()
+                    end_idx = text.find("}", idx)
+                    if end_idx < 0:
+                        if not at_eof:
+                            carry.append(text[idx:])
+                            break
+                        if not self.strict:
+                            # treat unmatched as literal text
+                            buffer.append(text[idx:])
+                            break
+                        raise ValueError("Unmatched '{' in input")
 
-                # Check for REPEAT_N start
-                m = self._RE_REPEAT_START.fullmatch(spec.strip())
-                if m:
-                    repeat_stack.append((int(m.group("count")), len(tokens)))
-                    idx = end_idx + 1
-                    continue
+                    spec = text[idx + 1 : end_idx]
+                    stripped = spec.strip()
+
+                    # Check for REPEAT_N start
+                    m = (
+                        self._RE_REPEAT_START.fullmatch(stripped)
+                        if stripped.startswith("REPEAT_")
+                        else None
+                    )
+                    if m:
+                        # Collect the body in its own list; no copying later
+                        repeat_stack.append((int(m.group("count")), tokens))
+                        tokens = []
+                        idx = end_idx + 1
+                        continue
+
+                    # Check for /REPEAT end
+                    if stripped == "/REPEAT":
+                        if repeat_stack:
+                            count, parent = repeat_stack.pop()
+                            parent.append(
+                                RepeatToken(count, self._merge_text_tokens(tokens))
+                            )
+                            tokens = parent
+                        idx = end_idx + 1
+                        continue
+
+                    token = self._parse_spec(spec, stripped)
+
+                    if token:
+                        tokens.append(token)
+                    else:
+                        self._handle_invalid(spec, tokens)
 
-                # Check for /REPEAT end
-                if self._RE_REPEAT_END.fullmatch(spec.strip()):
-                    if repeat_stack:
-                        count, start_idx = repeat_stack.pop()
-                        repeat_tokens = tokens[start_idx:]
-                        tokens = tokens[:start_idx]
-                        tokens.append(RepeatToken(count, repeat_tokens))
                     idx = end_idx + 1
                     continue
 
-                token = self._parse_spec(spec)
-
-                if token:
-                    tokens.append(token)
-                else:
-                    # Escape control characters for clearer logging visibility
-                    def _escape(s: str) -> str:
-                        s = s.replace("\\", r"\\")
-                        s = s.replace("\n", r"\n").replace("\r", r"\r")
-                        return s
-                    preview = _escape(spec)
-                    if len(preview) > 200:
-                        preview = preview[:200] + "…"
-                    msg = f"Invalid sequence '{{{preview}}}'"
-                    if self.strict:
-                        logger.warning(msg)
-                        # skip invalid spec in strict mode
-                    else:
-                        logger.debug("%s, treating as literal", msg)
-                        # treat as literal text
-                        tokens.append(TextToken(f"{{{spec}}}"))
+                # Lone backslash: keep it literally
+                buffer.append(ch)
+                idx += 1
 
-                idx = end_idx + 1
+            chunk = nxt
+            # Open REPEAT blocks stay buffered until closed (or input ends)
+            if repeat_stack and chunk is not None:
                 continue
+            flush_buffer()
+            # Unclosed blocks at end of input: their tokens stay inline
+            while repeat_stack:
+                _, parent = repeat_stack.pop()
+                parent.extend(tokens)
+                tokens = parent
+            for tok in tokens:
+                if isinstance(tok, TextToken):
+                    pending_text.append(tok.text)
+                    continue
+                if pending_text:
+                    yield TextToken("".join(pending_text))
+                    pending_text.clear()
+                yield tok
+            tokens.clear()
+            if pending_text:
+                yield TextToken("".join(pending_text))
+                pending_text.clear()
 
-            buffer.append(ch)
-            idx += 1
-
-        flush_buffer()
-        return self._merge_text_tokens(tokens)
+    def _handle_invalid(self, spec: str, tokens: List[Token]) -> None:
+        # Escape control characters for clearer logging visibility
+        preview = spec.replace("\\", r"\\")
+        preview = preview.replace("\n", r"\n").replace("\r", r"\r")
+        if len(preview) > 200:
+            preview = preview[:200] + "…"
+        msg = f"Invalid sequence '{{{preview}}}'"
+        if self.strict:
+            logger.warning(msg)
+            # skip invalid spec in strict mode
+        else:
+            logger.debug("%s, treating as literal", msg)
+            # treat as literal text
+            tokens.append(TextToken(f"{{{spec}}}"))
 
-    def _parse_spec(self, spec: str) -> Optional[Token]:
+    def _parse_spec(self, spec: str, stripped: Optional[str] = None) -> Optional[Token]:
         # Empty braces means literal {}
         if spec == "":
             return TextToken("{}")
-        # Wait - strip whitespace for patterns that expect clean input
-        m = self._RE_WAIT.fullmatch(spec.strip())
-        if m:
-            return WaitToken(float(m.group("secs")))
-        # Mouse move
-        m = self._RE_MOUSE_MOVE.fullmatch(spec.strip())
+        # Patterns expect clean input, so strip whitespace exactly once
+        if stripped is None:
+            stripped = spec.strip()
+        # Dispatch on the keyword before the first '_' or ' ' (WAIT_, INCLUDE ...)
+        handler = self._SPEC_HANDLERS.get(
+            stripped.partition("_")[0].partition(" ")[0]
+        )
+        if handler is not None:
+            token = handler(self, stripped)
+            if token is not None:
+                return token
+        return self._parse_key_combo(stripped)
+
+    def _parse_wait(self, spec: str) -> Optional[Token]:
+        m = self._RE_WAIT.fullmatch(spec)
+        return WaitToken(float(m.group("secs"))) if m else None
+
+    def _parse_mouse(self, spec: str) -> Optional[Token]:
+        m = self._RE_MOUSE_MOVE.fullmatch(spec)
         if m:
             return MouseMoveToken(int(m.group("x")), int(m.group("y")))
-        # Mouse click
-        m = self._RE_MOUSE_CLICK.fullmatch(spec.strip())
-        if m:
-            return MouseClickToken(btn=m.group("btn").lower())
-        # Random text generation
-        m = self._RE_RANDOM.fullmatch(spec.strip())
-        if m:
-            length = int(m.group("length"))
-            charset = m.group("charset") or "alphanumeric"
-            return RandomTextToken(length=length, charset=charset)
-        # Variable set
-        m = self._RE_VAR_SET.fullmatch(spec.strip())
-        if m:
-            return VariableToken(
-                name=m.group("name"), value=m.group("value"), action="set"
-            )
-        # Variable get
-        m = self._RE_VAR_GET.fullmatch(spec.strip())
+        m = self._RE_MOUSE_CLICK.fullmatch(spec)
         if m:
-            return VariableToken(name=m.group("name"), action="get")
-        # Speed change
-        m = self._RE_SPEED.fullmatch(spec.strip())
-        if m:
-            speed = float(m.group("speed"))
-            variance = float(m.group("variance")) if m.group("variance") else None
-            return SpeedToken(speed=speed, variance=variance)
-        # Key combination - strip for patterns
-        parts = [p.strip() for p in re.split(r"\s*\+\s*", spec.strip())]
+            return MouseClickToken(button=m.group("btn").lower())
+        return None
+
+    def _parse_random(self, spec: str) -> Optional[Token]:
+        m = self._RE_RANDOM.fullmatch(spec)
+        if not m:
+            return None
+        length = int(m.group("length"))
+        charset = m.group("charset") or "alphanumeric"
+        return RandomTextToken(length=length, charset=charset)
+
+    def _parse_set(self, spec: str) -> Optional[Token]:
+        m = self._RE_VAR_SET.fullmatch(spec)
+        if not m:
+            return None
+        return VariableToken(name=m.group("name"), value=m.group("value"), action="set")
+
+    def _parse_get(self, spec: str) -> Optional[Token]:
+        m = self._RE_VAR_GET.fullmatch(spec)
+        return VariableToken(name=m.group("name"), action="get") if m else None
+
+    def _parse_speed(self, spec: str) -> Optional[Token]:
+        m = self._RE_SPEED.fullmatch(spec)
+        if not m:
+            return None
+        speed = float(m.group("speed"))
+        variance = float(m.group("variance")) if m.group("variance") else None
+        return SpeedToken(speed=speed, variance=variance)
+
+    def _parse_include(self, spec: str) -> Optional[Token]:
+        m = self._RE_INCLUDE.fullmatch(spec)
+        if not m:
+            return None
+        path = m.group("path").strip()
+        if len(path) > 1 and path[0] == path[-1] and path[0] in "'\"":
+            path = path[1:-1]
+        return IncludeToken(path) if path else None
+
+    def _parse_key_combo(self, spec: str) -> Optional[Token]:
         keys: List[str] = []
-        for part in parts:
+        for part in self._RE_PLUS.split(spec):
             if not part:
                 return None
-            m = self._RE_SPEC.fullmatch(part)
-            if m:
-                keys.append(m.group("key").lower())
-            elif len(part) == 1:
+            if len(part) == 1:
                 keys.append(part)
-            else:
+                continue
+            m = self._RE_SPEC.fullmatch(part)
+            if not m:
                 return None
+            keys.append(m.group("key").lower())
         return KeyToken(keys) if keys else None
 
+    # Keyword -> handler; anything else falls through to key-combo parsing
+    _SPEC_HANDLERS = {
+        "WAIT": _parse_wait,
+        "MOUSE": _parse_mouse,
+        "RANDOM": _parse_random,
+        "SET": _parse_set,
+        "GET": _parse_get,
+        "SPEED": _parse_speed,
+        "INCLUDE": _parse_include,
+    }
+
     @staticmethod
     def _merge_text_tokens(tokens: List[Token]) -> List[Token]:
         merged: List[Token] = []
+        run: List[str] = []
         for tok in tokens:
-            if (
-                merged
-                and isinstance(tok, TextToken)
-                and isinstance(merged[-1], TextToken)
-            ):
-                merged[-1].text += tok.text
-            else:
-                merged.append(tok)
+            if isinstance(tok, TextToken):
+                run.append(tok.text)
+                continue
+            if run:
+                merged.append(TextToken("".join(run)))
+                run.clear()
+            merged.append(tok)
+        if run:
+            merged.append(TextToken("".join(run)))
         return merged
@@ -0,0 +1,325 @@
+"""
+Compact bytecode representation of parsed token programs.
+
+A Program stores one instruction per token in two parallel arrays: an
+opcode byte and a signed 64-bit operand.  Operands index into a shared
+string table (text, key names, variable names) or a pool of floats (waits,
+coordinates, speeds).  REPEAT blocks become LOOP/END instruction pairs, so
+nesting costs nothing beyond two instructions.
+
+Programs serialise to a flat byte layout that can be loaded back without
+copying the instruction arrays (e.g. straight from an mmap).
+"""
+
+import math
+import mmap
+import struct
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from type_simulator.text_typer.token import (
+    IncludeToken,
+    KeyToken,
+    MouseClickToken,
+    MouseMoveToken,
+    RandomTextToken,
+    RepeatToken,
+    SpeedToken,
+    TextToken,
+    Token,
+    VariableToken,
+    WaitToken,
+)
+
+# Opcodes
+OP_TEXT = 1  # strings[arg]
+OP_WAIT = 2  # numbers[arg] seconds
+OP_KEY = 3  # strings[arg], key names joined by KEY_SEP
+OP_MOVE = 4  # numbers[arg:arg + 3] x, y, duration
+OP_CLICK = 5  # numbers[arg:arg + 3] button string index, clicks, interval
+OP_RANDOM = 6  # packed (length, charset string index)
+OP_SET = 7  # packed (name string index, value string index or NONE_IDX)
+OP_GET = 8  # strings[arg] variable name
+OP_SPEED = 9  # numbers[arg:arg + 2] speed, variance (NaN keeps variance)
+OP_LOOP = 10  # arg = pc of the matching OP_END
+OP_END = 11  # arg = repeat count
+OP_INCLUDE = 12  # strings[arg] unresolved include path
+
+OPCODE_NAMES = {
+    OP_TEXT: "TEXT",
+    OP_WAIT: "WAIT",
+    OP_KEY: "KEY",
+    OP_MOVE: "MOVE",
+    OP_CLICK: "CLICK",
+    OP_RANDOM: "RANDOM",
+    OP_SET: "SET",
+    OP_GET: "GET",
+    OP_SPEED: "SPEED",
+    OP_LOOP: "LOOP",
+    OP_END: "END",
+    OP_INCLUDE: "INCLUDE",
+}
+
+KEY_SEP = "\0"
+NONE_IDX = 0xFFFFFFFF
+# Largest values the int64 operands can encode: a RANDOM length is packed
+# into the high half, below the sign bit; a REPEAT count fills the operand
+MAX_RANDOM = 2**31 - 1
+MAX_REPEAT = 2**63 - 1
+
+MAGIC = b"TSBC"
+FORMAT_VERSION = 1
+# magic, format version, instruction count, number count, string count
+_HEADER = struct.Struct("=4sIQQQ")
+
+
+def _pack(hi: int, lo: int) -> int:
+    return (hi << 32) | lo
+
+
+def _check_count(value: int, what: str, limit: int) -> int:
+    if not 0 <= value <= limit:
+        raise ValueError(f"{what} {value} is outside the range 0..{limit}")
+    return value
+
+
+def _unpack(arg: int) -> Tuple[int, int]:
+    return arg >> 32, arg & 0xFFFFFFFF
+
+
+class Program:
+    """
+    Flat, immutable-by-convention bytecode for a token program.
+
+    Build one with :meth:`compile`, run it with ``Typist.run_program`` and
+    turn it back into tokens with :meth:`tokens`.
+    """
+
+    __slots__ = ("opcodes", "operands", "numbers", "strings")
+
+    def __init__(
+        self,
+        opcodes: Optional[Sequence[int]] = None,
+        operands: Optional[Sequence[int]] = None,
+        numbers: Optional[Sequence[float]] = None,
+        strings: Optional[List[str]] = None,
+    ) -> None:
+        self.opcodes = array("B") if opcodes is None else opcodes
+        self.operands = array("q") if operands is None else operands
+        self.numbers = array("d") if numbers is None else numbers
+        self.strings = [] if strings is None else strings
+
+    def __len__(self) -> int:
+        return len(self.opcodes)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Program):
+            return NotImplemented
+        # Compare the serialised form so NaN operands compare equal
+        return self.to_bytes() == other.to_bytes()
+
+    def __reduce__(self):
+        return (Program.from_bytes, (self.to_bytes(),))
+
+    @property
+    def has_includes(self) -> bool:
+        """True if the program still contains unresolved INCLUDEs."""
+        return OP_INCLUDE in self.opcodes
+
+    # ------------------------------------------------------------------ #
+    # Building
+    # ------------------------------------------------------------------ #
+    @classmethod
+    def compile(cls, tokens: Iterable[Token]) -> "Program":
+        """Compile a token tree (e.g. from ``CommandParser.parse``)."""
+        prog = cls()
+        interned: Dict[str, int] = {}
+
+        def string(s: str) -> int:
+            idx = interned.get(s)
+            if idx is None:
+                idx = interned[s] = len(prog.strings)
+                prog.strings.append(s)
+            return idx
+
+        def number(*values: float) -> int:
+            idx = len(prog.numbers)
+            prog.numbers.extend(values)
+            return idx
+
+        def emit(op: int, arg: int = 0) -> None:
+            prog.opcodes.append(op)
+            prog.operands.append(arg)
+
+        # Iterative walk so deeply nested REPEAT blocks need no recursion
+        stack: List[tuple] = [(iter(tokens), None)]
+        while stack:
+            it, repeat = stack[-1]
+            tok = next(it, None)
+            if tok is None:
+                stack.pop()
+                if repeat is not None:
+                    count, loop_pc = repeat
+                    prog.operands[loop_pc] = len(prog.opcodes)
+                    emit(OP_END, _check_count(count, "REPEAT count", MAX_REPEAT))
+                continue
+            if isinstance(tok, TextToken):
+                emit(OP_TEXT, string(tok.text))
+            elif isinstance(tok, WaitToken):
+                emit(OP_WAIT, number(tok.seconds))
+            elif isinstance(tok, KeyToken):
+                emit(OP_KEY, string(KEY_SEP.join(tok.keys)))
+            elif isinstance(tok, MouseMoveToken):
+                emit(OP_MOVE, number(tok.x, tok.y, tok.duration))
+            elif isinstance(tok, MouseClickToken):
+                emit(OP_CLICK, number(string(tok.button), tok.clicks, tok.interval))
+            elif isinstance(tok, RandomTextToken):
+                length = _check_count(tok.length, "RANDOM length", MAX_RANDOM)
+                emit(OP_RANDOM, _pack(length, string(tok.charset)))
+            elif isinstance(tok, VariableToken) and tok.action == "set":
+                value = NONE_IDX if tok.value is None else string(tok.value)
+                emit(OP_SET, _pack(string(tok.name), value))
+            elif isinstance(tok, VariableToken):
+                emit(OP_GET, string(tok.name))
+            elif isinstance(tok, SpeedToken):
+                variance = math.nan if tok.variance is None else tok.variance
+                emit(OP_SPEED, number(tok.speed, variance))
+            elif isinstance(tok, IncludeToken):
+                emit(OP_INCLUDE, string(tok.path))
+            elif isinstance(tok, RepeatToken):
+                loop_pc = len(prog.opcodes)
+                emit(OP_LOOP)  # patched with the END pc once the body is done
+                stack.append((iter(tok.tokens), (tok.count, loop_pc)))
+            else:
+                raise TypeError(f"Cannot compile token {tok!r}")
+        return prog
+
+    # ------------------------------------------------------------------ #
+    # Decoding
+    # ------------------------------------------------------------------ #
+    def token_at(self, pc: int) -> Token:
+        """Materialise the (non-loop) instruction at *pc* as a Token."""
+        op, arg = self.opcodes[pc], self.operands[pc]
+        nums, strs = self.numbers, self.strings
+        if op == OP_TEXT:
+            return TextToken(strs[arg])
+        if op == OP_WAIT:
+            return WaitToken(nums[arg])
+        if op == OP_KEY:
+            keys = strs[arg]
+            return KeyToken(keys.split(KEY_SEP) if keys else [])
+        if op == OP_MOVE:
+            return MouseMoveToken(int(nums[arg]), int(nums[arg + 1]), nums[arg + 2])
+        if op == OP_CLICK:
+            return MouseClickToken(
+                strs[int(nums[arg])], int(nums[arg + 1]), nums[arg + 2]
+            )
+        if op == OP_RANDOM:
+            length, charset = _unpack(arg)
+            return RandomTextToken(length, strs[charset])
+        if op == OP_SET:
+            name, value = _unpack(arg)
+            return VariableToken(
+                strs[name], None if value == NONE_IDX else strs[value], "set"
+            )
+        if op == OP_GET:
+            return VariableToken(strs[arg], action="get")
+        if op == OP_SPEED:
+            variance = nums[arg + 1]
+            return SpeedToken(nums[arg], None if math.isnan(variance) else variance)
+        if op == OP_INCLUDE:
+            return IncludeToken(strs[arg])
+        raise ValueError(f"No token for opcode {OPCODE_NAMES.get(op, op)} at {pc}")
+
+    def tokens(self) -> List[Token]:
+        """Decompile back into the equivalent token tree."""
+        root: List[Token] = []
+        stack: List[List[Token]] = [root]
+        for pc, op in enumerate(self.opcodes):
+            if op == OP_LOOP:
+                stack.append([])
+            elif op == OP_END:
+                body = stack.pop()
+                stack[-1].append(RepeatToken(self.operands[pc], body))
+            else:
+                stack[-1].append(self.token_at(pc))
+        return root
+
+    def disassemble(self) -> str:
+        """Readable listing, one instruction per line (for debugging)."""
+        lines = []
+        for pc, op in enumerate(self.opcodes):
+            name = OPCODE_NAMES.get(op, str(op))
+            if op in (OP_LOOP, OP_END):
+                lines.append(f"{pc:6d} {name:<7} {self.operands[pc]}")
+            else:
+                lines.append(f"{pc:6d} {name:<7} {self.token_at(pc)!r}")
+        return "\n".join(lines)
+
+    # ------------------------------------------------------------------ #
+    # Serialisation
+    # ------------------------------------------------------------------ #
+    def to_bytes(self) -> bytes:
+        """
+        Serialise as: header, operands (int64), numbers (float64), string
+        offsets (int64), opcodes (uint8), UTF-8 string data.  Arrays come
+        first so they stay 8-byte aligned.  Byte order is native.
+        """
+        blobs = [s.encode("utf-8", "surrogatepass") for s in self.strings]
+        offsets = array("q", [0])
+        for b in blobs:
+            offsets.append(offsets[-1] + len(b))
+        header = _HEADER.pack(
+            MAGIC, FORMAT_VERSION, len(self.opcodes), len(self.numbers), len(blobs)
+        )
+        return b"".join(
+            [
+                header,
+                bytes(memoryview(self.operands).cast("B")),
+                bytes(memoryview(self.numbers).cast("B")),
+                offsets.tobytes(),
+                bytes(memoryview(self.opcodes).cast("B")),
+                *blobs,
+            ]
+        )
+
+    @classmethod
+    def from_bytes(cls, data: Union[bytes, bytearray, memoryview, mmap.mmap]):
+        """
+        Load a serialised program.  The instruction and number arrays are
+        memoryviews over *data*, so nothing is copied besides the strings.
+        """
+        view = memoryview(data)
+        magic, version, n_ops, n_nums, n_strs = _HEADER.unpack_from(view)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("Not a compatible compiled program")
+        pos = _HEADER.size
+        operands = view[pos : pos + 8 * n_ops].cast("q")
+        pos += 8 * n_ops
+        numbers = view[pos : pos + 8 * n_nums].cast("d")
+        pos += 8 * n_nums
+        if len(view) < pos + 8 * (n_strs + 1) + n_ops:
+            raise ValueError("Truncated compiled program")
+        offsets = view[pos : pos + 8 * (n_strs + 1)].cast("q")
+        pos += 8 * (n_strs + 1)
+        opcodes = view[pos : pos + n_ops]
+        pos += n_ops
+        if len(view) != pos + offsets[n_strs]:
+            raise ValueError("Truncated or oversized compiled program")
+        blob = view[pos:]
+        strings = [
+            str(blob[offsets[i] : offsets[i + 1]], "utf-8", "surrogatepass")
+            for i in range(n_strs)
+        ]
+        return cls(opcodes, operands, numbers, strings)
+
+    def save(self, path: Union[str, Path]) -> None:
+        Path(path).write_bytes(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "Program":
+        """Memory-map a program saved with :meth:`save`."""
+        with open(path, "rb") as fh:
+            mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls.from_bytes(mapped)
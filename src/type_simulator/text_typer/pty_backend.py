@@ -0,0 +1,238 @@
+"""
+Pseudo-terminal target for the async engine.
+
+PtyBackend starts a program (a shell, vim, a REPL) on its own pseudo
+terminal and types into it by writing the bytes a terminal would send for
+each key, so sessions need no display at all and any number of them can
+run side by side (see :mod:`async_engine`).  The program's output is
+drained continuously and the tail is kept in :attr:`PtyBackend.output`.
+"""
+
+import asyncio
+import errno
+import fcntl
+import logging
+import os
+import pty
+import signal
+import struct
+import subprocess
+import termios
+from typing import Dict, Optional, Sequence
+
+from type_simulator.text_typer.async_engine import paced
+
+logger = logging.getLogger(__name__)
+
+# Bytes of program output kept in PtyBackend.output
+OUTPUT_TAIL = 1 << 20
+
+# Bytes sent for pyautogui key names (xterm conventions)
+TERMINAL_KEYS: Dict[str, str] = {
+    "enter": "\r",
+    "return": "\r",
+    "tab": "\t",
+    "space": " ",
+    "backspace": "\x7f",
+    "esc": "\x1b",
+    "escape": "\x1b",
+    "delete": "\x1b[3~",
+    "del": "\x1b[3~",
+    "insert": "\x1b[2~",
+    "home": "\x1b[H",
+    "end": "\x1b[F",
+    "pageup": "\x1b[5~",
+    "pgup": "\x1b[5~",
+    "pagedown": "\x1b[6~",
+    "pgdn": "\x1b[6~",
+    "up": "\x1b[A",
+    "down": "\x1b[B",
+    "right": "\x1b[C",
+    "left": "\x1b[D",
+    "f1": "\x1bOP",
+    "f2": "\x1bOQ",
+    "f3": "\x1bOR",
+    "f4": "\x1bOS",
+    "f5": "\x1b[15~",
+    "f6": "\x1b[17~",
+    "f7": "\x1b[18~",
+    "f8": "\x1b[19~",
+    "f9": "\x1b[20~",
+    "f10": "\x1b[21~",
+    "f11": "\x1b[23~",
+    "f12": "\x1b[24~",
+}
+
+MODIFIERS = {"ctrl", "shift", "alt"}
+
+
+def key_bytes(*keys: str) -> str:
+    """Terminal input for a key or a hotkey such as ``("ctrl", "c")``."""
+    combo = [k.lower() for k in keys]
+    mods, key = set(combo[:-1]), combo[-1]
+    unknown = mods - MODIFIERS
+    if unknown:
+        raise ValueError(f"Unsupported modifier(s) for a terminal: {unknown}")
+    seq = TERMINAL_KEYS.get(key, key if len(key) == 1 else None)
+    if seq is None:
+        raise ValueError(f"Unknown key: {key!r}")
+    if "shift" in mods:
+        seq = "\x1b[Z" if key == "tab" else seq.upper()
+    if "ctrl" in mods:
+        if len(seq) != 1:
+            raise ValueError(f"No terminal control code for ctrl+{key}")
+        seq = "\x00" if seq == " " else chr(ord(seq.upper()) & 0x1F)
+    if "alt" in mods:
+        seq = "\x1b" + seq
+    return seq
+
+
+class PtyBackend:
+    """
+    Async target that types into a program on a pseudo terminal.
+
+    The program runs in a new session with the terminal as its stdin,
+    stdout and stderr.  The terminal is not its controlling terminal, so
+    control keys reach it as bytes (^D still ends input) rather than as
+    job-control signals.
+
+    Parameters
+    ----------
+    argv :
+        Program and arguments to start.
+    env, cwd :
+        Passed to :class:`subprocess.Popen`.
+    cols, rows :
+        Terminal size.
+    """
+
+    # Characters are written as they are, so every character types exactly
+    exact_keys = True
+
+    def __init__(
+        self,
+        argv: Sequence[str],
+        env: Optional[Dict[str, str]] = None,
+        cwd: Optional[str] = None,
+        cols: int = 80,
+        rows: int = 24,
+    ) -> None:
+        master, slave = pty.openpty()
+        size = struct.pack("HHHH", rows, cols, 0, 0)
+        fcntl.ioctl(slave, termios.TIOCSWINSZ, size)
+        try:
+            self.proc = subprocess.Popen(
+                argv,
+                stdin=slave,
+                stdout=slave,
+                stderr=slave,
+                env=env,
+                cwd=cwd,
+                # Its own session, so close() can hang up the whole group.
+                # No preexec_fn: running Python in the forked child of a
+                # threaded process can deadlock
+                start_new_session=True,
+            )
+        except BaseException:
+            os.close(master)
+            raise
+        finally:
+            os.close(slave)
+        os.set_blocking(master, False)
+        self._fd = master
+        self._out = bytearray()
+        self._reading = False
+        self._eof = False
+        self._closed = False
+
+    @property
+    def output(self) -> str:
+        """The last :data:`OUTPUT_TAIL` bytes the program printed."""
+        return self._out.decode("utf-8", "replace")
+
+    # ---------------------------------------------------------- keyboard
+    async def write_batch(self, text: str, delays) -> None:
+        await paced(text, delays, self._send)
+
+    async def press(self, key: str) -> None:
+        await self._send(key_bytes(key))
+
+    async def hotkey(self, *keys: str) -> None:
+        await self._send(key_bytes(*keys))
+
+    # ---------------------------------------------------------- pointer
+    async def moveTo(self, x: int, y: int, duration: float = 0.0) -> None:
+        await asyncio.sleep(duration)  # no pointer on a terminal
+
+    async def click(self, button: str = "left", clicks: int = 1, interval=0.0):
+        await asyncio.sleep(interval * max(0, clicks - 1))
+
+    # ---------------------------------------------------------- lifecycle
+    async def wait(self, timeout: Optional[float] = None) -> int:
+        """Wait for the program to exit, draining its output meanwhile."""
+        self._start_reading()
+        return await asyncio.wait_for(asyncio.to_thread(self.proc.wait), timeout)
+
+    def close(self) -> None:
+        """Hang up the terminal and reap the program."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._reading:
+            asyncio.get_running_loop().remove_reader(self._fd)
+        os.close(self._fd)
+        if self.proc.poll() is None:
+            try:
+                os.killpg(self.proc.pid, signal.SIGHUP)
+            except ProcessLookupError:
+                pass
+            try:
+                self.proc.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+
+    # ---------------------------------------------------------- internals
+    async def _send(self, text: str) -> None:
+        self._start_reading()
+        data = memoryview(text.encode("utf-8"))
+        while data:
+            try:
+                n = os.write(self._fd, data)
+            except BlockingIOError:
+                # The program is not reading its input; wait until it does
+                await self._writable()
+                continue
+            data = data[n:]
+
+    async def _writable(self) -> None:
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        loop.add_writer(self._fd, ready.set_result, None)
+        try:
+            await ready
+        finally:
+            loop.remove_writer(self._fd)
+
+    def _start_reading(self) -> None:
+        if not self._reading and not self._eof:
+            asyncio.get_running_loop().add_reader(self._fd, self._drain)
+            self._reading = True
+
+    def _drain(self) -> None:
+        try:
+            data = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            if e.errno != errno.EIO:  # EIO: the program closed the terminal
+                raise
+            data = b""
+        if not data:
+            asyncio.get_running_loop().remove_reader(self._fd)
+            self._reading = False
+            self._eof = True
+            return
+        self._out += data
+        if len(self._out) > OUTPUT_TAIL:
+            del self._out[: len(self._out) - OUTPUT_TAIL]
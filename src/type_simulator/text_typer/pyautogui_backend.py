@@ -0,0 +1,41 @@
+"""
+pyautogui with per-key delays.
+
+``pyautogui.write`` takes one interval for the whole message, so typing a
+run with a different delay per key meant one ``write`` call per key, each
+followed by ``pyautogui.PAUSE``.  PyAutoGUIBackend adds ``write_batch``: it
+presses the keys of a run itself, without the per-call pause, and sleeps the
+precomputed delay after each.  Everything else is passed through to
+pyautogui unchanged.
+"""
+
+import time
+from typing import Sequence
+
+
+class PyAutoGUIBackend:
+    """
+    The pyautogui module plus ``write_batch``.
+
+    Parameters
+    ----------
+    pyautogui :
+        The module (or a stand-in) to drive; imported when omitted.
+    """
+
+    def __init__(self, pyautogui=None) -> None:
+        if pyautogui is None:
+            import pyautogui
+        self._pg = pyautogui
+
+    def __getattr__(self, name: str):
+        return getattr(self._pg, name)
+
+    def write_batch(self, text: str, delays: Sequence[float]) -> None:
+        """Type *text*, waiting ``delays[i]`` after the i-th key."""
+        press = self._pg.press
+        for ch, delay in zip(text, delays):
+            # As pyautogui.write does per character; no PAUSE between keys
+            press(ch, _pause=False)
+            if delay > 0:
+                time.sleep(delay)
@@ -0,0 +1,255 @@
+"""
+Per-character-class choice of input path.
+
+Text can reach the focused window in several ways: key events from the
+backend (``keys``), a selection paste (``paste``), Ctrl+Shift+U hex entry
+(``unicode``) or pynput (``pynput``).  Which is fastest, and which work at
+all, depends on the display, the backend and the installed tools, so
+:func:`probe` times the harmless part of each path once (a Shift tap, a
+copy to the otherwise unused SECONDARY selection, leaving the user's
+PRIMARY alone) and ranks them for every character class.  Ctrl+Shift+U
+entry cannot be timed without typing into the window, and timing pynput
+would import it, so those two rank after the timed paths.  Rankings are
+cached per host, DISPLAY and backend for :data:`RANKING_TTL` seconds.
+"""
+
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from type_simulator.text_typer.token import _selection_tools
+
+logger = logging.getLogger(__name__)
+
+METHODS = ("keys", "paste", "unicode", "pynput")
+# Classes returned by token.char_class
+CHAR_CLASSES = ("text", "special", "unicode")
+
+Routes = Dict[str, Tuple[str, ...]]
+
+# Order used before anything is probed (the historical fallback chain)
+DEFAULT_ROUTES: Routes = {
+    "text": ("keys",),
+    "special": ("paste", "unicode", "pynput", "keys"),
+    "unicode": ("paste", "unicode", "pynput", "keys"),
+}
+
+RANKING_TTL = 24 * 60 * 60  # seconds
+DEFAULT_RANKING_FILE = (
+    Path(os.environ.get("XDG_CACHE_HOME", "~/.cache")).expanduser()
+    / "type_simulator"
+    / "backends.json"
+)
+PROBE_ROUNDS = 5
+# Selection the paste probe copies to, so the user's PRIMARY is untouched
+PROBE_SELECTION = "secondary"
+# Paths probe() does not time; ranked after the timed ones, in this order
+UNTIMED = ("unicode", "pynput")
+
+
+@dataclass
+class Ranking:
+    """Measured cost (seconds per character) of every working input path."""
+
+    costs: Dict[str, float]
+    # The backend maps characters to keysyms itself (e.g. XTestBackend), so
+    # key events can type special and non-ASCII characters reliably
+    exact_keys: bool = False
+    created: float = field(default_factory=time.time)
+
+    def routes(self) -> Routes:
+        ranked = sorted(self.costs, key=self.costs.__getitem__)
+        ranked += [m for m in UNTIMED if m not in self.costs]
+        routes: Routes = {}
+        for cls in CHAR_CLASSES:
+            usable = [
+                m
+                for m in ranked
+                if m != "keys" or cls == "text" or self.exact_keys
+            ]
+            if cls == "text" and "keys" in usable:
+                # Plain text only leaves the key path if it is unusable
+                usable.remove("keys")
+                usable.insert(0, "keys")
+            if "keys" not in usable:
+                usable.append("keys")  # last resort, as before
+            routes[cls] = tuple(usable)
+        return routes
+
+    def summary(self) -> str:
+        ranked = sorted(self.costs.items(), key=lambda kv: kv[1])
+        return ", ".join(f"{m} {c * 1e3:.2f}ms/char" for m, c in ranked)
+
+
+def forced_routes(method: str) -> Routes:
+    """Routes that send every character class through *method*."""
+    if method not in METHODS:
+        raise ValueError(f"Unknown input backend: {method}")
+    return {cls: (method,) for cls in CHAR_CLASSES}
+
+
+def _timed(fn, rounds: int = PROBE_ROUNDS) -> Optional[float]:
+    try:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            if fn() is False:
+                return None
+        return (time.perf_counter() - start) / rounds
+    except Exception as e:
+        logger.debug("Probe failed: %s", e)
+        return None
+
+
+def _time_copy() -> Optional[float]:
+    """
+    Seconds per selection copy, made the way pastes copy to PRIMARY (in
+    process, else xclip or xsel) but into PROBE_SELECTION; None if no way
+    works.
+    """
+    from type_simulator.text_typer.clipboard import XSelectionClipboard
+
+    try:
+        owner = XSelectionClipboard((PROBE_SELECTION.upper(),))
+    except Exception as e:
+        logger.debug("In-process X selection unavailable: %s", e)
+    else:
+        try:
+            return _timed(lambda: owner.copy(" "))
+        finally:
+            owner.close()
+
+    def run(args) -> bool:
+        proc = subprocess.Popen(args, stdin=subprocess.PIPE)
+        proc.communicate(b" ")
+        return proc.returncode == 0
+
+    for args in _selection_tools(PROBE_SELECTION):
+        cost = _timed(lambda: run(args))
+        if cost is not None:
+            return cost
+    return None
+
+
+def probe(typist) -> Ranking:
+    """
+    Time each input path available to *typist* without typing anything:
+    key events are measured with a Shift tap, pastes with a copy to
+    PROBE_SELECTION, pynput with a Shift tap if it is already loaded.
+    """
+    backend = typist.backend
+    costs: Dict[str, float] = {}
+    key = _timed(lambda: backend.press("shift"))
+    if key is not None:
+        costs["keys"] = key
+    copy = _time_copy()
+    if copy is not None:
+        costs["paste"] = copy + (key or 0.0)
+    if "pynput.keyboard" in sys.modules and typist.pynput is not None:
+        from pynput.keyboard import Key
+
+        def tap():
+            typist.pynput.press(Key.shift)
+            typist.pynput.release(Key.shift)
+
+        pynput = _timed(tap)
+        if pynput is not None:
+            costs["pynput"] = pynput
+    return Ranking(costs, exact_keys=getattr(backend, "exact_keys", False))
+
+
+class RankingCache:
+    """
+    JSON file of probe results keyed by host, DISPLAY and backend type.
+
+    Parameters
+    ----------
+    path :
+        Cache file; created on first store.
+    ttl :
+        Seconds after which a ranking is probed again.
+    """
+
+    def __init__(
+        self, path: Optional[Union[str, Path]] = None, ttl: float = RANKING_TTL
+    ) -> None:
+        self.path = Path(path).expanduser() if path else DEFAULT_RANKING_FILE
+        self.ttl = ttl
+
+    @staticmethod
+    def key(backend) -> str:
+        display = os.environ.get("DISPLAY", "")
+        kind = f"{type(backend).__module__}.{type(backend).__name__}"
+        return f"{socket.gethostname()}|{display}|{kind}"
+
+    def get(self, key: str) -> Optional[Ranking]:
+        entry = self._read().get(key)
+        if not entry or time.time() - entry.get("created", 0) > self.ttl:
+            return None
+        try:
+            return Ranking(
+                {m: float(c) for m, c in entry["costs"].items() if m in METHODS},
+                bool(entry.get("exact_keys", False)),
+                float(entry["created"]),
+            )
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return None
+
+    def put(self, key: str, ranking: Ranking) -> None:
+        data = self._read()
+        data[key] = {
+            "costs": ranking.costs,
+            "exact_keys": ranking.exact_keys,
+            "created": ranking.created,
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        except OSError as e:
+            logger.debug("Could not store backend ranking: %s", e)
+            return
+        try:
+            with os.fdopen(fd, "w") as fh:
+                json.dump(data, fh)
+            os.replace(tmp, self.path)
+        except BaseException as e:
+            Path(tmp).unlink(missing_ok=True)
+            if not isinstance(e, OSError):
+                raise
+            logger.debug("Could not store backend ranking: %s", e)
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path) as fh:
+                data = json.load(fh)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+
+def select_routes(
+    typist, override: Optional[str] = None, cache: Optional[RankingCache] = None
+) -> Routes:
+    """
+    Routes for *typist*: forced to *override* if given (other than
+    ``"auto"``), else from the cached or freshly probed ranking.
+    """
+    if override and override != "auto":
+        return forced_routes(override)
+    cache = cache if cache is not None else RankingCache()
+    key = cache.key(typist.backend)
+    ranking = cache.get(key)
+    if ranking is None:
+        ranking = probe(typist)
+        cache.put(key, ranking)
+        logger.info("Probed input paths: %s", ranking.summary())
+    else:
+        logger.debug("Cached input path ranking: %s", ranking.summary())
+    return ranking.routes()
@@ -0,0 +1,149 @@
+"""
+Drift-free pacing of key events.
+
+Tokens used to ``time.sleep`` relative to "now", so backend latency, logging
+and GC pauses accumulated over a long demo.  DeadlineScheduler instead keeps
+an absolute deadline on the ``time.monotonic_ns`` clock and advances it by
+each requested delay: time lost on one event is taken out of the next wait.
+Waits sleep until shortly before the deadline and spin for the remainder,
+which gives sub-millisecond precision.  If the schedule falls too far behind
+(e.g. the window lost focus) it re-anchors to the current time rather than
+firing a burst of catch-up keys.
+"""
+
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Optional
+
+# Remaining time below which the scheduler spins instead of sleeping
+SPIN_NS = 1_000_000  # 1ms
+# Lateness above which an event counts as late in the stats
+LATE_NS = 1_000_000  # 1ms
+# Lag after which the schedule is re-anchored instead of caught up
+MAX_LAG_NS = 250_000_000  # 250ms
+# Per-event lateness samples kept for inspection
+HISTORY = 4096
+
+
+@dataclass(frozen=True)
+class SchedulerStats:
+    """Lateness summary; times are in seconds."""
+
+    events: int
+    late_events: int
+    resyncs: int
+    mean_lateness: float
+    max_lateness: float
+
+    def summary(self) -> str:
+        return (
+            f"{self.events} timed events, {self.late_events} late "
+            f"(mean {self.mean_lateness * 1e3:.2f}ms, "
+            f"max {self.max_lateness * 1e3:.2f}ms), {self.resyncs} resync(s)"
+        )
+
+
+class DeadlineScheduler:
+    """
+    Absolute-deadline timer for a stream of key events.
+
+    Parameters
+    ----------
+    spin_ns :
+        Spin (busy-wait) for the last ``spin_ns`` of every wait; 0 disables.
+    max_lag_ns :
+        Re-anchor to "now" when this far behind schedule.
+    clock, sleep :
+        Injectable for tests.
+    """
+
+    def __init__(
+        self,
+        spin_ns: int = SPIN_NS,
+        max_lag_ns: int = MAX_LAG_NS,
+        clock: Callable[[], int] = time.monotonic_ns,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.spin_ns = spin_ns
+        self.max_lag_ns = max_lag_ns
+        self._clock = clock
+        self._sleep = sleep
+        self._deadline: Optional[int] = None
+        self.lateness: Deque[int] = deque(maxlen=HISTORY)  # ns, per event
+        self.events = 0
+        self.late_events = 0
+        self.resyncs = 0
+        self._total_lateness_ns = 0
+        self._max_lateness_ns = 0
+
+    def reset(self) -> None:
+        """Anchor the schedule at the current time."""
+        self._deadline = self._clock()
+
+    def sleep(self, seconds: float) -> None:
+        """Wait until ``seconds`` after the previous deadline."""
+        target = self._advance(seconds)
+        now = self._clock()
+        remaining = target - now
+        if remaining > self.spin_ns:
+            self._sleep((remaining - self.spin_ns) / 1e9)
+        clock = self._clock
+        if self.spin_ns:
+            while clock() < target:
+                pass
+        self._record(clock() - target)
+
+    def reserve(self, seconds: float) -> float:
+        """
+        Book ``seconds`` for an event the backend paces itself (e.g. a whole
+        batched run) and return how much of that time is actually left, so
+        lateness is spread over the run instead of added after it.
+        """
+        start = self._current()
+        now = self._clock()
+        self._record(now - start)
+        self._deadline = start + int(seconds * 1e9)
+        return max(0, self._deadline - now) / 1e9
+
+    def mark(self, seconds: float) -> None:
+        """Account for ``seconds`` the backend already waited on its own."""
+        if self._deadline is None:
+            self._deadline = self._clock() - int(seconds * 1e9)
+        # No re-anchoring here: the backend was meant to take that long
+        self._deadline += int(seconds * 1e9)
+
+    def stats(self) -> SchedulerStats:
+        n = self.events
+        return SchedulerStats(
+            events=n,
+            late_events=self.late_events,
+            resyncs=self.resyncs,
+            mean_lateness=self._total_lateness_ns / n / 1e9 if n else 0.0,
+            max_lateness=self._max_lateness_ns / 1e9,
+        )
+
+    # ------------------------------------------------------------------ #
+    def _current(self) -> int:
+        """The pending deadline, re-anchored if the schedule lags too far."""
+        now = self._clock()
+        if self._deadline is None:
+            self._deadline = now
+        elif now - self._deadline > self.max_lag_ns:
+            self.resyncs += 1
+            self._deadline = now
+        return self._deadline
+
+    def _advance(self, seconds: float) -> int:
+        self._deadline = self._current() + int(seconds * 1e9)
+        return self._deadline
+
+    def _record(self, lateness_ns: int) -> None:
+        lateness_ns = max(0, lateness_ns)
+        self.events += 1
+        self.lateness.append(lateness_ns)
+        self._total_lateness_ns += lateness_ns
+        if lateness_ns > self._max_lateness_ns:
+            self._max_lateness_ns = lateness_ns
+        if lateness_ns > LATE_NS:
+            self.late_events += 1
@@ -1,7 +1,9 @@
+import re
 import sys
 import time
 import random
 import shutil
+import functools
 import logging
 import string
 import subprocess
@@ -15,6 +17,30 @@ logger = logging.getLogger(__name__)
 # Problematic characters requiring clipboard or unicode input
 PROBLEMATIC_CHARS = set(str("<>:?|@#{}:;*[]()!$&'^,~`\\"))  # expanded set as needed
 
+# Longest run of text pasted with a single selection copy
+PASTE_RUN_LIMIT = 64
+# Plain characters a paste run may span between two problematic ones
+PASTE_MAX_GAP = 8
+
+# Maximal runs of characters that can be sent with a plain backend.write
+_PLAIN_RUN = re.compile("[^\n" + re.escape("".join(sorted(PROBLEMATIC_CHARS))) + "]+")
+
+# Runs of plain ASCII (the "text" character class)
+_TEXT_RUN = re.compile(
+    "[^\n\x80-\U0010ffff" + re.escape("".join(sorted(PROBLEMATIC_CHARS))) + "]+"
+)
+
+
+def char_class(ch: str) -> str:
+    """
+    Input class of *ch*: "special" for PROBLEMATIC_CHARS, "text" for other
+    ASCII and "unicode" for everything else.
+    """
+    if ch in PROBLEMATIC_CHARS:
+        return "special"
+    return "text" if ch < "\x80" else "unicode"
+
+
 # Paste strategies ordered by preference
 PASTE_STRATEGIES: List[Tuple[str, Tuple[str, ...]]] = [
     ("primary", ("shift", "insert")),  # X11 primary selection
@@ -23,36 +49,111 @@ PASTE_STRATEGIES: List[Tuple[str, Tuple[str, ...]]] = [
 ]
 
 
+# In-process PRIMARY owner; False once it turned out to be unavailable
+_primary_owner = None
+
+
+def _copy_in_process(text: str) -> bool:
+    """Set PRIMARY through an XSelectionClipboard kept for the process."""
+    global _primary_owner
+    if _primary_owner is None:
+        from type_simulator.text_typer.clipboard import XSelectionClipboard
+
+        try:
+            _primary_owner = XSelectionClipboard(("PRIMARY",))
+        except Exception as e:
+            logger.debug("In-process X selection unavailable: %s", e)
+            _primary_owner = False
+    if not _primary_owner:
+        return False
+    try:
+        _primary_owner.copy(text)
+        return True
+    except Exception:
+        logger.debug("In-process selection copy failed", exc_info=True)
+        return False
+
+
+@functools.lru_cache(maxsize=None)
+def _selection_tools(selection: str = "primary") -> Tuple[Tuple[str, ...], ...]:
+    """
+    Command lines of the installed tools that set *selection*, looked up
+    once per selection.
+    """
+    return tuple(
+        args
+        for tool, args in (
+            ("xclip", ("xclip", "-selection", selection)),
+            ("xsel", ("xsel", f"--{selection}", "--input")),
+        )
+        if shutil.which(tool)
+    )
+
+
+def _pasted_primary() -> None:
+    """Tell the in-process PRIMARY owner a paste of its text was triggered."""
+    if _primary_owner:
+        _primary_owner.expect_paste()
+
+
 def _copy_to_primary_x11(text: str) -> bool:
     """
-    Copy `text` to X11 PRIMARY selection using xclip or xsel.
+    Copy `text` to X11 PRIMARY selection, in process via python-xlib when
+    possible, else using xclip or xsel.
     Returns True on success.
     """
-    for tool, args in (
-        ("xclip", ["xclip", "-selection", "primary"]),
-        ("xsel", ["xsel", "--primary", "--input"]),
-    ):
-        if shutil.which(tool):
-            try:
-                proc = subprocess.Popen(args, stdin=subprocess.PIPE)
-                proc.communicate(text.encode())
-                if proc.returncode == 0:
-                    return True
-            except Exception:
-                logger.debug("%s failed, trying next tool", tool, exc_info=True)
+    if _copy_in_process(text):
+        return True
+    for args in _selection_tools():
+        try:
+            proc = subprocess.Popen(args, stdin=subprocess.PIPE)
+            proc.communicate(text.encode())
+            if proc.returncode == 0:
+                return True
+        except Exception:
+            logger.debug("%s failed, trying next tool", args[0], exc_info=True)
     return False
 
 
-def _type_unicode_hex(ch: str, backend, typing_speed: float) -> None:
+def draw_intervals(n: int, speed: float, variance: float) -> List[float]:
+    """
+    Draw the per-key delays ``max(0, speed + variance * U(-1, 1))`` for *n*
+    keys in one pass.
+    """
+    if variance <= 0:
+        return [max(0.0, speed)] * n
+    rnd, low, span = random.random, speed - variance, 2 * variance
+    return [d if d > 0 else 0.0 for d in [low + span * rnd() for _ in range(n)]]
+
+
+def _sleep(executor: "Typist", seconds: float) -> None:
+    """Wait via the executor's deadline scheduler, if it has one."""
+    scheduler = getattr(executor, "scheduler", None)
+    if scheduler is None:
+        time.sleep(seconds)
+    else:
+        scheduler.sleep(seconds)
+
+
+def _mark(executor: "Typist", seconds: float) -> None:
+    """Tell the scheduler the backend already spent ``seconds`` on its own."""
+    scheduler = getattr(executor, "scheduler", None)
+    if scheduler is not None:
+        scheduler.mark(seconds)
+
+
+def _type_unicode_hex(
+    ch: str, backend, typing_speed: float, sleep=time.sleep
+) -> None:
     """
     Input Unicode character via Ctrl+Shift+U hex input (Linux/Gtk/Qt).
     """
     hex_code = f"{ord(ch):x}"
     backend.hotkey("ctrl", "shift", "u")
-    time.sleep(typing_speed)
+    sleep(typing_speed)
     backend.write(hex_code)
     backend.press("space")
-    time.sleep(typing_speed)
+    sleep(typing_speed)
 
 
 class Token(ABC):
@@ -67,41 +168,175 @@ class TextToken(Token):
     text: str
 
     def execute(self, executor: "Typist") -> None:
-        for ch in self.text:
-            interval = max(
-                0.0,
-                executor.typing_speed
-                + executor.typing_variance * (2 * random.random() - 1),
-            )
+        text = self.text
+        intervals = draw_intervals(
+            len(text), executor.typing_speed, executor.typing_variance
+        )
+        routes = getattr(executor, "routes", None)
+        if routes:
+            self._execute_routed(executor, routes, intervals)
+            return
+        backend = executor.backend
+        match_plain = _PLAIN_RUN.match
+        limit = max(1, getattr(executor, "paste_run_limit", PASTE_RUN_LIMIT))
+        paste_ok = True
+        idx, length = 0, len(text)
+        while idx < length:
+            m = match_plain(text, idx)
+            if m:
+                end = m.end()
+                self._write_run(text[idx:end], intervals[idx:end], executor)
+                idx = end
+                continue
             # Handle newline as Enter keypress
-            if ch == '\n':
+            if text[idx] == "\n":
                 logger.debug("Typing newline via Enter key")
-                executor.backend.press('enter')
-                time.sleep(interval)
-            elif ch in PROBLEMATIC_CHARS:
-                if self._paste_character(ch, executor):
+                backend.press("enter")
+                _sleep(executor, intervals[idx])
+                idx += 1
+                continue
+            if paste_ok:
+                end = self._paste_run_end(text, idx, limit)
+                if self._paste_text(text[idx:end], executor, sum(intervals[idx:end])):
+                    idx = end
                     continue
-                self._fallback_type(ch, executor, interval)
+                paste_ok = False  # no working paste route; stop trying
+            self._fallback_type(text[idx], executor, intervals[idx])
+            idx += 1
+
+    def _execute_routed(
+        self, executor: "Typist", routes: dict, intervals: List[float]
+    ) -> None:
+        """Send each run of one character class through its ranked paths."""
+        text = self.text
+        limit = max(1, getattr(executor, "paste_run_limit", PASTE_RUN_LIMIT))
+        failed = set()  # paths that did not work for this token
+        idx, length = 0, len(text)
+        while idx < length:
+            ch = text[idx]
+            if ch == "\n":
+                executor.backend.press("enter")
+                _sleep(executor, intervals[idx])
+                idx += 1
+                continue
+            cls = char_class(ch)
+            methods = [m for m in routes.get(cls, ("keys",)) if m not in failed]
+            first = methods[0] if methods else "keys"
+            if cls == "text":
+                end = _TEXT_RUN.match(text, idx).end()
+            elif first == "paste":
+                end = self._paste_run_end(text, idx, limit)
             else:
-                logger.debug("Typing '%s' via write", ch)
-                executor.backend.write(ch, interval=interval)
+                end = idx + 1
+                while end < length and char_class(text[end]) == cls:
+                    end += 1
+            if first == "paste":
+                end = min(end, idx + limit)
+            run, delays = text[idx:end], intervals[idx:end]
+            for method in dict.fromkeys([*methods, "keys"]):
+                if self._emit(method, run, delays, executor):
+                    break
+                failed.add(method)
+            idx = end
+
+    def _emit(
+        self, method: str, run: str, delays: List[float], executor: "Typist"
+    ) -> bool:
+        """Type *run* via one input path; False if that path is unavailable."""
+        logger.debug("Typing %d character(s) via %s", len(run), method)
+        if method == "keys":
+            self._write_run(run, delays, executor)
+            return True
+        if method == "paste":
+            return self._paste_text(run, executor, sum(delays))
+        if method == "unicode":
+            if not sys.platform.startswith("linux"):
+                return False
+            for ch in run:
+                _type_unicode_hex(
+                    ch,
+                    executor.backend,
+                    executor.typing_speed,
+                    lambda secs: _sleep(executor, secs),
+                )
+            return True
+        if method == "pynput":
+            pynput = getattr(executor, "pynput", None)
+            if pynput is None:
+                return False
+            for ch, delay in zip(run, delays):
+                pynput.type(ch)
+                _sleep(executor, delay)
+            return True
+        return False
+
+    @staticmethod
+    def _write_run(run: str, delays: List[float], executor: "Typist") -> None:
+        """Send *run* as key events, one delay per key."""
+        logger.debug("Typing %d character(s) via write", len(run))
+        total = sum(delays)
+        scheduler = getattr(executor, "scheduler", None)
+        if scheduler is not None and total > 0:
+            # Book the run on the schedule; any lateness so far is
+            # taken out of this run's delays
+            scale = scheduler.reserve(total) / total
+            if scale != 1.0:
+                delays = [d * scale for d in delays]
+                total *= scale
+        # Backends that can honour one delay per key (including the default
+        # PyAutoGUIBackend) take the run as is; a bare pyautogui-like backend
+        # gets a single write only when all delays are equal, and one write
+        # per key to keep the variance
+        backend = executor.backend
+        write_batch = getattr(backend, "write_batch", None)
+        if write_batch is not None:
+            write_batch(run, delays)
+        elif getattr(executor, "typing_variance", 0) <= 0:
+            backend.write(run, interval=total / len(delays))
+        else:
+            for ch, delay in zip(run, delays):
+                backend.write(ch, interval=delay)
+
+    @staticmethod
+    def _paste_run_end(text: str, start: int, limit: int) -> int:
+        """
+        End of the run pasted for the problematic character at *start*: it
+        extends over further problematic characters on the same line as long
+        as they are at most PASTE_MAX_GAP plain characters apart, so code like
+        ``f(a[i]);`` needs one selection copy instead of one per character.
+        """
+        end = start + 1
+        stop = min(len(text), start + limit)
+        for j in range(start + 1, stop):
+            ch = text[j]
+            if ch == "\n":
+                break
+            if ch in PROBLEMATIC_CHARS:
+                end = j + 1
+            elif j - end >= PASTE_MAX_GAP:
+                break
+        return end
 
     @staticmethod
-    def _paste_character(ch: str, executor: "Typist") -> bool:
-        # Attempt each paste strategy
+    def _paste_text(text: str, executor: "Typist", delay: float) -> bool:
+        # Attempt each paste strategy; *delay* is the time the run would
+        # have taken typed key by key
         for target, keys in PASTE_STRATEGIES:
             try:
-                if target == "primary" and _copy_to_primary_x11(ch):
-                    logger.debug("Pasting '%s' via %s", ch, target)
+                if target == "primary" and _copy_to_primary_x11(text):
+                    logger.debug("Pasting %r via %s", text, target)
                     executor.backend.hotkey(*keys)
-                    time.sleep(executor.typing_speed)
+                    _pasted_primary()
+                    _sleep(executor, delay)
                     return True
                 elif target == "clipboard" and executor.clipboard:
                     prev = executor.clipboard.paste()
-                    executor.clipboard.copy(ch)
-                    logger.debug("Pasting '%s' via clipboard + %s", ch, "+".join(keys))
+                    executor.clipboard.copy(text)
+                    logger.debug(
+                        "Pasting %r via clipboard + %s", text, "+".join(keys)
+                    )
                     executor.backend.hotkey(*keys)
-                    time.sleep(executor.typing_speed)
+                    _sleep(executor, delay)
                     executor.clipboard.copy(prev)
                     return True
             except Exception as e:
@@ -113,11 +348,16 @@ class TextToken(Token):
         # Fallback methods: unicode hex, pynput, or direct write
         if sys.platform.startswith("linux"):
             logger.debug("Typing '%s' via unicode hex input", ch)
-            _type_unicode_hex(ch, executor.backend, executor.typing_speed)
+            _type_unicode_hex(
+                ch,
+                executor.backend,
+                executor.typing_speed,
+                lambda secs: _sleep(executor, secs),
+            )
         elif getattr(executor, "pynput", None):
             logger.debug("Typing '%s' via pynput", ch)
             executor.pynput.type(ch)
-            time.sleep(executor.typing_speed)
+            _sleep(executor, executor.typing_speed)
         else:
             logger.debug("Typing '%s' via write", ch)
             executor.backend.write(ch, interval=interval)
@@ -129,7 +369,7 @@ class WaitToken(Token):
 
     def execute(self, executor: "Typist") -> None:
         logger.debug("Waiting for %s seconds", self.seconds)
-        time.sleep(self.seconds)
+        _sleep(executor, self.seconds)
 
 
 @dataclass
@@ -152,6 +392,7 @@ class MouseMoveToken(Token):
             "Moving mouse to (%d, %d) over %0.2fs", self.x, self.y, self.duration
         )
         executor.backend.moveTo(self.x, self.y, duration=self.duration)
+        _mark(executor, self.duration)
 
 
 @dataclass
@@ -165,6 +406,7 @@ class MouseClickToken(Token):
         executor.backend.click(
             button=self.button, clicks=self.clicks, interval=self.interval
         )
+        _mark(executor, self.interval * max(0, self.clicks - 1))
 
 
 @dataclass
@@ -244,3 +486,16 @@ class SpeedToken(Token):
         executor.typing_speed = self.speed
         if self.variance is not None:
             executor.typing_variance = self.variance
+
+
+@dataclass
+class IncludeToken(Token):
+    """
+    Placeholder for ``{INCLUDE path}``; replaced by the included script's
+    tokens before execution (see ``includes.ModuleCache``).
+    """
+
+    path: str
+
+    def execute(self, executor: "Typist") -> None:
+        raise RuntimeError(f"INCLUDE {self.path} was not resolved before typing")
@@ -0,0 +1,355 @@
+"""
+In-memory editor backend.
+
+VirtualDocument implements the pyautogui calls the tokens make (``write``,
+``press``, ``hotkey``, ``moveTo``, ``click``) against a text buffer with a
+cursor, so a token program can be run to its exact result without a
+display.  Waits and per-key intervals advance a VirtualClock instead of
+sleeping; Typist picks the clock up from the backend's ``clock`` attribute.
+
+Supported editing: character input, shift+character (US layout), enter,
+tab, backspace, delete, the arrow keys (also with shift, as plain moves),
+home/end, ctrl+home/end, ctrl+a followed by typing or deletion, ctrl+c/x/v
+and shift+insert on an internal clipboard, and ctrl+shift+u hex entry.
+Other keys are ignored.
+
+Given a ``sink`` (e.g. :class:`type_simulator.file_manager.AtomicWriter`),
+the document streams: text more than ``window`` characters before the
+cursor is written out and dropped, so memory stays bounded however much a
+REPEAT or RANDOM block generates.  Should the cursor move (or backspace)
+into text that has been written out, the document reads it back and stops
+streaming, so the result always matches a real editor; ctrl+a selects,
+copies or deletes streamed text without reading it back (a copy spills to a
+temporary file that a paste replays).  The result is then only in the sink:
+``text`` is not available on a streaming document.
+"""
+
+import logging
+import tempfile
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+_HEX_DIGITS = set("0123456789abcdefABCDEF")
+# What shift turns a key into on a US keyboard (letters are upper-cased)
+_SHIFTED = dict(zip("`1234567890-=[]\\;',./", '~!@#$%^&*()_+{}|:"<>?'))
+# Characters kept editable before the cursor when streaming to a sink
+STREAM_WINDOW = 1 << 20
+
+
+class VirtualClock:
+    """Monotonic clock that only moves when something sleeps on it."""
+
+    def __init__(self) -> None:
+        self.now_ns = 0
+
+    def monotonic_ns(self) -> int:
+        return self.now_ns
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            self.now_ns += round(seconds * 1e9)
+
+    @property
+    def elapsed(self) -> float:
+        """Virtual seconds since the clock was created."""
+        return self.now_ns / 1e9
+
+
+class VirtualDocument:
+    """
+    Text buffer with a cursor, driven like a keyboard.
+
+    The buffer is kept as two stacks of characters around the cursor, so
+    typing, deleting and moving by one character are O(1).
+    """
+
+    # Characters are inserted as given, so no paste or hex-entry workaround
+    # is needed for special or non-ASCII characters (see routing.Ranking)
+    exact_keys = True
+
+    def __init__(
+        self,
+        text: str = "",
+        clock: VirtualClock = None,
+        sink=None,
+        window: int = STREAM_WINDOW,
+    ) -> None:
+        self.clock = clock if clock is not None else VirtualClock()
+        self._left: List[str] = list(text)
+        self._right: List[str] = []  # reversed: _right[-1] follows the cursor
+        self._selected_all = False
+        # Copied text, or a _Spill of a streamed document
+        self._clipboard = ""
+        self._hex = None  # digits typed after ctrl+shift+u, if active
+        # Receives finished text (write, chunks, discard); see close()
+        self.sink = sink
+        self.window = window
+        self.streamed = 0  # characters already written to the sink
+        # Off once the cursor went back into written-out text
+        self._streaming = sink is not None
+
+    @property
+    def text(self) -> str:
+        """
+        The whole document.
+
+        Raises
+        ------
+        RuntimeError
+            On a streaming document, whose text belongs in the sink.
+        """
+        if self.sink is not None:
+            raise RuntimeError("A streaming document's text is in its sink")
+        return self._buffered()
+
+    def close(self) -> None:
+        """Write the rest of the buffer to the sink."""
+        if self.sink is not None:
+            self._doc_edge(True)
+            self._stream(len(self._left))
+        if isinstance(self._clipboard, _Spill):
+            self._clipboard.close()
+            self._clipboard = ""
+
+    @property
+    def cursor(self) -> int:
+        return len(self._left)
+
+    # ------------------------------------------------------------ typing
+    def write(self, message: str, interval: float = 0.0) -> None:
+        self.write_batch(message, [interval] * len(message))
+
+    def write_batch(self, text: str, delays) -> None:
+        if self._hex is not None:
+            for ch in text:
+                if ch in _HEX_DIGITS:
+                    self._hex.append(ch)
+                else:
+                    self._commit_hex()
+                    self._insert(ch)
+        else:
+            self._insert(text)
+        self.clock.sleep(sum(delays))
+
+    def press(self, key: str) -> None:
+        key = key.lower()
+        if self._hex is not None and key in ("space", "enter", "return"):
+            self._commit_hex()
+            return
+        if key in ("enter", "return"):
+            self._insert("\n")
+        elif key == "tab":
+            self._insert("\t")
+        elif key == "space":
+            self._insert(" ")
+        elif key == "backspace":
+            if not self._delete_selection() and (self._left or self._unstream()):
+                self._left.pop()
+        elif key in ("delete", "del"):
+            if not self._delete_selection() and self._right:
+                self._right.pop()
+        elif key in _MOVES:
+            self._selected_all = False
+            _MOVES[key](self)
+        elif key == "esc" or key == "escape":
+            self._hex = None
+        elif len(key) == 1:
+            self._insert(key)
+        else:
+            logger.debug("Virtual document ignores key %r", key)
+
+    def hotkey(self, *keys: str) -> None:
+        combo = tuple(k.lower() for k in keys)
+        mods, key = set(combo[:-1]), combo[-1]
+        if not mods:
+            self.press(key)
+        elif mods == {"shift"} and len(key) == 1:
+            self._insert(_SHIFTED.get(key, key.upper()))
+        elif mods == {"shift"} and key != "insert":
+            self.press(key)  # no selections: shift+arrow moves, shift+enter...
+        elif mods == {"ctrl", "shift"} and key == "u":
+            self._hex = []
+        elif mods == {"ctrl"} and key == "a":
+            self._selected_all = True
+        elif mods == {"ctrl"} and key in ("c", "x"):
+            if self._selected_all:
+                self._copy_all()
+                if key == "x":
+                    self._delete_selection()
+        elif (mods == {"ctrl"} and key == "v") or (
+            mods == {"shift"} and key == "insert"
+        ):
+            self._paste()
+        elif mods == {"ctrl"} and key in ("home", "end"):
+            self._selected_all = False
+            self._doc_edge(key == "end")
+        else:
+            logger.debug("Virtual document ignores hotkey %s", "+".join(combo))
+
+    # ------------------------------------------------------------ pointer
+    def moveTo(self, x: int, y: int, duration: float = 0.0) -> None:
+        self.clock.sleep(duration)
+
+    def click(self, button: str = "left", clicks: int = 1, interval: float = 0.0):
+        self.clock.sleep(interval * max(0, clicks - 1))
+
+    # ------------------------------------------------------------ internals
+    def _insert(self, text: str) -> None:
+        self._delete_selection()
+        self._left.extend(text)
+        # Stream in chunks of at least one window, keeping one window editable
+        if self._streaming and len(self._left) >= 2 * self.window:
+            self._stream(len(self._left) - self.window)
+
+    def _stream(self, n: int) -> None:
+        if n > 0:
+            self.sink.write("".join(self._left[:n]))
+            del self._left[:n]
+            self.streamed += n
+
+    def _unstream(self) -> bool:
+        """
+        Read written-out text back in front of the buffer and stop
+        streaming; False if nothing had been written out.
+        """
+        if not self.streamed:
+            return False
+        logger.info(
+            "Cursor moved into streamed text; keeping the document in memory"
+        )
+        head: List[str] = []
+        for chunk in self.sink.chunks():
+            head.extend(chunk)
+        self._left[:0] = head
+        self.sink.discard()
+        self.streamed = 0
+        self._streaming = False
+        return True
+
+    def _buffered(self) -> str:
+        return "".join(self._left) + "".join(reversed(self._right))
+
+    def _copy_all(self) -> None:
+        if isinstance(self._clipboard, _Spill):
+            self._clipboard.close()
+        if self.streamed:
+            self._clipboard = _Spill(self.sink.chunks(), self._buffered())
+        else:
+            self._clipboard = self._buffered()
+
+    def _paste(self) -> None:
+        if isinstance(self._clipboard, _Spill):
+            for chunk in self._clipboard.chunks():
+                self._insert(chunk)
+        else:
+            self._insert(self._clipboard)
+
+    def _delete_selection(self) -> bool:
+        if not self._selected_all:
+            return False
+        self._selected_all = False
+        self._left.clear()
+        self._right.clear()
+        if self.streamed:
+            self.sink.discard()
+            self.streamed = 0
+        return True
+
+    def _commit_hex(self) -> None:
+        digits, self._hex = self._hex, None
+        if digits:
+            self._insert(chr(int("".join(digits), 16)))
+
+    def _column(self) -> int:
+        col, left = 0, self._left
+        while col < len(left) and left[-1 - col] != "\n":
+            col += 1
+        if col == len(left) and self._unstream():
+            return self._column()
+        return col
+
+    def _left_one(self) -> None:
+        if self._left or self._unstream():
+            self._right.append(self._left.pop())
+
+    def _right_one(self) -> None:
+        if self._right:
+            self._left.append(self._right.pop())
+
+    def _home(self) -> None:
+        while True:
+            while self._left and self._left[-1] != "\n":
+                self._right.append(self._left.pop())
+            if self._left or not self._unstream():
+                break
+
+    def _end(self) -> None:
+        while self._right and self._right[-1] != "\n":
+            self._left.append(self._right.pop())
+
+    def _up(self) -> None:
+        col = self._column()
+        self._home()
+        if not self._left:
+            return
+        self._left_one()  # onto the end of the previous line
+        self._home()
+        self._forward_within_line(col)
+
+    def _down(self) -> None:
+        col = self._column()
+        self._end()
+        if not self._right:
+            return
+        self._right_one()  # past the newline
+        self._forward_within_line(col)
+
+    def _forward_within_line(self, n: int) -> None:
+        for _ in range(n):
+            if not self._right or self._right[-1] == "\n":
+                break
+            self._left.append(self._right.pop())
+
+    def _doc_edge(self, end: bool) -> None:
+        if end:
+            self._left.extend(reversed(self._right))
+            self._right.clear()
+        else:
+            self._unstream()
+            self._right.extend(reversed(self._left))
+            self._left.clear()
+
+
+class _Spill:
+    """Clipboard copy of a streamed document: a temp file plus the buffer."""
+
+    def __init__(self, head, tail: str) -> None:
+        self._fh = tempfile.TemporaryFile("w+", encoding="utf-8", newline="")
+        for chunk in head:
+            self._fh.write(chunk)
+        self._tail = tail
+
+    def chunks(self, size: int = STREAM_WINDOW):
+        self._fh.seek(0)
+        while True:
+            chunk = self._fh.read(size)
+            if not chunk:
+                break
+            yield chunk
+        self._fh.seek(0, 2)
+        if self._tail:
+            yield self._tail
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+_MOVES = {
+    "left": VirtualDocument._left_one,
+    "right": VirtualDocument._right_one,
+    "home": VirtualDocument._home,
+    "end": VirtualDocument._end,
+    "up": VirtualDocument._up,
+    "down": VirtualDocument._down,
+}
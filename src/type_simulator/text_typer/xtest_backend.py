@@ -0,0 +1,240 @@
+"""
+Native XTEST input backend.
+
+pyautogui sleeps ``pyautogui.PAUSE`` after every call and resolves keys per
+event.  XTestBackend talks to the X server over a single python-xlib
+connection instead: the keysym -> (keycode, shift) table is read once, fake
+key events are buffered and flushed together, and the only delays are the
+ones the caller asks for.  Characters missing from the keyboard map are
+typed by temporarily binding them to a spare keycode.
+
+It provides the subset of the pyautogui API the tokens use (``write``,
+``press``, ``hotkey``, ``moveTo``, ``click``) plus ``write_batch``, and is
+passed in through the usual ``backend=`` parameter.
+"""
+
+import logging
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Fake events buffered before an explicit flush when typing without delays
+FLUSH_EVERY = 128
+# Pointer updates per second while moveTo animates over a duration
+MOVE_STEPS_PER_SECOND = 60
+
+# pyautogui key names that differ from X keysym names
+KEY_NAMES: Dict[str, str] = {
+    "enter": "Return",
+    "return": "Return",
+    "esc": "Escape",
+    "escape": "Escape",
+    "tab": "Tab",
+    "space": "space",
+    "backspace": "BackSpace",
+    "delete": "Delete",
+    "del": "Delete",
+    "insert": "Insert",
+    "home": "Home",
+    "end": "End",
+    "pageup": "Prior",
+    "pgup": "Prior",
+    "pagedown": "Next",
+    "pgdn": "Next",
+    "up": "Up",
+    "down": "Down",
+    "left": "Left",
+    "right": "Right",
+    "ctrl": "Control_L",
+    "ctrlleft": "Control_L",
+    "ctrlright": "Control_R",
+    "shift": "Shift_L",
+    "shiftleft": "Shift_L",
+    "shiftright": "Shift_R",
+    "alt": "Alt_L",
+    "altleft": "Alt_L",
+    "altright": "Alt_R",
+    "win": "Super_L",
+    "winleft": "Super_L",
+    "super": "Super_L",
+    "command": "Super_L",
+    "capslock": "Caps_Lock",
+    "printscreen": "Print",
+}
+
+BUTTONS = {"left": 1, "middle": 2, "right": 3}
+
+
+def char_to_keysym(ch: str) -> int:
+    """X keysym of a single character (Latin-1 maps directly)."""
+    if ch == "\n":
+        return 0xFF0D  # Return
+    if ch == "\t":
+        return 0xFF09  # Tab
+    code = ord(ch)
+    return code if code < 0x100 else 0x01000000 | code
+
+
+class XTestBackend:
+    """
+    pyautogui-compatible keyboard/mouse backend using the XTEST extension.
+
+    Parameters
+    ----------
+    display :
+        X display name (defaults to ``$DISPLAY``) or an open
+        ``Xlib.display.Display``.
+    flush_every :
+        Events buffered before a flush while typing without delays.
+    """
+
+    # Characters are mapped to keysyms here, so key events type special and
+    # non-ASCII characters exactly (see routing.Ranking)
+    exact_keys = True
+
+    def __init__(self, display=None, flush_every: int = FLUSH_EVERY) -> None:
+        from Xlib import X, XK
+        from Xlib import display as xdisplay
+        from Xlib.ext import xtest
+
+        if display is None or isinstance(display, str):
+            display = xdisplay.Display(display)
+        self._d = display
+        self._X, self._XK, self._xtest = X, XK, xtest
+        if not self._d.has_extension("XTEST"):
+            raise RuntimeError("X server has no XTEST extension")
+        self.flush_every = flush_every
+        self._pending = 0
+        self._keys: Dict[int, Tuple[int, int]] = {}
+        self._spare: Optional[int] = None
+        self._spare_keysym: Optional[int] = None
+        self._load_keymap()
+        self._shift = self._keycode(self._XK.XK_Shift_L)
+
+    # ---------------------------------------------------------- keyboard
+    def write(self, message: str, interval: float = 0.0) -> None:
+        self.write_batch(message, [interval] * len(message))
+
+    def write_batch(self, text: str, delays: Sequence[float]) -> None:
+        """Type *text*, waiting ``delays[i]`` after the i-th key."""
+        for ch, delay in zip(text, delays):
+            self._tap(char_to_keysym(ch))
+            if delay > 0:
+                self._flush()
+                time.sleep(delay)
+        self._flush()
+
+    def press(self, key: str) -> None:
+        self._tap(self._key_keysym(key))
+        self._flush()
+
+    def hotkey(self, *keys: str) -> None:
+        codes = [self._keycode(self._key_keysym(k)) for k in keys]
+        for code in codes:
+            self._fake(self._X.KeyPress, code)
+        for code in reversed(codes):
+            self._fake(self._X.KeyRelease, code)
+        self._flush()
+
+    # ---------------------------------------------------------- pointer
+    def moveTo(self, x: int, y: int, duration: float = 0.0) -> None:
+        steps = int(duration * MOVE_STEPS_PER_SECOND)
+        if steps > 1:
+            pointer = self._d.screen().root.query_pointer()
+            x0, y0 = pointer.root_x, pointer.root_y
+            for i in range(1, steps):
+                t = i / steps
+                self._motion(round(x0 + (x - x0) * t), round(y0 + (y - y0) * t))
+                self._flush()
+                time.sleep(duration / steps)
+        self._motion(x, y)
+        self._flush()
+
+    def click(self, button: str = "left", clicks: int = 1, interval: float = 0.0):
+        detail = BUTTONS[button]
+        for i in range(clicks):
+            self._fake(self._X.ButtonPress, detail)
+            self._fake(self._X.ButtonRelease, detail)
+            if interval > 0 and i < clicks - 1:
+                self._flush()
+                time.sleep(interval)
+        self._flush()
+
+    def close(self) -> None:
+        self._restore_spare()
+        self._flush()
+        self._d.close()
+
+    # ---------------------------------------------------------- internals
+    def _load_keymap(self) -> None:
+        """Index the keyboard map once: keysym -> (keycode, shift level)."""
+        first = self._d.display.info.min_keycode
+        count = self._d.display.info.max_keycode - first + 1
+        for offset, syms in enumerate(self._d.get_keyboard_mapping(first, count)):
+            code = first + offset
+            if not any(syms):
+                self._spare = code if self._spare is None else self._spare
+                continue
+            for level, sym in enumerate(syms[:2]):
+                if sym and sym not in self._keys:
+                    self._keys[sym] = (code, level)
+
+    def _key_keysym(self, key: str) -> int:
+        name = KEY_NAMES.get(key.lower(), key)
+        sym = self._XK.string_to_keysym(name) or self._XK.string_to_keysym(
+            name.capitalize()  # f1 -> F1
+        )
+        if not sym and len(key) == 1:
+            sym = char_to_keysym(key)
+        if not sym:
+            raise ValueError(f"Unknown key: {key!r}")
+        return sym
+
+    def _keycode(self, sym: int) -> int:
+        return self._lookup(sym)[0]
+
+    def _lookup(self, sym: int) -> Tuple[int, int]:
+        entry = self._keys.get(sym)
+        if entry is None:
+            if self._spare is None:
+                raise ValueError(f"No keycode available for keysym {sym:#x}")
+            if self._spare_keysym != sym:
+                # Rebind the spare keycode; sync so the previous key event
+                # is processed under the old mapping
+                self._flush()
+                self._d.change_keyboard_mapping(self._spare, [(sym, sym)])
+                self._d.sync()
+                self._spare_keysym = sym
+            entry = (self._spare, 0)
+        return entry
+
+    def _tap(self, sym: int) -> None:
+        code, level = self._lookup(sym)
+        X = self._X
+        if level:
+            self._fake(X.KeyPress, self._shift)
+        self._fake(X.KeyPress, code)
+        self._fake(X.KeyRelease, code)
+        if level:
+            self._fake(X.KeyRelease, self._shift)
+
+    def _motion(self, x: int, y: int) -> None:
+        self._xtest.fake_input(self._d, self._X.MotionNotify, x=x, y=y)
+        self._pending += 1
+
+    def _fake(self, event_type: int, detail: int) -> None:
+        self._xtest.fake_input(self._d, event_type, detail)
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._pending:
+            self._d.flush()
+            self._pending = 0
+
+    def _restore_spare(self) -> None:
+        if self._spare is not None and self._spare_keysym is not None:
+            self._d.change_keyboard_mapping(self._spare, [(0, 0)])
+            self._spare_keysym = None
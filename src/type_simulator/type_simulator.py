@@ -1,18 +1,31 @@
 #!/usr/bin/env python3
 # src/type_simulator/type_simulator.py
 import logging
+import os
+import select
+import shutil
 import time
 import subprocess  # for process handles
 from enum import Enum
 from pathlib import Path
 from typing import Optional, Union
 
-import pyautogui
-
 from type_simulator.editor_manager import EditorManager
 from type_simulator.file_manager import FileManager
 
 from type_simulator.text_typer.__main__ import TextTyper
+from type_simulator.text_typer.analyzer import format_estimate
+from type_simulator.text_typer.token import PASTE_RUN_LIMIT
+from utils import timing
+from utils.inotify import PathWatch
+
+# Seconds the editor may go without progress (writes to the output file or
+# its swap/backup files) before finalization stops waiting for it to exit
+IDLE_TIMEOUT = 10.0
+# Seconds the editor gets to exit once the output file has been saved
+EXIT_GRACE = 2.0
+# Interval for checking the editor's exit where pidfd_open is unavailable
+EXIT_POLL = 0.05
 
 
 class Mode(Enum):
@@ -45,6 +58,15 @@ class TypeSimulator:
         typing_variance: float = 0.05,
         wait: float = 0.0,
         pre_launch_cmd: Optional[str] = None,
+        compile_cache=None,
+        optimizer=None,
+        source_path=None,
+        paste_run_limit: int = PASTE_RUN_LIMIT,
+        input_backend: Optional[str] = None,
+        fsync: bool = False,
+        program=None,
+        editor_lease=None,
+        progress=None,
         **kwargs,
     ):
         file_path = None
@@ -94,13 +116,39 @@ class TypeSimulator:
         else:
             self.mode = Mode(mode) if isinstance(mode, str) else mode
         self.wait = wait
+        # Flush direct-mode output to disk before it replaces the target
+        self.fsync = fsync
         self.file_manager = FileManager(str(file_path)) if file_path else None
         self.text = text
-        self.texter = TextTyper(text, typing_speed, typing_variance)
+        # CostEstimate; computed before typing only when the program is
+        # compiled anyway, otherwise on demand (see _estimate)
+        self.estimate = None
+        # The TextTyper (and with it the keyboard backend and the GUI stack)
+        # is only built once a mode actually types; see ``texter``
+        self._texter: Optional[TextTyper] = None
+        self._texter_args = dict(
+            typing_speed=typing_speed,
+            typing_variance=typing_variance,
+            cache=compile_cache,
+            optimizer=optimizer,
+            source_path=source_path,
+            paste_run_limit=paste_run_limit,
+            input_backend=input_backend,
+            program=program,
+            progress=progress,
+        )
         self.pre_launch_cmd = pre_launch_cmd
+        # A warm editor from an EditorPool, used instead of launching one
+        self.editor_lease = editor_lease
+        if editor_lease is not None:
+            if self.mode != Mode.GUI:
+                raise ValueError("An editor lease can only be used in GUI mode")
+            self._texter_args["backend"] = editor_lease.backend
         if self.mode in (Mode.GUI, Mode.TERMINAL):
             # Always honor explicit editor_cmd if provided
-            if editor_cmd:
+            if editor_lease is not None:
+                cmd = editor_lease.editor_cmd
+            elif editor_cmd:
                 cmd = editor_cmd
             else:
                 cmd = (
@@ -112,6 +160,16 @@ class TypeSimulator:
         else:
             self.editor_manager = None
 
+    @property
+    def texter(self) -> TextTyper:
+        if self._texter is None:
+            self._texter = TextTyper(self.text, **self._texter_args)
+        return self._texter
+
+    @texter.setter
+    def texter(self, value: TextTyper) -> None:
+        self._texter = value
+
     def _execute_pre_launch_cmd(self) -> None:
         """Execute the pre-launch command if one is specified."""
         if not self.pre_launch_cmd:
@@ -149,18 +207,44 @@ class TypeSimulator:
         self.logger.info("TypeSimulator completed successfully")
 
     def _run_direct(self) -> None:
-        data = self.text or self.file_manager.load_text()
-        self.file_manager.save_text(data)
+        # The output goes to a temp file next to the target and replaces it
+        # only once complete, so a failure leaves the old file untouched
+        path = self.file_manager.file_path
+        with self.file_manager.open_atomic(fsync=self.fsync) as out:
+            if self.text:
+                self._render_virtually(out)
+            else:
+                with path.open("r", encoding="utf-8", newline="") as src:
+                    shutil.copyfileobj(src, out)
+        self.logger.info("Direct mode: wrote %d characters to %s", out.written, path)
+
+    def _render_virtually(self, out) -> None:
+        """
+        Run the full token program against an in-memory document on a
+        virtual clock, streaming the resulting text to *out*.
+        """
+        from type_simulator.text_typer.virtual import VirtualDocument
+
+        document = VirtualDocument(sink=out)
+        args = dict(self._texter_args, input_backend="keys")
+        texter = TextTyper(self.text, backend=document, **args)
+        texter.simulate_typing()
+        document.close()
         self.logger.info(
-            "Direct mode: wrote %d characters to %s",
-            len(data),
-            self.file_manager.file_path,
+            "Direct mode: program took %.2fs of virtual typing time",
+            document.clock.elapsed,
         )
 
     def _launch_editor(self) -> subprocess.Popen:
         path = self.file_manager.file_path
+        if self.editor_lease is not None:
+            self.logger.debug("Retargeting pooled editor to %s", path)
+            with timing.phase("editor launch"):
+                self.editor_lease.open(path)
+            return self.editor_lease.proc
         self.logger.debug("Launching editor for file: %s", path)
-        proc = self.editor_manager.open_editor(path)
+        with timing.phase("editor launch"):
+            proc = self.editor_manager.open_editor(path)
         self.logger.debug("Editor launched, PID=%s", proc.pid)
         return proc
 
@@ -173,70 +257,133 @@ class TypeSimulator:
 
         if self.mode == Mode.GUI:
             self.logger.debug("Entering insert mode")
-            pyautogui.press("i")
+            self.texter.backend.press("i")
             time.sleep(0.1)
 
         self.logger.info("Simulating typing of %d characters", len(self.text))
         self.texter.text = self.text
+        # A streamed script is estimated only on demand: doing it here would
+        # parse it in full before the first keystroke, and then again
+        if self.texter.compiled and self._estimate() is not None:
+            self.logger.info(
+                "Estimated typing time: %s", format_estimate(self.estimate)
+            )
         self.texter.simulate_typing()
 
+    def _estimate(self):
+        """The static cost estimate of the text, computed once; None if invalid."""
+        if self.estimate is None:
+            try:
+                self.estimate = self.texter.estimate()
+            except ValueError as e:
+                self.logger.debug("Could not estimate typing time: %s", e)
+        return self.estimate
+
     def _finalize(self, proc: subprocess.Popen) -> None:
         # wait before closing editor
         if self.wait and self.wait > 0:
             self.logger.debug("Waiting %s seconds before closing editor", self.wait)
             time.sleep(self.wait)
 
-        closing_done = False
-        if self.mode == Mode.GUI and self.editor_manager:
-            # Try to detect the editor and send the right closing sequence
-            editor_cmd = self.editor_manager.editor_cmd.lower()
-            self.logger.debug(f"Attempting to close editor: {editor_cmd}")
-            if any(e in editor_cmd for e in ["vim", "vi"]):
-                self.logger.debug("Saving and quitting vim/vi")
-                pyautogui.press("esc")
-                pyautogui.typewrite(":wq\n", interval=0.02)
-                closing_done = True
-            elif "nano" in editor_cmd:
-                self.logger.debug("Saving and quitting nano")
-                pyautogui.hotkey("ctrl", "x")
-                time.sleep(0.2)
-                pyautogui.press("y")
-                time.sleep(0.1)
-                pyautogui.press("enter")
-                closing_done = True
-            # Add more editors here as needed
-            # For unknown editors, do not attempt to close automatically
-            if not closing_done:
-                self.logger.debug(
-                    "No automatic closing sequence for this editor; leaving open."
-                )
+        if self.editor_lease is not None:
+            # Pooled editors save and stay open for the next run
+            self.logger.debug("Saving in pooled editor")
+            self.texter.backend.press("esc")
+            if not self.editor_lease.save():
+                self.editor_lease.failed = True
+                raise RuntimeError("Pooled editor did not save the file")
+            return
 
-        # Calculate a dynamic timeout based on text length and typing speed
-        min_timeout = 10
-        max_timeout = 120
-        text_length = len(self.text) if self.text else 0
-        word_count = len(self.text.split()) if self.text else 0
-        # Estimate: each character takes typing_speed + variance/2 on average
-        avg_char_time = (
-            getattr(self.texter, "typing_speed", 0.15)
-            + getattr(self.texter, "typing_variance", 0.05) / 2
-        )
-        estimated_typing_time = text_length * avg_char_time
-        # Add a buffer for editor startup/closing
-        buffer_time = 5
-        timeout = min(
-            max(int(estimated_typing_time + buffer_time), min_timeout), max_timeout
-        )
-        self.logger.debug(
-            f"Waiting for editor to exit (timeout={timeout}s, text_length={text_length}, avg_char_time={avg_char_time:.3f})"
-        )
+        # Watch before the closing keys are sent, so the save is not missed
+        watch = self._watch_output()
         try:
-            proc.wait(timeout=timeout)
-        except Exception as e:
-            self.logger.warning(f"Editor did not exit in time: {e}")
+            closing_done = False
+            if self.mode == Mode.GUI and self.editor_manager:
+                # Try to detect the editor and send the right closing sequence
+                editor_cmd = self.editor_manager.editor_cmd.lower()
+                keyboard = self.texter.backend
+                self.logger.debug(f"Attempting to close editor: {editor_cmd}")
+                if any(e in editor_cmd for e in ["vim", "vi"]):
+                    self.logger.debug("Saving and quitting vim/vi")
+                    keyboard.press("esc")
+                    keyboard.write(":wq\n", interval=0.02)
+                    closing_done = True
+                elif "nano" in editor_cmd:
+                    self.logger.debug("Saving and quitting nano")
+                    keyboard.hotkey("ctrl", "x")
+                    time.sleep(0.2)
+                    keyboard.press("y")
+                    time.sleep(0.1)
+                    keyboard.press("enter")
+                    closing_done = True
+                # Add more editors here as needed
+                # For unknown editors, do not attempt to close automatically
+                if not closing_done:
+                    self.logger.debug(
+                        "No automatic closing sequence for this editor; leaving open."
+                    )
+            self._await_editor(proc, watch)
+        finally:
+            if watch is not None:
+                watch.close()
+
+    def _watch_output(self) -> Optional[PathWatch]:
+        try:
+            return PathWatch(self.file_manager.file_path)
+        except OSError as e:
+            self.logger.debug("Cannot watch the output file (%s)", e)
+            return None
+
+    def _await_editor(
+        self, proc: subprocess.Popen, watch: Optional[PathWatch]
+    ) -> None:
+        """
+        Wait until the editor has exited.  The watchdog is reset whenever
+        the editor shows progress on the output file; once the file is
+        saved the editor gets EXIT_GRACE seconds to exit.
+        """
+        if watch is not None:
+            idle = IDLE_TIMEOUT
+        else:
+            # Without file events only the static cost estimate is left,
+            # which accounts for waits, speed changes and repeats
+            est = self._estimate()
+            idle = max(est.max_seconds + 5, IDLE_TIMEOUT) if est else IDLE_TIMEOUT
+        pidfd = _pidfd(proc)
+        fds = [fd for fd in (pidfd, watch and watch.fileno()) if fd is not None]
+        self.logger.debug("Waiting for editor to exit (idle timeout=%ss)", idle)
+        deadline = time.monotonic() + idle
+        saved_at = None
+        try:
+            while proc.poll() is None:
+                now = time.monotonic()
+                limit = deadline if saved_at is None else saved_at + EXIT_GRACE
+                if now >= limit:
+                    if saved_at is None:
+                        self.logger.warning(
+                            "Editor made no progress for %ss; not waiting for it",
+                            idle,
+                        )
+                    else:
+                        self.logger.warning("Editor saved but did not exit")
+                    break
+                timeout = limit - now
+                if pidfd is None:
+                    timeout = min(timeout, EXIT_POLL)
+                if not select.select(fds, [], [], timeout)[0] or watch is None:
+                    continue
+                events = watch.read()
+                if events:
+                    deadline = time.monotonic() + idle
+                if saved_at is None and any(
+                    e.saves and watch.is_target(e) for e in events
+                ):
+                    saved_at = time.monotonic()
+                    self.logger.debug("Output file saved")
+        finally:
+            if pidfd is not None:
+                os.close(pidfd)
         self.logger.debug("Editor exited with code %s", proc.returncode)
-        # post-exit pause for stability (retain small delay)
-        time.sleep(0.5)
 
     def _run_focus(self) -> None:
         """
@@ -257,3 +404,11 @@ class TypeSimulator:
         self.texter.simulate_typing()
 
         self.logger.info("Focus mode typing completed successfully.")
+
+
+def _pidfd(proc: subprocess.Popen) -> Optional[int]:
+    """A descriptor that becomes readable when *proc* exits, if supported."""
+    try:
+        return os.pidfd_open(proc.pid)
+    except (AttributeError, OSError):
+        return None
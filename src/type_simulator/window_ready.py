@@ -0,0 +1,235 @@
+# src/type_simulator/window_ready.py
+"""
+Event-driven detection of a freshly launched editor window.
+
+Instead of sleeping a fixed time after starting the editor, WindowWatcher
+listens to the X server: it subscribes to window creation on the root
+window *before* the editor is started, waits for a top-level window whose
+``_NET_WM_PID`` or title matches, until that window is mapped, gives it the
+input focus and confirms the server reports it focused.  A per-editor
+:class:`ReadinessRule` can additionally wait for the title to change, e.g.
+vim renaming the terminal once it has loaded the file.
+"""
+
+import fnmatch
+import logging
+import os
+import select
+import shlex
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for the editor window to be mapped and focused
+READY_TIMEOUT = 10.0
+
+
+@dataclass(frozen=True)
+class ReadinessRule:
+    """
+    When a launched editor counts as ready, beyond mapped and matched.
+
+    Parameters
+    ----------
+    focus :
+        Give the window the input focus and wait until the server has it.
+    title :
+        Glob the window title must match, ``{name}`` standing for the
+        file's base name; None accepts any title.
+    title_wait :
+        Seconds to wait for the title after the window is focused.  The
+        title is a confirmation only: when it does not show up in time the
+        window is used anyway.
+    """
+
+    focus: bool = True
+    title: Optional[str] = None
+    title_wait: float = 2.0
+
+
+DEFAULT_RULE = ReadinessRule()
+# vim and gedit put the file name in the title once the file is loaded
+_FILE_IN_TITLE = ReadinessRule(title="*{name}*")
+EDITOR_RULES: Dict[str, ReadinessRule] = {
+    "vi": _FILE_IN_TITLE,
+    "vim": _FILE_IN_TITLE,
+    "nvim": _FILE_IN_TITLE,
+    "gvim": _FILE_IN_TITLE,
+    "gedit": _FILE_IN_TITLE,
+}
+
+
+def rule_for(editor_cmd: str) -> ReadinessRule:
+    """The readiness rule of the first known editor named in *editor_cmd*."""
+    for word in shlex.split(editor_cmd):
+        rule = EDITOR_RULES.get(os.path.basename(word))
+        if rule is not None:
+            return rule
+    return DEFAULT_RULE
+
+
+@dataclass(frozen=True)
+class ReadyWindow:
+    """The window that became ready; ``title`` as last seen."""
+
+    window_id: int
+    title: str
+    title_matched: bool
+
+
+class WindowWatcher:
+    """
+    Watches the X server for a new editor window.  Create it before
+    starting the editor so no creation event is missed.
+
+    Parameters
+    ----------
+    display :
+        X display name (default ``$DISPLAY``) or an open
+        ``Xlib.display.Display``.
+    """
+
+    def __init__(self, display=None) -> None:
+        from Xlib import X, Xatom
+        from Xlib import display as xdisplay
+
+        if display is None or isinstance(display, str):
+            display = xdisplay.Display(display)
+        self._d = display
+        self._X = X
+        self._root = display.screen().root
+        self._root.change_attributes(event_mask=X.SubstructureNotifyMask)
+        atom = display.intern_atom
+        self._pid_atom = atom("_NET_WM_PID")
+        self._net_name = atom("_NET_WM_NAME")
+        self._utf8 = atom("UTF8_STRING")
+        self._wm_name = Xatom.WM_NAME
+        self._cardinal = Xatom.CARDINAL
+        self._windows: Dict[int, object] = {}  # top-level id -> window
+        self._mapped = set()
+        for window in self._root.query_tree().children:
+            self._track(window)
+            try:
+                if window.get_attributes().map_state != X.IsUnmapped:
+                    self._mapped.add(window.id)
+            except Exception:  # destroyed in the meantime
+                self._windows.pop(window.id, None)
+        display.sync()
+
+    def wait_ready(
+        self,
+        pid: Optional[int] = None,
+        name: Optional[str] = None,
+        rule: ReadinessRule = DEFAULT_RULE,
+        timeout: float = READY_TIMEOUT,
+    ) -> ReadyWindow:
+        """
+        Wait for the window of process *pid* (or whose title contains
+        *name*) to be mapped and, per *rule*, focused and retitled.
+
+        Raises
+        ------
+        TimeoutError
+            If no such window is mapped (and focused) within *timeout*.
+        """
+        deadline = time.monotonic() + timeout
+        window = None
+        while True:
+            if window is None:
+                window = self._find(pid, name)
+            if window is not None and (not rule.focus or self._focus(window)):
+                break
+            if not self._wait_event(deadline):
+                what = "focused" if window is not None else "mapped"
+                raise TimeoutError(f"Editor window was not {what} in {timeout}s")
+
+        title = self._title(window)
+        matched = True
+        if rule.title is not None:
+            pattern = rule.title.replace("{name}", name or "")
+            title_deadline = min(deadline, time.monotonic() + rule.title_wait)
+            while not fnmatch.fnmatchcase(title, pattern):
+                if not self._wait_event(title_deadline):
+                    logger.debug("Title %r never matched %r", title, pattern)
+                    matched = False
+                    break
+                title = self._title(window)
+        return ReadyWindow(window.id, title, matched)
+
+    def close(self) -> None:
+        self._d.close()
+
+    # ------------------------------------------------------------------ #
+    def _track(self, window) -> None:
+        X = self._X
+        try:
+            window.change_attributes(
+                event_mask=X.StructureNotifyMask | X.PropertyChangeMask
+            )
+        except Exception:
+            return
+        self._windows[window.id] = window
+
+    def _wait_event(self, deadline: float) -> bool:
+        """Process at least one event; False if *deadline* passed first."""
+        d = self._d
+        if not d.pending_events():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if not select.select([d.fileno()], [], [], remaining)[0]:
+                return False
+        X = self._X
+        while d.pending_events():
+            ev = d.next_event()
+            if ev.type == X.CreateNotify and ev.parent == self._root:
+                self._track(ev.window)
+            elif ev.type == X.MapNotify:
+                self._mapped.add(ev.window.id)
+            elif ev.type == X.UnmapNotify:
+                self._mapped.discard(ev.window.id)
+            elif ev.type == X.DestroyNotify:
+                self._windows.pop(ev.window.id, None)
+                self._mapped.discard(ev.window.id)
+        return True
+
+    def _find(self, pid: Optional[int], name: Optional[str]):
+        for wid, window in list(self._windows.items()):
+            if wid not in self._mapped:
+                continue
+            try:
+                if pid is not None and self._pid(window) == pid:
+                    return window
+                if name and name in self._title(window):
+                    return window
+            except Exception:  # window gone
+                self._windows.pop(wid, None)
+        return None
+
+    def _focus(self, window) -> bool:
+        X = self._X
+        failed = []
+        window.set_input_focus(
+            X.RevertToParent, X.CurrentTime, onerror=lambda *a: failed.append(a)
+        )
+        self._d.sync()
+        if failed:  # e.g. not viewable yet; retried on the next event
+            return False
+        focus = self._d.get_input_focus().focus
+        return getattr(focus, "id", focus) == window.id
+
+    def _pid(self, window) -> Optional[int]:
+        prop = window.get_full_property(self._pid_atom, self._cardinal)
+        return int(prop.value[0]) if prop and len(prop.value) else None
+
+    def _title(self, window) -> str:
+        for atom, kind in ((self._net_name, self._utf8), (self._wm_name, 0)):
+            prop = window.get_full_property(atom, kind)
+            if prop and prop.value:
+                value = prop.value
+                if isinstance(value, bytes):
+                    value = value.decode("utf-8", "replace")
+                return str(value)
+        return ""
@@ -0,0 +1,75 @@
+# src/type_simulator/xvfb.py
+"""Private Xvfb servers for unattended runs."""
+
+import logging
+import os
+import select
+import shutil
+import subprocess
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCREEN = "1280x800x24"
+# Seconds to wait for an Xvfb to report its display number
+XVFB_TIMEOUT = 10.0
+
+
+class XvfbDisplay:
+    """
+    A private Xvfb server on a free display number.
+
+    Parameters
+    ----------
+    screen :
+        Screen geometry and depth, e.g. ``"1280x800x24"``.
+    """
+
+    def __init__(self, screen: str = DEFAULT_SCREEN) -> None:
+        if not shutil.which("Xvfb"):
+            raise RuntimeError("Xvfb is not installed")
+        read_fd, write_fd = os.pipe()
+        try:
+            self.proc = subprocess.Popen(
+                ["Xvfb", "-displayfd", str(write_fd), "-screen", "0", screen]
+                + ["-nolisten", "tcp"],
+                pass_fds=(write_fd,),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        finally:
+            os.close(write_fd)
+        try:
+            self.name = ":" + self._read_display(read_fd)
+        except BaseException:
+            self.stop()
+            raise
+        finally:
+            os.close(read_fd)
+        logger.debug("Started Xvfb on %s (pid %d)", self.name, self.proc.pid)
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def stop(self) -> None:
+        if self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+
+    def _read_display(self, fd: int) -> str:
+        # Xvfb writes the display number once it accepts connections
+        deadline = time.monotonic() + XVFB_TIMEOUT
+        data = b""
+        while not data.endswith(b"\n"):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                raise RuntimeError("Xvfb did not report a display in time")
+            chunk = os.read(fd, 32)
+            if not chunk:
+                raise RuntimeError("Xvfb exited during startup")
+            data += chunk
+        return data.decode().strip()
@@ -0,0 +1,175 @@
+"""
+Minimal Linux inotify binding over ctypes.
+
+Used to notice the moment an editor has written a file, instead of guessing
+with timeouts.  :class:`PathWatch` watches a file through its directory, so
+editors that save by writing a new file and renaming it over the old one
+(``IN_MOVED_TO``) are seen as well as those writing in place
+(``IN_CLOSE_WRITE``)::
+
+    with PathWatch("out.txt") as watch:
+        ...  # tell the editor to save
+        for event in watch.read(timeout=5):
+            if event.saves:
+                break
+"""
+
+import ctypes
+import errno
+import os
+import select
+import struct
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Union
+
+# Event bits (see inotify(7))
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+
+# inotify_init1 flags (same values as O_NONBLOCK / O_CLOEXEC)
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+
+# Events that mean a file's new content is complete
+SAVE_EVENTS = IN_CLOSE_WRITE | IN_MOVED_TO
+# Events a PathWatch subscribes to
+PATH_EVENTS = SAVE_EVENTS | IN_MODIFY | IN_CREATE | IN_DELETE | IN_MOVED_FROM
+
+# struct inotify_event: int wd; uint32 mask, cookie, len; char name[len]
+_HEADER = struct.Struct("iIII")
+_READ_SIZE = 64 * 1024
+
+_libc = None
+
+
+def _load_libc():
+    global _libc
+    if _libc is None:
+        # libc is already loaded into the interpreter; no library lookup
+        libc = ctypes.CDLL(None, use_errno=True)
+        if hasattr(libc, "inotify_init1"):
+            libc.inotify_init1.argtypes = [ctypes.c_int]
+            libc.inotify_add_watch.argtypes = [
+                ctypes.c_int,
+                ctypes.c_char_p,
+                ctypes.c_uint32,
+            ]
+            libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        _libc = libc
+    return _libc
+
+
+def available() -> bool:
+    """Whether inotify can be used on this system."""
+    try:
+        return hasattr(_load_libc(), "inotify_init1")
+    except OSError:
+        return False
+
+
+def _check(result: int) -> int:
+    if result < 0:
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err))
+    return result
+
+
+class Event(NamedTuple):
+    wd: int
+    mask: int
+    cookie: int
+    name: str
+
+    @property
+    def saves(self) -> bool:
+        return bool(self.mask & SAVE_EVENTS)
+
+
+class Inotify:
+    """An inotify instance; raises OSError where inotify is unavailable."""
+
+    def __init__(self) -> None:
+        libc = _load_libc()
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self._libc = libc
+        self._fd = _check(libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC))
+
+    def fileno(self) -> int:
+        return self._fd
+
+    def add_watch(self, path: Union[str, Path], mask: int) -> int:
+        """Watch *path* for the events in *mask*; returns the watch id."""
+        return _check(self._libc.inotify_add_watch(self._fd, os.fsencode(path), mask))
+
+    def rm_watch(self, wd: int) -> None:
+        _check(self._libc.inotify_rm_watch(self._fd, wd))
+
+    def read(self, timeout: Optional[float] = 0) -> List[Event]:
+        """
+        Events queued now, waiting up to *timeout* seconds (None: forever)
+        for the first; an empty list if none arrived.
+        """
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return []
+        try:
+            data = os.read(self._fd, _READ_SIZE)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset + _HEADER.size <= len(data):
+            wd, mask, cookie, length = _HEADER.unpack_from(data, offset)
+            offset += _HEADER.size
+            raw = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            events.append(Event(wd, mask, cookie, os.fsdecode(raw)))
+        return events
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __enter__(self) -> "Inotify":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class PathWatch(Inotify):
+    """
+    Events about one file, watched through its parent directory.  Besides
+    the file itself, names starting or ending with the file's name (vim's
+    ``.out.txt.swp``, backups such as ``out.txt~``) are reported, as signs
+    the editor is still working on it.
+    """
+
+    def __init__(self, path: Union[str, Path], mask: int = PATH_EVENTS) -> None:
+        super().__init__()
+        path = Path(path).absolute()
+        self.name = path.name
+        try:
+            self.add_watch(path.parent, mask)
+        except BaseException:
+            self.close()
+            raise
+
+    def read(self, timeout: Optional[float] = 0) -> List[Event]:
+        name = self.name
+        return [
+            e
+            for e in super().read(timeout)
+            if e.mask & IN_Q_OVERFLOW or name in e.name
+        ]
+
+    def is_target(self, event: Event) -> bool:
+        """Whether *event* is about the watched file itself."""
+        return event.name == self.name
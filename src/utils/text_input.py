@@ -73,8 +73,14 @@ def _read_stdin(timeout: float = STDIN_TIMEOUT, max_size: int = MAX_STDIN_SIZE)
         raise StdinReadError(f"Error reading from stdin: {e}") from e
 
 
-def _read_file(path: Union[str, Path], max_size: int = MAX_FILE_SIZE) -> str:
-    """Read file with size limit and encoding detection."""
+def read_file(path: Union[str, Path], max_size: int = MAX_FILE_SIZE) -> str:
+    """
+    Read file with size limit and encoding detection.
+
+    Raises:
+        FileReadError: When the file cannot be read or decoded
+        FileSizeError: When the file exceeds max_size
+    """
     try:
         path = Path(path).expanduser().resolve()
 
@@ -162,7 +168,7 @@ def get_text_content(text_arg: Optional[str] = None) -> str:
         if path.is_file():
             logger.debug(f"Attempting to read from file: {path}")
             try:
-                return _read_file(path)
+                return read_file(path)
             except (FileReadError, FileSizeError) as e:
                 logger.warning(f"Failed to read file: {e}")
                 # Don't fall through - if it exists as a file but we can't read it,
@@ -0,0 +1,90 @@
+"""
+Startup timing for ``--timing-report``.
+
+A process-wide :data:`TIMINGS` recorder collects how long the phases before
+the first keystroke take (imports, parsing, backend initialisation, editor
+launch) and when the first keystroke was sent, measured from process start,
+so startup regressions show up in one table.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+
+def _process_age() -> Optional[float]:
+    """Seconds since this process started (Linux), else None."""
+    try:
+        with open("/proc/self/stat") as fh:
+            # Field 22 is the start time in clock ticks after boot; the
+            # command name (field 2) may contain spaces, so split after it
+            start_ticks = int(fh.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as fh:
+            uptime = float(fh.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class TimingReport:
+    """
+    Durations of named phases plus one-off milestones.
+
+    ``start`` is a ``time.perf_counter`` value taken as process start.
+    """
+
+    def __init__(self, start: Optional[float] = None) -> None:
+        if start is None:
+            age = _process_age()
+            start = time.perf_counter() - (age or 0.0)
+        self.start = start
+        self.phases: Dict[str, float] = {}
+        self.milestones: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Add the time spent in the ``with`` block to phase *name*."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + (
+                time.perf_counter() - t0
+            )
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add an externally measured duration to phase *name*."""
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def milestone(self, name: str) -> None:
+        """Record the first time *name* happens, relative to process start."""
+        if name not in self.milestones:
+            self.milestones[name] = time.perf_counter() - self.start
+
+    def summary(self) -> str:
+        lines = ["\n⏱️  Timing Report:", "-" * 40]
+        for name, seconds in self.phases.items():
+            lines.append(f"  {name + ':':<22}{seconds * 1e3:>9.1f} ms")
+        for name, seconds in self.milestones.items():
+            lines.append(f"  {name + ' at:':<22}{seconds * 1e3:>9.1f} ms")
+        lines.append("-" * 40)
+        return "\n".join(lines)
+
+
+TIMINGS = TimingReport()
+
+
+def phase(name: str):
+    """Time a phase on the process-wide :data:`TIMINGS`."""
+    return TIMINGS.phase(name)
+
+
+def record(name: str, seconds: float) -> None:
+    """Record a measured duration on the process-wide :data:`TIMINGS`."""
+    TIMINGS.record(name, seconds)
+
+
+def milestone(name: str) -> None:
+    """Record a milestone on the process-wide :data:`TIMINGS`."""
+    TIMINGS.milestone(name)
@@ -0,0 +1,25 @@
+from unittest import mock
+
+import pytest
+
+from src.parser import TypeSimulatorParser
+
+
+def parse(*argv):
+    with mock.patch("sys.argv", ["type_simulator", *argv]):
+        return TypeSimulatorParser().parse()
+
+
+@pytest.mark.parametrize(
+    "command", [["compile", "a.txt"], ["batch", "m.jsonl"], ["serve"]]
+)
+def test_subcommands_keep_the_main_cache_dir(command):
+    assert parse("--cache-dir", "/tmp/main", *command).cache_dir == "/tmp/main"
+    assert parse(*command, "--cache-dir", "/tmp/sub").cache_dir == "/tmp/sub"
+    assert parse(*command).cache_dir is None
+
+
+def test_paste_run_limit_default_follows_the_typer():
+    from type_simulator.text_typer.token import PASTE_RUN_LIMIT
+
+    assert parse().paste_run_limit == PASTE_RUN_LIMIT
@@ -0,0 +1,102 @@
+import json
+import os
+
+import pytest
+
+from type_simulator.batch import (
+    Job,
+    JobResult,
+    format_report,
+    load_manifest,
+    prepare,
+    run_batch,
+)
+
+
+def write_manifest(path, *jobs):
+    path.write_text("\n".join(json.dumps(j) for j in jobs) + "\n\n")
+    return path
+
+
+def test_load_manifest(tmp_path):
+    manifest = write_manifest(
+        tmp_path / "jobs.jsonl",
+        {"input": "a", "mode": "direct", "output": "a.txt", "id": "first"},
+        {"input": "b", "profile": "fast", "editor": "xterm -e vim"},
+    )
+    jobs = load_manifest(manifest)
+    assert [j.id for j in jobs] == ["first", "line-2"]
+    assert jobs[1].mode == "gui"
+    assert jobs[1].typing_params() == (0.03, 0.01)
+    assert Job("x", speed=0.3, profile="fast").typing_params() == (0.3, 0.01)
+
+
+@pytest.mark.parametrize(
+    "job, message",
+    [
+        ({"mode": "direct"}, "'input'"),
+        ({"input": "a", "colour": "red"}, "unknown field"),
+        ({"input": "a", "mode": "direct"}, "needs an 'output'"),
+        ({"input": "a", "mode": "tty"}, "mode must be"),
+        ({"input": "a", "profile": "nope"}, "unknown profile"),
+        ({"input": "a", "speed": "fast"}, "'speed' must be a number"),
+        ({"input": "a", "variance": True}, "'variance' must be a number"),
+        ({"input": "a", "wait": None}, "'wait' must be"),
+        ({"input": "a", "editor": 3}, "'editor' must be a string"),
+    ],
+)
+def test_load_manifest_rejects_bad_jobs(tmp_path, job, message):
+    manifest = write_manifest(tmp_path / "jobs.jsonl", {"input": "ok"}, job)
+    with pytest.raises(ValueError, match=f"jobs.jsonl:2: .*{message}"):
+        load_manifest(manifest)
+
+
+def test_prepare_compiles_each_input_once_longest_first(tmp_path):
+    script = tmp_path / "script.txt"
+    script.write_text("{REPEAT_10}slow text{/REPEAT}")
+    jobs = [
+        Job("quick", mode="direct", output="q.txt", id="quick"),
+        Job(str(script), mode="direct", output="s1.txt", id="long"),
+        Job(str(script), mode="direct", output="s2.txt", id="long-fast", speed=0.01),
+        Job("{INCLUDE missing.txt}", mode="direct", output="m.txt", id="broken"),
+    ]
+    programs = tmp_path / "programs"
+    programs.mkdir()
+    tasks, failed = prepare(jobs, programs)
+    assert [t["job"]["id"] for t in tasks] == ["long", "long-fast", "quick"]
+    assert tasks[0]["program"] == tasks[1]["program"]
+    assert len(os.listdir(programs)) == 2
+    assert [r.id for r in failed] == ["broken"]
+    assert "missing.txt" in failed[0].error
+
+
+def test_run_batch_direct_jobs(tmp_path):
+    jobs = [
+        Job(
+            f"{{REPEAT_{n}}}ab{{/REPEAT}}",
+            mode="direct",
+            output=str(tmp_path / f"{n}.txt"),
+            id=f"job-{n}",
+            speed=0,
+        )
+        for n in (1, 2, 3)
+    ]
+    results = run_batch(jobs, workers=2)
+    assert [r.id for r in results] == ["job-1", "job-2", "job-3"]
+    assert all(r.ok for r in results), [r.error for r in results]
+    assert {r.worker for r in results} <= {0, 1}
+    for n in (1, 2, 3):
+        assert (tmp_path / f"{n}.txt").read_text() == "ab" * n
+
+
+def test_format_report():
+    report = format_report(
+        [
+            JobResult("a", True, 2.0, 2.5, 0, ":1", "a.txt"),
+            JobResult("b", False, error="boom"),
+        ],
+        4.0,
+    )
+    assert "✓ a" in report and "-> a.txt" in report
+    assert "✗ b" in report and "boom" in report
+    assert "1 ok, 1 failed in 4.00s (0.50 jobs/s, 1 worker(s), 50% busy)" in report
@@ -0,0 +1,123 @@
+import threading
+
+import pytest
+
+from type_simulator.daemon import (
+    CANCELLED,
+    DONE,
+    QUEUED,
+    JobQueue,
+    TypingDaemon,
+    request,
+)
+
+
+def direct(text, output, **extra):
+    return dict(input=text, mode="direct", output=str(output), **extra)
+
+
+def test_queue_orders_by_priority_then_submission(tmp_path):
+    jobs = JobQueue()
+    for name, priority in [("a", 0), ("b", 5), ("c", 0), ("d", 5)]:
+        jobs.submit(direct("x", tmp_path / name, id=name), priority)
+    order = [jobs.next(timeout=0).id for _ in range(4)]
+    assert order == ["b", "d", "a", "c"]
+    assert jobs.next(timeout=0) is None
+
+
+def test_queue_cancel_duplicates_and_history(tmp_path):
+    jobs = JobQueue(history=1)
+    events = []
+    jobs.submit(direct("x", tmp_path / "a", id="a"), listener=events.append)
+    with pytest.raises(ValueError, match="already queued"):
+        jobs.submit(direct("y", tmp_path / "a", id="a"))
+    assert jobs.cancel("a").state == CANCELLED
+    assert [e["event"] for e in events] == ["queued", "finished"]
+    assert jobs.next(timeout=0) is None
+    # A finished id can be reused; only the newest finished job is kept
+    assert jobs.submit(direct("y", tmp_path / "a", id="a")).state == QUEUED
+    jobs.finish(jobs.next(timeout=0), DONE)
+    jobs.finish(jobs.submit(direct("z", tmp_path / "b", id="b")), DONE)
+    assert [r.id for r in jobs.records()] == ["b"]
+    with pytest.raises(KeyError):
+        jobs.cancel("missing")
+
+
+def test_cancelled_running_job_writes_nothing(tmp_path):
+    daemon = TypingDaemon(str(tmp_path / "d.sock"))
+    record = daemon.queue.submit(direct("abc{WAIT_1}def", tmp_path / "out.txt"))
+    daemon.queue.next()
+    record.cancel_requested.set()
+    daemon._run(record)
+    assert record.state == CANCELLED
+    assert record.tokens == 1
+    assert (tmp_path / "out.txt").read_text() == ""
+
+
+def test_edited_include_is_picked_up_by_the_next_job(tmp_path):
+    daemon = TypingDaemon(str(tmp_path / "d.sock"))
+    script = tmp_path / "main.txt"
+    (tmp_path / "inc.txt").write_text("one")
+    text = "A{INCLUDE inc.txt}B"
+
+    def typed():
+        program = daemon._compile(text, str(script))
+        return "".join(t.text for t in program.tokens())
+
+    assert typed() == "AoneB"
+    (tmp_path / "inc.txt").write_text("three")
+    assert typed() == "AthreeB"
+
+
+@pytest.fixture
+def served(tmp_path):
+    daemon = TypingDaemon(str(tmp_path / "d.sock"))
+    daemon.start()
+    thread = threading.Thread(target=daemon._server.serve_forever)
+    thread.start()
+    yield daemon
+    list(request({"op": "shutdown"}, daemon.socket_path))
+    thread.join(timeout=5)
+    daemon.close()
+
+
+def test_socket_submit_follow_status_and_errors(served, tmp_path):
+    path = served.socket_path
+    out = tmp_path / "out.txt"
+    replies = list(request({"op": "submit", "job": direct("hi{WAIT_1}!", out)}, path))
+    assert replies[0] == {"ok": True, "id": "job-1"}
+    events = [r["event"] for r in replies[1:]]
+    assert events[:2] == ["queued", "started"] and events[-1] == "finished"
+    assert replies[-1]["state"] == DONE and replies[-1]["tokens"] == 3
+    assert out.read_text() == "hi!"
+
+    (status,) = request({"op": "status", "id": "job-1"}, path)
+    assert status["job"]["state"] == DONE
+    (error,) = request({"op": "submit", "job": {"mode": "direct"}}, path)
+    assert error["ok"] is False and "input" in error["error"]
+    (error,) = request({"op": "cancel", "id": "nope"}, path)
+    assert error == {"ok": False, "error": "unknown job 'nope'"}
+
+
+def test_malformed_requests_get_error_replies(served, tmp_path):
+    path = served.socket_path
+    job = direct("x", tmp_path / "out.txt")
+    for req, message in [
+        ({"op": "submit", "job": job, "priority": None}, "'priority'"),
+        ({"op": "submit", "job": dict(job, speed="fast")}, "'speed'"),
+        ({"op": "submit", "job": job, "follow": False, "priority": "1"}, "'priority'"),
+    ]:
+        (error,) = request(req, path)
+        assert error["ok"] is False and message in error["error"]
+    (pong,) = request({"op": "ping"}, path)  # the daemon is still serving
+    assert pong["ok"] is True
+
+
+def test_second_daemon_refuses_a_live_socket(served):
+    with pytest.raises(RuntimeError, match="already listening"):
+        TypingDaemon(served.socket_path).start()
+
+
+def test_client_reports_missing_daemon(tmp_path):
+    with pytest.raises(ConnectionError):
+        list(request({"op": "status"}, str(tmp_path / "none.sock")))
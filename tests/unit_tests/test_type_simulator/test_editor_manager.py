@@ -10,3 +10,15 @@ def test_editor_manager_default_cmd():
 def test_editor_manager_custom_cmd():
     em = EditorManager("nano")
     assert em.editor_cmd == "nano"
+
+
+def test_open_editor_falls_back_to_sleeps_without_x(monkeypatch):
+    from type_simulator import editor_manager
+
+    slept = []
+    monkeypatch.setattr(EditorManager, "_watcher", staticmethod(lambda: None))
+    monkeypatch.setattr(editor_manager.subprocess, "Popen", lambda cmd: cmd)
+    monkeypatch.setattr(editor_manager.time, "sleep", slept.append)
+    monkeypatch.setattr(EditorManager, "_focus_window", staticmethod(lambda n: None))
+    assert EditorManager("vi").open_editor("/tmp/a.txt") == ["vi", "/tmp/a.txt"]
+    assert slept == [2]
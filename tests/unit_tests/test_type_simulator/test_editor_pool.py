@@ -0,0 +1,123 @@
+import subprocess
+
+import pytest
+
+from type_simulator import editor_pool
+from type_simulator.editor_pool import EditorPool, is_vim, vim_escape
+from type_simulator.type_simulator import Mode, TypeSimulator
+
+
+class FakeVim:
+    """Keyboard that plays vim: understands :e!, :w! and %bwipeout!."""
+
+    def __init__(self, display):
+        self.display = display
+        self.commands = []
+        self.buffer = ""
+        self.path = None
+        self.insert = False
+
+    def press(self, key):
+        if key == "esc":
+            self.insert = False
+        elif key == "i":
+            self.insert = True
+        elif self.insert and key == "enter":
+            self.buffer += "\n"
+
+    def write(self, message, interval=0.0):
+        if not self.insert:
+            command = message.lstrip(":").rstrip("\n")
+            self.commands.append(command)
+            if command.startswith("e! "):
+                self.path = command[3:].replace("\\", "")
+                self.buffer = ""
+            elif command == "w!":
+                with open(self.path, "w") as fh:
+                    fh.write(self.buffer)
+            return
+        self.buffer += message
+
+    def hotkey(self, *keys):
+        pass
+
+
+class FakeWatcher:
+    def wait_ready(self, **kwargs):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    launched = []
+    real_popen = subprocess.Popen
+
+    def popen(cmd, env):
+        launched.append(env["DISPLAY"])
+        return real_popen(["sleep", "60"])
+
+    monkeypatch.setattr(editor_pool.subprocess, "Popen", popen)
+    monkeypatch.setattr(editor_pool.EditorSlot, "_watch", lambda self: FakeWatcher())
+    pool = EditorPool(
+        editor_cmd="xterm -e vim", displays=[":7"], max_uses=3, backend_factory=FakeVim
+    )
+    pool.launched = launched
+    yield pool
+    pool.close()
+
+
+def test_vim_helpers():
+    assert vim_escape("/tmp/my file#1.txt") == "/tmp/my\\ file\\#1.txt"
+    assert is_vim("xterm -fa 'Monospace' -e vi")
+    assert is_vim("xterm -e /usr/bin/vim")
+    assert not is_vim("xterm -e nano")
+    with pytest.raises(ValueError):
+        EditorPool(editor_cmd="xterm -e nano")
+
+
+def test_lease_retargets_saves_and_resets(pool, tmp_path):
+    target = tmp_path / "out file.txt"
+    with pool.lease() as lease:
+        TypeSimulator(
+            target,
+            "hello",
+            mode=Mode.GUI,
+            typing_speed=0,
+            typing_variance=0,
+            editor_lease=lease,
+        ).run()
+        keyboard = lease.backend
+    assert target.read_text() == "hello"
+    assert keyboard.commands == [
+        f"e! {vim_escape(str(target))}",
+        "w!",
+        "%bwipeout!",
+    ]
+    assert pool.launched == [":7"]  # reused, not relaunched
+
+
+def test_dead_and_worn_out_editors_are_relaunched(pool):
+    with pool.lease() as lease:
+        first = lease.proc
+    first.kill()
+    first.wait()
+    with pool.lease() as lease:
+        assert lease.proc is not first
+    assert len(pool.launched) == 2
+    for _ in range(3):  # max_uses=3 counts from the relaunch
+        with pool.lease():
+            pass
+    assert len(pool.launched) == 3
+
+
+def test_failed_run_recycles_the_editor(pool):
+    with pytest.raises(RuntimeError):
+        with pool.lease():
+            raise RuntimeError("typing failed")
+    assert len(pool.launched) == 2
+    with pytest.raises(TimeoutError):
+        with pool.lease(), pool.lease(timeout=0.01):
+            pass
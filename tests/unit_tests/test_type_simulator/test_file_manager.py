@@ -27,3 +27,35 @@ def test_file_manager_file_not_found():
     fm = FileManager(create_if_missing=False)
     with pytest.raises(FileNotFoundError):
         fm.load_text()
+
+
+def test_file_manager_open_atomic_replaces_on_success():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file_path = Path(tmpdir) / "out.txt"
+        fm = FileManager(file_path)
+        fm.save_text("old")
+        with fm.open_atomic(fsync=True) as out:
+            out.write("new ")
+            out.write("content")
+            # The target keeps its old content until the block completes
+            assert fm.load_text() == "old"
+            assert out.getvalue() == "new content"
+            assert list(out.chunks(4)) == ["new ", "cont", "ent"]
+            out.write("!")  # reading back leaves the file positioned at the end
+            assert out.getvalue() == "new content!"
+        assert fm.load_text() == "new content!"
+        assert out.written == len("new content!")
+        assert [p.name for p in Path(tmpdir).iterdir()] == ["out.txt"]
+
+
+def test_file_manager_open_atomic_keeps_target_on_error():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file_path = Path(tmpdir) / "out.txt"
+        fm = FileManager(file_path)
+        fm.save_text("old")
+        with pytest.raises(RuntimeError):
+            with fm.open_atomic() as out:
+                out.write("partial")
+                raise RuntimeError("crash")
+        assert fm.load_text() == "old"
+        assert [p.name for p in Path(tmpdir).iterdir()] == ["out.txt"]
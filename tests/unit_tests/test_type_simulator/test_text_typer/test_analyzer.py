@@ -0,0 +1,74 @@
+import pytest
+
+from type_simulator.text_typer.analyzer import CostAnalyzer, char_interval, estimate
+from type_simulator.text_typer.parser import CommandParser
+
+
+def cost(text, speed=0.1, variance=0.0):
+    return estimate(CommandParser().parse(text), speed, variance)
+
+
+def test_char_interval_clamps_at_zero():
+    assert char_interval(0.1, 0.0) == (0.1, 0.1, 0.1)
+    assert char_interval(0.1, 0.05) == pytest.approx((0.05, 0.1, 0.15))
+    lo, mid, hi = char_interval(0.0, 0.1)
+    assert lo == 0.0
+    assert mid == pytest.approx(0.025)  # E[max(0, U(-0.1, 0.1))]
+    assert hi == pytest.approx(0.1)
+
+
+def test_plain_text_and_waits():
+    est = cost("abc{WAIT_2}{<enter>}")
+    assert est.expected_seconds == pytest.approx(2.3)
+    assert est.min_keystrokes == est.max_keystrokes == 4
+    assert est.characters == 3
+
+
+def test_speed_changes_apply_to_following_text():
+    est = cost("ab{SPEED_1}cd", speed=0.1)
+    assert est.expected_seconds == pytest.approx(0.2 + 2.0)
+
+
+def test_repeat_is_multiplied_not_expanded():
+    est = cost("{REPEAT_1000}{REPEAT_1000}ab{/REPEAT}{/REPEAT}")
+    assert est.expected_seconds == pytest.approx(2 * 1000 * 1000 * 0.1)
+    assert est.max_keystrokes == 2 * 1000 * 1000
+
+
+def test_repeat_with_speed_change_uses_steady_state():
+    # First pass types "a" at 0.1 then switches to 1.0 for the rest
+    est = cost("{REPEAT_3}a{SPEED_1}b{/REPEAT}", speed=0.1)
+    assert est.expected_seconds == pytest.approx(0.1 + 1.0 + 2 * (1.0 + 1.0))
+
+
+def test_zero_repeat_costs_nothing():
+    assert cost("{REPEAT_0}abc{WAIT_5}{/REPEAT}").expected_seconds == 0
+
+
+def test_variables_are_tracked():
+    est = cost("{SET_x=hello}{GET_x}{GET_missing}")
+    assert est.characters == 5
+
+
+def test_problematic_chars_widen_bounds():
+    est = cost("a;", speed=0.1)
+    assert est.min_seconds == pytest.approx(0.2)
+    assert est.max_seconds == pytest.approx(0.1 + 0.2)
+    assert est.min_keystrokes == 2
+    assert est.max_keystrokes > 2
+
+
+def test_analyzer_reusable():
+    analyzer = CostAnalyzer(0.1, 0.0)
+    tokens = CommandParser().parse("abc")
+    assert analyzer.analyze(tokens) == analyzer.analyze(tokens)
+
+
+def test_deep_nesting_does_not_recurse():
+    depth = 5000
+    est = cost("{REPEAT_1}" * depth + "ab{WAIT_1}" + "{/REPEAT}" * depth)
+    assert est.expected_seconds == pytest.approx(1.2)
+    assert est.characters == 2
+    # Speed changes inside nested bodies carry over to the next pass
+    nested = cost("{REPEAT_2}{REPEAT_2}x{SPEED_0.5}{/REPEAT}{/REPEAT}")
+    assert nested.expected_seconds == pytest.approx(0.1 + 3 * 0.5)
@@ -0,0 +1,109 @@
+import asyncio
+import random
+import time
+
+from type_simulator.text_typer.__main__ import Typist
+from type_simulator.text_typer.async_engine import (
+    AsyncAdapter,
+    AsyncDeadlineScheduler,
+    AsyncTypist,
+    paced,
+    run_sessions,
+)
+from type_simulator.text_typer.parser import CommandParser
+from type_simulator.text_typer.program import Program
+from type_simulator.text_typer.virtual import VirtualDocument
+
+SCRIPT = (
+    "{SET_name=world}{REPEAT_3}ab{/REPEAT}{<backspace>}"
+    "{SPEED_0}hello {GET_name}{<left>}!{<end>}\n{RANDOM_5_numeric}é"
+)
+
+
+def test_async_typist_matches_sync_typist():
+    toks = CommandParser().parse(SCRIPT)
+    for program in (toks, Program.compile(toks)):
+        random.seed(7)
+        expected = VirtualDocument()
+        typist = Typist(0, 0, backend=expected, input_backend="keys")
+        expected_count = typist.execute(program)
+
+        random.seed(7)
+        document = VirtualDocument()
+        typist = AsyncTypist(AsyncAdapter(document), 0, 0)
+        count = asyncio.run(typist.aexecute(program))
+        assert document.text == expected.text
+        assert count == expected_count
+
+
+def test_sessions_wait_concurrently():
+    toks = CommandParser().parse("ab{WAIT_0.2}cd")
+    documents = [VirtualDocument() for _ in range(10)]
+    typists = [AsyncTypist(AsyncAdapter(d), 0.01, 0) for d in documents]
+    start = time.monotonic()
+    results = asyncio.run(run_sessions([(t, toks) for t in typists]))
+    elapsed = time.monotonic() - start
+    assert results == [3] * 10
+    assert [d.text for d in documents] == ["abcd"] * 10
+    # One session takes ~0.24s; ten sequential sessions would take 2.4s
+    assert elapsed < 1.0
+    assert all(t.scheduler.stats().events > 0 for t in typists)
+
+
+def test_failing_session_does_not_stop_others():
+    class Broken:
+        async def write_batch(self, text, delays):
+            raise OSError("gone")
+
+    good = VirtualDocument()
+    toks = CommandParser().parse("{REPEAT_2}x{/REPEAT}")
+    results = asyncio.run(
+        run_sessions(
+            [
+                (AsyncTypist(Broken(), 0, 0), toks),
+                (AsyncTypist(AsyncAdapter(good), 0, 0), toks),
+            ],
+            limit=1,
+        )
+    )
+    assert results == [2, 2]  # token errors are logged, as in Typist
+    assert good.text == "xx"
+
+
+def test_deeply_nested_repeat_runs_without_recursion():
+    depth = 5000
+    toks = CommandParser().parse("{REPEAT_1}" * depth + "x" + "{/REPEAT}" * depth)
+    doc = VirtualDocument()
+    assert asyncio.run(AsyncTypist(AsyncAdapter(doc), 0, 0).aexecute(toks)) == 1
+    assert doc.text == "x"
+
+
+def test_async_scheduler_keeps_absolute_deadlines():
+    now = [0]
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += round(seconds * 1e9) + 2_000_000  # every wake-up 2ms late
+
+    scheduler = AsyncDeadlineScheduler(clock=lambda: now[0], sleep=fake_sleep)
+
+    async def run():
+        scheduler.reset()
+        for _ in range(3):
+            await scheduler.asleep(0.01)
+
+    asyncio.run(run())
+    # Lateness is taken out of the next wait instead of accumulating
+    assert sleeps == [0.01, 0.008, 0.008]
+    assert scheduler.stats().late_events == 3
+
+
+def test_paced_groups_keys_without_delay():
+    sent = []
+
+    async def send(chunk):
+        sent.append(chunk)
+
+    asyncio.run(paced("abcdef", [0, 0, 0.001, 0, 0, 0], send))
+    assert sent == ["abc", "def"]
@@ -0,0 +1,58 @@
+import os
+
+from type_simulator.text_typer.cache import CompileCache
+from type_simulator.text_typer.parser import CommandParser
+from type_simulator.text_typer.token import RepeatToken, TextToken, WaitToken
+
+
+def test_get_or_parse_round_trip(tmp_path):
+    cache = CompileCache(tmp_path)
+    parser = CommandParser()
+    text = "Hi{WAIT_1}{REPEAT_2}x{/REPEAT}"
+    first = cache.get_or_parse(parser, text)
+    assert len(list(tmp_path.glob("*.tsc"))) == 1
+
+    # A hit must not call the parser at all
+    class ExplodingParser(CommandParser):
+        def parse(self, text):
+            raise AssertionError("should have been served from cache")
+
+    second = cache.get_or_parse(ExplodingParser(), text)
+    assert second == first
+    assert second[0] == TextToken("Hi")
+    assert isinstance(second[1], WaitToken)
+    assert isinstance(second[2], RepeatToken)
+
+
+def test_key_depends_on_text_and_strict_flag():
+    assert CompileCache.key("abc") == CompileCache.key("abc")
+    assert CompileCache.key("abc") != CompileCache.key("abd")
+    assert CompileCache.key("abc", strict=False) != CompileCache.key("abc", strict=True)
+
+
+def test_corrupt_entry_is_dropped_and_reparsed(tmp_path):
+    cache = CompileCache(tmp_path)
+    key = cache.key("Hello")
+    (tmp_path / f"{key}.tsc").write_bytes(b"not a pickle")
+    assert cache.load(key) is None
+    assert not (tmp_path / f"{key}.tsc").exists()
+    assert cache.get_or_parse(CommandParser(), "Hello") == [TextToken("Hello")]
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = CompileCache(tmp_path)
+    parser = CommandParser()
+    for i, text in enumerate(("a" * 100, "b" * 100, "c" * 100)):
+        cache.get_or_parse(parser, text)
+        path = tmp_path / f"{cache.key(text)}.tsc"
+        os.utime(path, ns=(i * 10**9, i * 10**9))
+    # Touch the oldest entry so "b" becomes the least recently used
+    cache.load(cache.key("a" * 100))
+
+    sizes = sorted(p.stat().st_size for p in tmp_path.glob("*.tsc"))
+    cache.max_bytes = sizes[0] + sizes[1]
+    cache.evict()
+
+    assert cache.load(cache.key("a" * 100)) is not None
+    assert cache.load(cache.key("b" * 100)) is None
+    assert cache.load(cache.key("c" * 100)) is not None
@@ -59,3 +59,291 @@ def test_tk_clipboard_copy_paste(monkeypatch):
     cb = ReloadedTkClipboard()
     cb.copy("abc")
     assert cb.paste() == "abc"
+
+
+from types import SimpleNamespace
+
+from Xlib import X
+
+
+class FakeWindow:
+    def __init__(self, display, wid):
+        self.display, self.id = display, wid
+        self.properties = {}
+        self.sent = []
+
+    def __eq__(self, other):
+        return isinstance(other, FakeWindow) and other.id == self.id
+
+    def __hash__(self):
+        return self.id
+
+    def __window__(self):
+        return self.id
+
+    def create_window(self, *args, **kwargs):
+        return FakeWindow(self.display, 2)
+
+    def change_attributes(self, **attributes):
+        self.attributes = attributes
+
+    def get_full_property(self, prop, type_):
+        if prop not in self.properties:
+            return None
+        type_, fmt, data = self.properties[prop]
+        return SimpleNamespace(property_type=type_, format=fmt, value=data)
+
+    def delete_property(self, prop):
+        self.properties.pop(prop, None)
+        self.display.events.put(
+            SimpleNamespace(
+                type=X.PropertyNotify, window=self, atom=prop, state=X.PropertyDelete
+            )
+        )
+
+    def set_selection_owner(self, selection, time):
+        self.display.owners[selection] = self
+
+    def change_property(self, prop, type_, fmt, data):
+        self.properties[prop] = (type_, fmt, data)
+
+    def send_event(self, ev, event_mask=0):
+        self.sent.append(ev)
+        if ev.type == X.ClientMessage:  # wakes the owner thread
+            self.display.events.put(ev)
+
+
+class FakeDisplay:
+    """Just enough of Xlib.display.Display for XSelectionClipboard."""
+
+    def __init__(self, name=None):
+        import queue
+
+        self.events = queue.Queue()
+        self.owners = {}
+        self.atoms = {}
+        self.root = FakeWindow(self, 1)
+        self.info = type("Info", (), {"max_request_length": 65535})()
+        self.closed = False
+
+    def intern_atom(self, name):
+        return self.atoms.setdefault(name, 100 + len(self.atoms))
+
+    def screen(self):
+        return type("Screen", (), {"root": self.root})()
+
+    def get_selection_owner(self, selection):
+        return self.owners.get(selection)
+
+    def next_event(self):
+        return self.events.get()
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def test_x_selection_clipboard_owns_and_answers(monkeypatch):
+    import threading
+    import Xlib.display
+    from types import SimpleNamespace
+    from type_simulator.text_typer.clipboard import XSelectionClipboard
+
+    monkeypatch.setattr(Xlib.display, "Display", FakeDisplay)
+    cb = XSelectionClipboard(("PRIMARY",))
+    display = cb._d
+    primary = display.intern_atom("PRIMARY")
+    cb.copy("{}")
+    cb.copy("x[0];")  # already owner: memory update only
+    assert display.owners[primary] == cb._window
+    assert cb.paste() == "x[0];"
+
+    requestor = FakeWindow(display, 7)
+    answered = threading.Event()
+    requestor.send_event = lambda ev, event_mask=0: answered.set()
+    utf8 = display.intern_atom("UTF8_STRING")
+    display.events.put(
+        SimpleNamespace(
+            type=X.SelectionRequest,
+            time=0,
+            requestor=requestor,
+            selection=primary,
+            target=utf8,
+            property=55,
+        )
+    )
+    assert answered.wait(1)
+    assert requestor.properties[55] == (utf8, 8, b"x[0];")
+
+    # Losing ownership means the next copy claims it again
+    display.events.put(SimpleNamespace(type=X.SelectionClear, atom=primary))
+    display.owners.clear()
+    for _ in range(100):
+        if primary not in cb._owned:
+            break
+        threading.Event().wait(0.01)
+    cb.copy("again")
+    assert display.owners[primary] == cb._window
+
+    cb.close()
+    assert display.closed
+    assert not cb._thread.is_alive()
+
+
+def test_x_selection_copy_waits_for_announced_paste(monkeypatch):
+    import threading
+    import Xlib.display
+    from types import SimpleNamespace
+    from type_simulator.text_typer.clipboard import XSelectionClipboard
+
+    monkeypatch.setattr(Xlib.display, "Display", FakeDisplay)
+    cb = XSelectionClipboard(("PRIMARY",), timeout=5)
+    display = cb._d
+    primary = display.intern_atom("PRIMARY")
+    utf8 = display.intern_atom("UTF8_STRING")
+    cb.copy("first")
+    cb.expect_paste()
+
+    copied = threading.Event()
+    later = threading.Thread(target=lambda: (cb.copy("second"), copied.set()))
+    later.start()
+    assert not copied.wait(0.1)  # the paste of "first" is still outstanding
+
+    requestor = FakeWindow(display, 7)
+    display.events.put(
+        SimpleNamespace(
+            type=X.SelectionRequest,
+            time=0,
+            requestor=requestor,
+            selection=primary,
+            target=utf8,
+            property=55,
+        )
+    )
+    assert copied.wait(1)
+    later.join()
+    assert requestor.properties[55] == (utf8, 8, b"first")
+    assert cb.paste() == "second"
+
+    # A paste that is never requested only delays the next copy
+    cb._timeout = 0.01
+    cb.expect_paste()
+    cb.copy("third")
+    assert cb.paste() == "third" and cb._pending == 0
+    cb.close()
+
+
+def wait_for(condition):
+    import threading
+
+    for _ in range(200):
+        if condition():
+            return True
+        threading.Event().wait(0.01)
+    return False
+
+
+def test_x_selection_sends_large_text_in_incr_chunks(monkeypatch):
+    import Xlib.display
+    from type_simulator.text_typer.clipboard import XSelectionClipboard
+
+    monkeypatch.setattr(Xlib.display, "Display", FakeDisplay)
+    cb = XSelectionClipboard(("CLIPBOARD",))
+    cb._max_bytes = 4
+    display = cb._d
+    utf8, incr = display.intern_atom("UTF8_STRING"), display.intern_atom("INCR")
+    cb.copy("abcdefghij")
+
+    requestor = FakeWindow(display, 7)
+    display.events.put(
+        SimpleNamespace(
+            type=X.SelectionRequest,
+            time=0,
+            requestor=requestor,
+            selection=display.intern_atom("CLIPBOARD"),
+            target=utf8,
+            property=55,
+        )
+    )
+    assert wait_for(lambda: 55 in requestor.properties)
+    assert requestor.properties[55] == (incr, 32, [10])
+    received = []
+    while True:
+        requestor.delete_property(55)  # asks for the next chunk
+        assert wait_for(lambda: 55 in requestor.properties)
+        chunk = requestor.properties[55][2]
+        if not chunk:
+            break
+        received.append(chunk)
+    assert received == [b"abcd", b"efgh", b"ij"]
+    assert not cb._transfers
+    cb.close()
+
+
+def test_x_selection_reads_incr_reply_from_another_owner(monkeypatch):
+    import Xlib.display
+    from type_simulator.text_typer.clipboard import XSelectionClipboard
+
+    monkeypatch.setattr(Xlib.display, "Display", FakeDisplay)
+    cb = XSelectionClipboard(("CLIPBOARD",))
+    window, prop = cb._window, cb._prop
+    incr = cb._d.intern_atom("INCR")
+    chunks = [b"first ", b"second", b""]
+
+    def convert_selection(selection, target, property, time):
+        window.properties[property] = (incr, 32, [12])
+        cb._d.events.put(SimpleNamespace(type=X.SelectionNotify, property=property))
+
+    def delete_property(atom):
+        # The owner answers each deletion with the next chunk
+        window.properties.pop(atom, None)
+        if chunks:
+            window.properties[atom] = (cb._utf8, 8, chunks.pop(0))
+            cb._d.events.put(
+                SimpleNamespace(
+                    type=X.PropertyNotify,
+                    window=window,
+                    atom=atom,
+                    state=X.PropertyNewValue,
+                )
+            )
+
+    window.convert_selection = convert_selection
+    window.delete_property = delete_property
+    assert cb.paste() == "first second"
+    assert prop not in window.properties
+    cb.close()
+
+
+def test_x_selection_hands_text_to_xclip_on_close(monkeypatch):
+    import subprocess
+    import Xlib.display
+    from type_simulator.text_typer import token
+    from type_simulator.text_typer.clipboard import XSelectionClipboard
+
+    monkeypatch.setattr(Xlib.display, "Display", FakeDisplay)
+    monkeypatch.setattr(
+        token, "_selection_tools", lambda sel: (("xclip", "-selection", sel),)
+    )
+    calls = []
+
+    class FakePopen:
+        returncode = 0
+
+        def __init__(self, args, stdin=None):
+            self.args = args
+
+        def communicate(self, data):
+            calls.append((self.args, data))
+
+    monkeypatch.setattr(subprocess, "Popen", FakePopen)
+    cb = XSelectionClipboard(("CLIPBOARD",))
+    cb.copy("gone")
+    cb.close()
+    assert calls == []
+    cb = XSelectionClipboard(("CLIPBOARD",), persist=True)
+    cb.copy("keep me")
+    cb.close()
+    assert calls == [(("xclip", "-selection", "clipboard"), b"keep me")]
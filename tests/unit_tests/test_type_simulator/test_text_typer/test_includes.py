@@ -0,0 +1,109 @@
+import os
+
+import pytest
+
+from type_simulator.text_typer.cache import CompileCache
+from type_simulator.text_typer.includes import IncludeError, ModuleCache
+from type_simulator.text_typer.parser import CommandParser
+from type_simulator.text_typer.token import (
+    IncludeToken,
+    KeyToken,
+    RepeatToken,
+    TextToken,
+    WaitToken,
+)
+
+
+def parse(text):
+    return CommandParser().parse(text)
+
+
+def bump_mtime(path):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+def test_include_is_spliced_and_text_merged(tmp_path):
+    (tmp_path / "login.txt").write_text("user{<tab>}")
+    result = ModuleCache().resolve(parse("Hi {INCLUDE login.txt}pw"), tmp_path)
+    assert result == [TextToken("Hi user"), KeyToken(["tab"]), TextToken("pw")]
+
+
+def test_include_inside_repeat_body(tmp_path):
+    (tmp_path / "a.txt").write_text("x{WAIT_1}")
+    tokens = parse("{REPEAT_2}{INCLUDE a.txt}{/REPEAT}")
+    result = ModuleCache().resolve(tokens, tmp_path)
+    assert result == [RepeatToken(2, [TextToken("x"), WaitToken(1.0)])]
+
+
+def test_nested_include_resolves_relative_to_including_file(tmp_path):
+    lib = tmp_path / "lib"
+    lib.mkdir()
+    (lib / "outer.txt").write_text("[{INCLUDE inner.txt}]")
+    (lib / "inner.txt").write_text("in")
+    result = ModuleCache().resolve(parse("{INCLUDE lib/outer.txt}"), tmp_path)
+    assert result == [TextToken("[in]")]
+
+
+def test_each_file_is_parsed_once_per_process(tmp_path):
+    (tmp_path / "a.txt").write_text("shared")
+    modules = ModuleCache()
+    modules.resolve(parse("{INCLUDE a.txt}{INCLUDE a.txt}"), tmp_path)
+    modules.resolve(parse("{INCLUDE a.txt}"), tmp_path)
+    assert (modules.misses, modules.hits) == (1, 2)
+
+
+def test_changed_nested_file_invalidates_outer_module(tmp_path):
+    (tmp_path / "outer.txt").write_text("<{INCLUDE inner.txt}>")
+    inner = tmp_path / "inner.txt"
+    inner.write_text("old")
+    modules = ModuleCache()
+    assert modules.load(tmp_path / "outer.txt") == [TextToken("<old>")]
+    inner.write_text("new")
+    bump_mtime(inner)
+    assert modules.load(tmp_path / "outer.txt") == [TextToken("<new>")]
+
+
+def test_cycle_is_detected(tmp_path):
+    (tmp_path / "a.txt").write_text("{INCLUDE b.txt}")
+    (tmp_path / "b.txt").write_text("{INCLUDE a.txt}")
+    with pytest.raises(IncludeError, match="cycle"):
+        ModuleCache().resolve(parse("{INCLUDE a.txt}"), tmp_path)
+
+
+def test_self_include_of_source_file_is_a_cycle(tmp_path):
+    script = tmp_path / "main.txt"
+    script.write_text("{INCLUDE main.txt}")
+    with pytest.raises(IncludeError, match="cycle"):
+        ModuleCache().resolve(parse(script.read_text()), source=script)
+
+
+def test_missing_include_raises(tmp_path):
+    with pytest.raises(IncludeError):
+        ModuleCache().resolve(parse("{INCLUDE nope.txt}"), tmp_path)
+
+
+def test_included_files_go_through_compile_cache(tmp_path):
+    (tmp_path / "a.txt").write_text("cached{WAIT_1}")
+    cache = CompileCache(tmp_path / "cache")
+    ModuleCache(cache).resolve(parse("{INCLUDE a.txt}"), tmp_path)
+    assert len(list((tmp_path / "cache").glob("*.tsc"))) == 1
+
+    # A fresh process-level cache is served from disk without parsing
+    class ExplodingParser(CommandParser):
+        def parse(self, text):
+            raise AssertionError("should have been served from cache")
+
+    key = cache.key("cached{WAIT_1}")
+    assert cache.load(key) is not None
+    assert cache.get_or_parse(ExplodingParser(), "cached{WAIT_1}") == [
+        TextToken("cached"),
+        WaitToken(1.0),
+    ]
+
+
+def test_iter_resolve_streams_tokens(tmp_path):
+    (tmp_path / "a.txt").write_text("A")
+    tokens = iter([TextToken("x"), IncludeToken("a.txt"), KeyToken(["tab"])])
+    result = list(ModuleCache().iter_resolve(tokens, tmp_path))
+    assert result == [TextToken("x"), TextToken("A"), KeyToken(["tab"])]
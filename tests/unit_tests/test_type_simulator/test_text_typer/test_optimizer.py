@@ -0,0 +1,171 @@
+import copy
+
+import pytest
+
+from type_simulator.text_typer.__main__ import Typist
+from type_simulator.text_typer.optimizer import PASSES, Optimizer, count_tokens
+from type_simulator.text_typer.parser import CommandParser
+from type_simulator.text_typer.token import (
+    KeyToken,
+    RepeatToken,
+    SpeedToken,
+    TextToken,
+    VariableToken,
+    WaitToken,
+)
+
+
+class RecordingBackend:
+    def __init__(self):
+        self.actions = []
+
+    def write(self, ch, interval=None):
+        self.actions.append(("write", ch, interval))
+
+    def hotkey(self, *keys):
+        self.actions.append(("hotkey", keys))
+
+    def moveTo(self, x, y, duration=0):
+        self.actions.append(("moveTo", x, y, duration))
+
+    def click(self, button="left", clicks=1, interval=0):
+        self.actions.append(("click", button, clicks, interval))
+
+    def press(self, key):
+        self.actions.append(("press", key))
+
+
+def run(tokens):
+    backend = RecordingBackend()
+    typist = Typist(typing_speed=0, typing_variance=0, backend=backend)
+    typist.execute(tokens)
+    return backend.actions, typist.typing_speed
+
+
+def typed(actions):
+    """Actions with batched writes split into single characters."""
+    out = []
+    for action in actions:
+        if action[0] == "write":
+            out.extend(("write", ch) for ch in action[1])
+        else:
+            out.append(action[:2])
+    return out
+
+
+def optimize(text, **kwargs):
+    return Optimizer(**kwargs).optimize(CommandParser().parse(text))
+
+
+def test_fold_waits():
+    assert optimize("a{WAIT_0.5}{WAIT_1}{WAIT_0}b") == [
+        TextToken("a"),
+        WaitToken(1.5),
+        TextToken("b"),
+    ]
+    assert optimize("a{WAIT_0}b") == [TextToken("ab")]
+
+
+def test_dead_speed_changes_are_dropped():
+    assert optimize("{SPEED_0.1_0.02}{<enter>}{SPEED_0.2}a{SPEED_0.3}") == [
+        KeyToken(["enter"]),
+        SpeedToken(0.2, 0.02),
+        TextToken("a"),
+        SpeedToken(0.3),
+    ]
+
+
+def test_trailing_speed_changes_collapse_into_the_last():
+    result = optimize("a{SPEED_0.2_0.01}{WAIT_1}{SPEED_0.3}")
+    assert result == [TextToken("a"), WaitToken(1.0), SpeedToken(0.3, 0.01)]
+    _, speed = run(result)
+    assert speed == 0.3
+
+
+def test_speed_change_at_end_of_repeat_body_is_kept():
+    result = optimize("{REPEAT_2}a{SPEED_0.2}{/REPEAT}")
+    assert result == [RepeatToken(2, [TextToken("a"), SpeedToken(0.2)])]
+
+
+def test_unwrap_trivial_repeats():
+    assert optimize("a{REPEAT_1}b{<tab>}{/REPEAT}{REPEAT_0}x{/REPEAT}c") == [
+        TextToken("ab"),
+        KeyToken(["tab"]),
+        TextToken("c"),
+    ]
+
+
+def test_hoist_constant_text_out_of_repeat():
+    assert optimize("x{REPEAT_3}ab{/REPEAT}y") == [TextToken("xababab" + "y")]
+    nested = optimize("{REPEAT_2}{REPEAT_2}ab{/REPEAT}{/REPEAT}")
+    assert nested == [TextToken("ab" * 4)]
+
+
+def test_hoist_respects_size_limit():
+    result = optimize("{REPEAT_100000}abc{/REPEAT}")
+    assert result == [RepeatToken(100000, [TextToken("abc")])]
+
+
+def test_drop_empty_text():
+    tokens = [TextToken(""), RepeatToken(3, [TextToken("")]), KeyToken(["a"])]
+    assert Optimizer().optimize(tokens) == [KeyToken(["a"])]
+
+
+def test_passes_can_be_disabled():
+    text = "{WAIT_1}{WAIT_1}{REPEAT_1}a{/REPEAT}"
+    result = optimize(text, disabled=["fold_waits", "unwrap_repeats", "hoist_text"])
+    assert result == [
+        WaitToken(1.0),
+        WaitToken(1.0),
+        RepeatToken(1, [TextToken("a")]),
+    ]
+    assert optimize(text, disabled=list(PASSES)) == CommandParser().parse(text)
+
+
+def test_unknown_pass_is_rejected():
+    with pytest.raises(ValueError):
+        Optimizer(disabled=["nope"])
+
+
+def test_input_is_not_mutated():
+    text = "{REPEAT_2}{WAIT_1}{WAIT_1}{REPEAT_1}a{/REPEAT}{/REPEAT}"
+    tokens = CommandParser().parse(text)
+    snapshot = copy.deepcopy(tokens)
+    Optimizer().optimize(tokens)
+    assert tokens == snapshot
+
+
+def test_optimized_program_types_the_same():
+    text = (
+        "{SPEED_0.1}{SPEED_0}Hi{WAIT_0}{WAIT_0}{REPEAT_2}x{REPEAT_1}y{/REPEAT}"
+        "{<ctrl>+c}{SPEED_0}{/REPEAT}{SET_v=1}{GET_v}{REPEAT_0}z{/REPEAT}"
+    )
+    tokens = CommandParser().parse(text)
+    before_actions, before_speed = run(tokens)
+    after_actions, after_speed = run(Optimizer().optimize(tokens))
+    assert typed(after_actions) == typed(before_actions)
+    assert after_speed == before_speed
+
+
+def test_report_counts_removed_tokens_and_dispatches():
+    optimizer = Optimizer(typing_speed=0.1, typing_variance=0)
+    optimizer.optimize(CommandParser().parse("{WAIT_1}{WAIT_2}{REPEAT_4}ab{/REPEAT}"))
+    report = optimizer.last_report
+    assert (report.tokens_before, report.tokens_after) == (4, 2)
+    assert (report.dispatches_before, report.dispatches_after) == (6, 2)
+    assert report.seconds_before == pytest.approx(3.8)
+    assert report.seconds_removed == 0.0
+    assert "removed 2 of 4 tokens" in report.summary()
+
+
+def test_count_tokens_handles_nesting():
+    tokens = [TextToken("a"), RepeatToken(3, [RepeatToken(2, [WaitToken(1)])])]
+    assert count_tokens(tokens) == (4, 7)
+
+
+def test_deep_nesting_does_not_recurse():
+    tokens = [VariableToken("x", "1", "set")]
+    for _ in range(5000):
+        tokens = [RepeatToken(2, tokens)]
+    optimizer = Optimizer(disabled=["unwrap_repeats"])
+    assert count_tokens(optimizer.optimize(tokens)) == (5001, 2**5000)
@@ -224,3 +224,101 @@ def test_parse_complex_macro():
     assert isinstance(tokens[1], TextToken)
     assert isinstance(tokens[2], WaitToken)
     assert isinstance(tokens[3], RepeatToken)
+
+
+def test_parse_mouse_click_token():
+    """Test parsing of MOUSE_CLICK into a MouseClickToken."""
+    parser = CommandParser()
+    tokens = parser.parse("{MOUSE_CLICK_Right}")
+    assert len(tokens) == 1
+    assert type(tokens[0]).__name__ == "MouseClickToken"
+    assert tokens[0].button == "right"
+
+
+def test_parse_keyword_prefix_falls_back_to_literal():
+    """Specs that only share a keyword prefix are not mistaken for commands."""
+    parser = CommandParser()
+    tokens = parser.parse("{WAIT_x}{SPEED}{ WAIT_1 }")
+    assert len(tokens) == 2
+    assert tokens[0].text == "{WAIT_x}{SPEED}"
+    assert isinstance(tokens[1], WaitToken)
+    assert tokens[1].seconds == pytest.approx(1.0)
+
+
+def test_parse_include_directive():
+    """{INCLUDE path} becomes a placeholder; a bare INCLUDE stays literal."""
+    from type_simulator.text_typer.token import IncludeToken
+
+    parser = CommandParser()
+    tokens = parser.parse('{INCLUDE lib/my_login.txt}{ INCLUDE "a b.txt" }{INCLUDE}')
+    assert tokens[0] == IncludeToken("lib/my_login.txt")
+    assert tokens[1] == IncludeToken("a b.txt")
+    assert tokens[2] == TextToken("{INCLUDE}")
+
+
+def test_iter_parse_matches_parse_across_chunk_boundaries():
+    """Chunked streaming yields the same program as parsing the whole string."""
+    import io
+
+    text = r"ab\{c{WAIT_1}{REPEAT_2}x{<ctrl>+c}{/REPEAT}{SPEED_0.1_0.02}tail\\"
+    expected = CommandParser().parse(text)
+    for chunk_size in (1, 2, 5, 64):
+        tokens = list(CommandParser().iter_parse(io.StringIO(text), chunk_size))
+        # Literal text may be split at chunk boundaries; compare it joined up
+        joined = []
+        for tok in tokens:
+            if joined and isinstance(tok, TextToken) and isinstance(joined[-1], TextToken):
+                joined[-1] = TextToken(joined[-1].text + tok.text)
+            else:
+                joined.append(tok)
+        assert joined == expected
+
+
+def test_iter_parse_is_lazy():
+    """Tokens are yielded before the rest of the stream has been read."""
+
+    class CountingStream:
+        def __init__(self, chunks):
+            self.chunks = list(chunks)
+            self.reads = 0
+
+        def read(self, size):
+            self.reads += 1
+            return self.chunks.pop(0) if self.chunks else ""
+
+    stream = CountingStream(["Hello{WAIT_1}", "world"] * 100)
+    tokens = CommandParser().iter_parse(stream)
+    first = next(tokens)
+    assert first == TextToken("Hello")
+    assert stream.reads <= 2
+
+
+def test_parse_deeply_nested_repeat():
+    """Deep nesting builds one RepeatToken per level without recursion."""
+    depth = 2000
+    tokens = CommandParser().parse("{REPEAT_2}a" * depth + "b{/REPEAT}" * depth)
+    level = 0
+    while tokens:
+        assert isinstance(tokens[0], RepeatToken)
+        body = tokens[0].tokens
+        level += 1
+        tokens = [t for t in body if isinstance(t, RepeatToken)]
+    assert level == depth
+
+
+def test_parse_unclosed_repeat_keeps_tokens_inline():
+    """An unclosed REPEAT block leaves its body in place at end of input."""
+    tokens = CommandParser().parse("a{REPEAT_2}b{REPEAT_3}c{/REPEAT}d")
+    assert tokens[0] == TextToken("ab")
+    assert isinstance(tokens[1], RepeatToken)
+    assert tokens[1].count == 3
+    assert tokens[2] == TextToken("d")
+
+
+def test_parse_lone_backslashes_and_long_prose():
+    """Backslashes that escape nothing stay literal inside long text runs."""
+    prose = "plain words " * 1000
+    text = prose + r"C:\path\to\{file\}" + prose
+    tokens = CommandParser().parse(text)
+    assert len(tokens) == 1
+    assert tokens[0].text == prose + r"C:\path\to{file}" + prose
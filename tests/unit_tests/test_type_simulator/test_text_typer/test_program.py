@@ -0,0 +1,116 @@
+import pickle
+
+import pytest
+
+from type_simulator.text_typer.parser import CommandParser
+from type_simulator.text_typer.program import OP_END, OP_LOOP, OP_TEXT, Program
+from type_simulator.text_typer.token import (
+    IncludeToken,
+    KeyToken,
+    MouseClickToken,
+    MouseMoveToken,
+    RandomTextToken,
+    RepeatToken,
+    SpeedToken,
+    TextToken,
+    VariableToken,
+    WaitToken,
+)
+
+SCRIPT = (
+    "Hello{WAIT_0.5}{<ctrl>+c}{MOUSE_MOVE_10_20}{MOUSE_CLICK_right}"
+    "{RANDOM_4_alpha}{SET_x=1}{GET_x}{SPEED_0.1}{SPEED_0.2_0.05}"
+    "{REPEAT_3}a{REPEAT_2}b{/REPEAT}{/REPEAT}Hello"
+)
+
+
+def test_compile_round_trips_token_tree():
+    tokens = CommandParser().parse(SCRIPT)
+    assert Program.compile(tokens).tokens() == tokens
+
+
+def test_compile_handles_manual_tokens():
+    tokens = [
+        KeyToken([]),
+        VariableToken("v", None, "set"),
+        MouseMoveToken(-5, 7, 0.25),
+        MouseClickToken("left", 2, 0.1),
+        RandomTextToken(3, "custom:xyz"),
+        SpeedToken(0.3),
+        RepeatToken(0, [WaitToken(1.0)]),
+        IncludeToken("lib/login.txt"),
+    ]
+    prog = Program.compile(tokens)
+    assert prog.tokens() == tokens
+    assert prog.has_includes
+
+
+def test_repeat_becomes_loop_instructions():
+    prog = Program.compile([RepeatToken(2, [TextToken("x")]), TextToken("y")])
+    assert list(prog.opcodes) == [OP_LOOP, OP_TEXT, OP_END, OP_TEXT]
+    assert prog.operands[0] == 2  # LOOP points at its END
+    assert prog.operands[2] == 2  # END carries the count
+
+
+def test_out_of_range_counts_are_rejected_when_compiling():
+    # The parser accepts them, so streamed runs are not limited
+    toks = CommandParser(strict=True).parse("{RANDOM_2147483648}")
+    assert toks == [RandomTextToken(2**31)]
+    with pytest.raises(ValueError, match="RANDOM length 2147483648"):
+        Program.compile(toks)
+    with pytest.raises(ValueError, match="REPEAT count -1"):
+        Program.compile([RepeatToken(-1, [TextToken("x")])])
+    with pytest.raises(ValueError, match="REPEAT count"):
+        Program.compile([RepeatToken(2**63, [])])
+    limit = CommandParser().parse("{RANDOM_2147483647_numeric}")
+    assert Program.compile(limit).tokens() == limit
+
+
+def test_string_table_is_shared():
+    prog = Program.compile(CommandParser().parse(SCRIPT))
+    assert prog.strings.count("Hello") == 1
+
+
+def test_deeply_nested_repeat_compiles_without_recursion():
+    depth = 5000
+    tokens = [TextToken("core")]
+    for _ in range(depth):
+        tokens = [RepeatToken(1, tokens)]
+    prog = Program.compile(tokens)
+    assert len(prog) == 2 * depth + 1
+
+
+def test_bytes_round_trip_and_pickle():
+    prog = Program.compile(CommandParser().parse(SCRIPT + "ünï "))
+    loaded = Program.from_bytes(prog.to_bytes())
+    assert loaded == prog
+    assert loaded.tokens() == prog.tokens()
+    assert pickle.loads(pickle.dumps(prog)) == prog
+
+
+def test_save_and_load_memory_maps(tmp_path):
+    prog = Program.compile(CommandParser().parse(SCRIPT))
+    path = tmp_path / "script.tsbc"
+    prog.save(path)
+    loaded = Program.load(path)
+    assert isinstance(loaded.operands, memoryview)
+    assert loaded.tokens() == prog.tokens()
+
+
+@pytest.mark.parametrize("data", [b"", b"garbage" * 10])
+def test_from_bytes_rejects_invalid_data(data):
+    with pytest.raises(Exception):
+        Program.from_bytes(data)
+
+
+def test_from_bytes_rejects_truncated_data():
+    data = Program.compile([TextToken("hello")]).to_bytes()
+    with pytest.raises(ValueError):
+        Program.from_bytes(data[:-2])
+
+
+def test_disassemble_lists_every_instruction():
+    prog = Program.compile([RepeatToken(2, [TextToken("x")])])
+    listing = prog.disassemble().splitlines()
+    assert len(listing) == 3
+    assert "LOOP" in listing[0] and "END" in listing[2]
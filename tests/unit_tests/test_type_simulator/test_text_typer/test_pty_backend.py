@@ -0,0 +1,45 @@
+import asyncio
+import sys
+
+import pytest
+
+from type_simulator.text_typer.async_engine import AsyncTypist, run_sessions
+from type_simulator.text_typer.parser import CommandParser
+from type_simulator.text_typer.pty_backend import PtyBackend, key_bytes
+
+pytestmark = pytest.mark.skipif(
+    not sys.platform.startswith("linux"), reason="needs Linux pseudo terminals"
+)
+
+
+def test_key_bytes():
+    assert key_bytes("enter") == "\r"
+    assert key_bytes("ctrl", "c") == "\x03"
+    assert key_bytes("ctrl", "D") == "\x04"
+    assert key_bytes("alt", "b") == "\x1bb"
+    assert key_bytes("shift", "tab") == "\x1b[Z"
+    assert key_bytes("up") == "\x1b[A"
+    with pytest.raises(ValueError):
+        key_bytes("ctrl", "up")
+
+
+def test_sessions_type_into_their_own_terminals():
+    toks = CommandParser().parse("echo [ok]x{<backspace>}\n{<ctrl>+d}")
+
+    async def run():
+        backends = [PtyBackend(["cat"]) for _ in range(3)]
+        try:
+            results = await run_sessions(
+                [(AsyncTypist(b, 0.001, 0), toks) for b in backends]
+            )
+            codes = [await b.wait(timeout=5) for b in backends]
+            return results, codes, [b.output for b in backends]
+        finally:
+            for b in backends:
+                b.close()
+
+    results, codes, outputs = asyncio.run(run())
+    assert codes == [0, 0, 0]
+    for output in outputs:
+        # cat prints the line back after the line discipline erased the x
+        assert output.endswith("echo [ok]\r\n")
@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+import pytest
+
+from type_simulator.text_typer import pyautogui_backend
+from type_simulator.text_typer.pyautogui_backend import PyAutoGUIBackend
+from type_simulator.text_typer.token import TextToken
+
+
+class FakePyAutoGUI:
+    PAUSE = 0.1
+
+    def __init__(self):
+        self.events = []
+
+    def press(self, key, _pause=True):
+        self.events.append(("press", key, _pause))
+
+    def write(self, message, interval=0.0):
+        self.events.append(("write", message, interval))
+
+    def hotkey(self, *keys):
+        self.events.append(("hotkey", keys))
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(pyautogui_backend.time, "sleep", slept.append)
+    return slept
+
+
+def test_write_batch_presses_each_key_without_pause(sleeps):
+    pg = FakePyAutoGUI()
+    backend = PyAutoGUIBackend(pg)
+    backend.write_batch("aB", [0.2, 0.0])
+    assert pg.events == [("press", "a", False), ("press", "B", False)]
+    assert sleeps == [0.2]
+    backend.hotkey("ctrl", "c")  # everything else goes to pyautogui
+    assert pg.events[-1] == ("hotkey", ("ctrl", "c"))
+    assert backend.PAUSE == 0.1
+
+
+def test_text_token_with_variance_is_one_batch(sleeps):
+    pg = FakePyAutoGUI()
+    executor = SimpleNamespace(
+        backend=PyAutoGUIBackend(pg),
+        typing_speed=0.1,
+        typing_variance=0.05,
+        clipboard=None,
+        pynput=None,
+    )
+    TextToken("hello world").execute(executor)
+    assert [e[1] for e in pg.events] == list("hello world")
+    assert all(e[0] == "press" and e[2] is False for e in pg.events)
+    assert all(0.05 <= s <= 0.15 for s in sleeps) and len(set(sleeps)) > 1
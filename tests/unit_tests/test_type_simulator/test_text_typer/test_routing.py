@@ -0,0 +1,113 @@
+import time
+
+import pytest
+
+from type_simulator.text_typer import routing
+from type_simulator.text_typer.routing import (
+    DEFAULT_ROUTES,
+    Ranking,
+    RankingCache,
+    forced_routes,
+    probe,
+    select_routes,
+)
+
+
+class PressBackend:
+    def __init__(self):
+        self.pressed = []
+
+    def press(self, key):
+        self.pressed.append(key)
+
+
+class FakeTypist:
+    def __init__(self, backend=None):
+        self.backend = backend or PressBackend()
+        self.pynput = None
+
+
+def test_ranking_routes_order_by_cost():
+    ranking = Ranking({"keys": 0.001, "paste": 0.004, "unicode": 0.003})
+    routes = ranking.routes()
+    # untimed paths (here pynput) follow the timed ones
+    assert routes["text"] == ("keys", "unicode", "paste", "pynput")
+    # key events are not trusted with special characters ...
+    assert routes["special"] == ("unicode", "paste", "pynput", "keys")
+    # ... unless the backend maps characters to keysyms itself
+    exact = Ranking({"keys": 0.001, "paste": 0.004}, exact_keys=True)
+    assert exact.routes()["unicode"] == ("keys", "paste", "unicode", "pynput")
+
+
+def test_forced_routes():
+    assert forced_routes("paste") == {c: ("paste",) for c in DEFAULT_ROUTES}
+    with pytest.raises(ValueError):
+        forced_routes("telepathy")
+
+
+def test_probe_times_available_paths(monkeypatch):
+    monkeypatch.setattr(routing, "_time_copy", lambda: None)
+    typist = FakeTypist()
+    ranking = probe(typist)
+    assert set(typist.backend.pressed) == {"shift"}
+    assert set(ranking.costs) == {"keys"}  # unicode is not guessed
+
+
+def test_paste_probe_leaves_primary_alone(monkeypatch):
+    from type_simulator.text_typer import clipboard, token
+
+    owners = []
+
+    class FakeOwner:
+        def __init__(self, selections):
+            self.selections, self.copies, self.closed = selections, [], False
+            owners.append(self)
+
+        def copy(self, text):
+            self.copies.append(text)
+
+        def close(self):
+            self.closed = True
+
+    def no_primary(text):
+        raise AssertionError("PRIMARY was overwritten")
+
+    monkeypatch.setattr(clipboard, "XSelectionClipboard", FakeOwner)
+    monkeypatch.setattr(token, "_copy_to_primary_x11", no_primary)
+    ranking = probe(FakeTypist())
+    (owner,) = owners
+    assert owner.selections == ("SECONDARY",) and owner.closed
+    assert len(owner.copies) == routing.PROBE_ROUNDS
+    assert "paste" in ranking.costs
+
+
+def test_ranking_cache_roundtrip_and_ttl(tmp_path, monkeypatch):
+    cache = RankingCache(tmp_path / "backends.json", ttl=60)
+    monkeypatch.setenv("DISPLAY", ":5")
+    key = cache.key(PressBackend())
+    assert ":5" in key and "PressBackend" in key
+    cache.put(key, Ranking({"keys": 0.002}))
+    assert cache.get(key).costs == {"keys": 0.002}
+    cache.put(key, Ranking({"keys": 0.002}, created=time.time() - 120))
+    assert cache.get(key) is None  # expired
+    (tmp_path / "backends.json").write_text("not json")
+    assert cache.get(key) is None
+
+
+def test_select_routes_probes_once(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_probe(typist):
+        calls.append(typist)
+        return Ranking({"keys": 0.001, "pynput": 0.0005})
+
+    monkeypatch.setattr(routing, "probe", fake_probe)
+    cache = RankingCache(tmp_path / "backends.json")
+    first = select_routes(FakeTypist(), cache=cache)
+    second = select_routes(FakeTypist(), "auto", cache=cache)
+    assert first == second
+    assert first["special"] == ("pynput", "unicode", "keys")
+    assert len(calls) == 1
+    assert select_routes(FakeTypist(), "unicode", cache=cache)["text"] == (
+        "unicode",
+    )
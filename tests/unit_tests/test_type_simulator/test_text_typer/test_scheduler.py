@@ -0,0 +1,93 @@
+import time
+
+import pytest
+
+from type_simulator.text_typer.scheduler import DeadlineScheduler
+
+
+class FakeClock:
+    """monotonic_ns stand-in whose sleep() just advances time."""
+
+    def __init__(self):
+        self.now = 0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += int(seconds * 1e9)
+
+
+def make(**kwargs):
+    clock = FakeClock()
+    return DeadlineScheduler(clock=clock, sleep=clock.sleep, **kwargs), clock
+
+
+def test_sleeps_until_deadline_minus_spin():
+    sched, clock = make(spin_ns=0)
+    sched.reset()
+    sched.sleep(0.5)
+    assert clock.now == 500_000_000
+    assert sched.stats().late_events == 0
+
+
+def test_overhead_is_absorbed_by_the_next_wait():
+    sched, clock = make(spin_ns=0)
+    sched.reset()
+    for _ in range(10):
+        clock.now += 30_000_000  # 30ms of backend work per event
+        sched.sleep(0.1)
+    # Ten 100ms events take 1s in total, not 1.3s
+    assert clock.now == 1_000_000_000
+
+
+def test_lateness_is_recorded_when_behind():
+    sched, clock = make(spin_ns=0)
+    sched.reset()
+    clock.now += 150_000_000
+    sched.sleep(0.1)  # 50ms late, nothing to wait for
+    stats = sched.stats()
+    assert (stats.events, stats.late_events) == (1, 1)
+    assert stats.max_lateness == pytest.approx(0.05)
+    assert list(sched.lateness) == [50_000_000]
+    assert "1 late" in stats.summary()
+
+
+def test_reanchors_when_far_behind():
+    sched, clock = make(spin_ns=0, max_lag_ns=100_000_000)
+    sched.reset()
+    clock.now += 2_000_000_000  # e.g. the editor took 2s to appear
+    sched.sleep(0.1)
+    # No catch-up burst: the next event is 100ms after "now"
+    assert clock.now == 2_100_000_000
+    assert sched.stats().resyncs == 1
+
+
+def test_reserve_spreads_lateness_over_run():
+    sched, clock = make(spin_ns=0)
+    sched.reset()
+    clock.now += 20_000_000
+    assert sched.reserve(0.1) == pytest.approx(0.08)
+    # The run's end is the next anchor
+    sched.sleep(0.0)
+    assert clock.now == 100_000_000
+
+
+def test_mark_accounts_for_backend_time():
+    sched, clock = make(spin_ns=0)
+    sched.reset()
+    clock.now += 300_000_000  # a 0.3s mouse move the backend waited out
+    sched.mark(0.3)
+    sched.sleep(0.1)
+    assert clock.now == 400_000_000
+
+
+def test_real_clock_precision():
+    sched = DeadlineScheduler()
+    sched.reset()
+    start = time.monotonic()
+    for _ in range(20):
+        sched.sleep(0.002)
+    assert time.monotonic() - start == pytest.approx(0.04, abs=0.01)
@@ -42,8 +42,12 @@ def test_typist_execute_text_and_keys():
     typist = Typist(typing_speed=0.01, typing_variance=0, backend=backend)
     tokens = [TextToken("AB"), KeyToken(["ctrl", "c"]), TextToken("CD")]
     typist.execute(tokens)
-    # Expect writes, hotkey, then writes
-    assert backend.actions[2] == ("hotkey", ("ctrl", "c"))
+    # Expect one batched write per run, hotkey in between; the scheduler
+    # may shave a little off the interval to absorb its own overhead
+    assert backend.actions[0][:2] == ("write", "AB")
+    assert backend.actions[0][2] == pytest.approx(0.01, abs=0.002)
+    assert backend.actions[1] == ("hotkey", ("ctrl", "c"))
+    assert backend.actions[2][:2] == ("write", "CD")
 
 
 def test_typist_execute_wait():
@@ -64,12 +68,11 @@ def test_text_typer_integration():
     )
     typer.simulate_typing()
     expected = [
-        ("write", "H", 0),
-        ("write", "i", 0),
+        ("write", "Hi", 0),
         ("hotkey", ("enter",)),
     ]
-    assert backend.actions[:3] == expected
-    last_action = backend.actions[3]
+    assert backend.actions[:2] == expected
+    last_action = backend.actions[2]
     # Accept write, hotkey with 'insert', or hotkey with ctrl+shift+u (unicode hex fallback)
     assert (last_action[0] == "write" and last_action[1] == "!") or (
         last_action[0] == "hotkey"
@@ -106,3 +109,130 @@ def test_text_typer_escape_and_wait(caplog):
         )
     )
     assert duration >= 0.01
+
+
+def test_text_typer_simulate_typing_from_stream():
+    import io
+
+    backend = DummyBackend()
+    typer = TextTyper("", typing_speed=0, typing_variance=0, backend=backend)
+    typer.simulate_typing(io.StringIO("ab{<esc>}"))
+    assert backend.actions == [("write", "ab", 0), ("hotkey", ("esc",))]
+
+
+def test_typist_run_program_matches_token_execution():
+    from type_simulator.text_typer.program import Program
+
+    tokens = CommandParser().parse(
+        "a{REPEAT_2}b{REPEAT_0}never{/REPEAT}{REPEAT_2}c{/REPEAT}{/REPEAT}{<enter>}"
+    )
+    expected_backend, program_backend = DummyBackend(), DummyBackend()
+    token_count = Typist(
+        typing_speed=0, typing_variance=0, backend=expected_backend
+    ).execute(tokens)
+    count = Typist(typing_speed=0, typing_variance=0, backend=program_backend).execute(
+        Program.compile(tokens)
+    )
+    assert program_backend.actions == expected_backend.actions
+    assert ("write", "n", 0) not in program_backend.actions
+    assert count == token_count == 8  # a, 2 x (b, 2 x c), enter
+
+
+def test_text_typer_runs_optimized_program():
+    from type_simulator.text_typer.optimizer import Optimizer
+
+    backend = DummyBackend()
+    typer = TextTyper(
+        "a{WAIT_0}{WAIT_0}{REPEAT_1}b{/REPEAT}",
+        typing_speed=0,
+        typing_variance=0,
+        backend=backend,
+        optimizer=Optimizer(),
+    )
+    typer.simulate_typing()
+    assert backend.actions == [("write", "ab", 0)]
+    assert typer.optimizer.last_report.tokens_removed == 4
+
+
+def test_text_typer_runs_precompiled_program():
+    from type_simulator.text_typer.program import Program
+
+    backend = DummyBackend()
+    program = Program.compile(CommandParser().parse("{REPEAT_2}x{/REPEAT}"))
+    typer = TextTyper(
+        "ignored", typing_speed=0, typing_variance=0, backend=backend, program=program
+    )
+    typer.simulate_typing()
+    assert backend.actions == [("write", "x", 0), ("write", "x", 0)]
+    assert typer.estimate().characters == 2
+
+
+def test_text_typer_resolves_includes_next_to_source(tmp_path):
+    (tmp_path / "snippet.txt").write_text("lib")
+    script = tmp_path / "main.txt"
+    script.write_text("a{INCLUDE snippet.txt}b")
+    backend = DummyBackend()
+    typer = TextTyper(
+        script.read_text(),
+        typing_speed=0,
+        typing_variance=0,
+        backend=backend,
+        source_path=script,
+    )
+    typer.simulate_typing()
+    assert "".join(a[1] for a in backend.actions) == "alibb"
+    assert typer.estimate().characters == 5
+
+
+def test_typist_resolves_clipboard_lazily_once_per_process(monkeypatch):
+    from type_simulator.text_typer import __main__ as typer_mod
+
+    made = []
+
+    class FakeClipboard:
+        def __init__(self):
+            made.append(self)
+
+    class Broken:
+        def __init__(self):
+            raise RuntimeError("unavailable")
+
+    monkeypatch.setattr(typer_mod, "_process_clipboard", typer_mod._UNSET)
+    monkeypatch.setattr(typer_mod, "XSelectionClipboard", Broken)
+    monkeypatch.setattr(typer_mod, "PyperclipClipboard", FakeClipboard)
+    first = Typist(backend=DummyBackend())
+    second = Typist(backend=DummyBackend())
+    assert made == []  # nothing probed for scripts that never paste
+    assert first.clipboard is made[0]
+    assert second.clipboard is made[0]
+    assert len(made) == 1
+    second.clipboard = None
+    assert second.clipboard is None
+
+
+def test_default_cli_run_streams_and_fills_the_cache(tmp_path, monkeypatch):
+    import io
+    import sys
+
+    from src import main as cli
+
+    streamed = []
+    iter_parse = CommandParser.iter_parse
+
+    def spy(self, source):
+        streamed.append(source)
+        return iter_parse(self, source)
+
+    monkeypatch.setattr(CommandParser, "iter_parse", spy)
+    out, cache_dir = tmp_path / "out.txt", tmp_path / "cache"
+    argv = ["type_simulator", "--mode", "direct", "--output", str(out)]
+    argv += ["--cache-dir", str(cache_dir), "--speed", "0", "--variance", "0"]
+    for run in range(2):
+        monkeypatch.setattr(sys, "argv", argv)
+        monkeypatch.setattr(sys, "stdin", io.StringIO("ab{REPEAT_2}c{/REPEAT}"))
+        cli.main()
+        assert out.read_text() == "abcc"
+        # The first run streams and compiles the cache entry beside typing;
+        # the second finds the entry and runs it as bytecode
+        assert len(streamed) == 1
+        assert len(list(cache_dir.iterdir())) == 1
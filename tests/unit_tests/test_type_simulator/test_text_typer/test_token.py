@@ -37,9 +37,7 @@ def test_text_token_execute():
     executor = DummyExecutor()
     token = TextToken("Hi")
     token.execute(executor)
-    assert executor.actions[0][0] == "write"
-    assert executor.actions[0][1] == "H"
-    assert executor.actions[1][1] == "i"
+    assert executor.actions == [("write", "Hi", 0)]
 
 
 def test_text_token_newline_handling():
@@ -48,16 +46,12 @@ def test_text_token_newline_handling():
     token = TextToken("Hi\nWorld")
     token.execute(executor)
 
-    # Should have: write 'H', write 'i', press 'enter', write 'W', write 'o', write 'r', write 'l', write 'd'
-    assert len(executor.actions) == 8
-    assert executor.actions[0] == ("write", "H", 0)
-    assert executor.actions[1] == ("write", "i", 0)
-    assert executor.actions[2] == ("press", "enter")
-    assert executor.actions[3] == ("write", "W", 0)
-    assert executor.actions[4] == ("write", "o", 0)
-    assert executor.actions[5] == ("write", "r", 0)
-    assert executor.actions[6] == ("write", "l", 0)
-    assert executor.actions[7] == ("write", "d", 0)
+    # Should have: write 'Hi', press 'enter', write 'World'
+    assert executor.actions == [
+        ("write", "Hi", 0),
+        ("press", "enter"),
+        ("write", "World", 0),
+    ]
 
 
 def test_text_token_curly_braces_with_newline():
@@ -106,3 +100,129 @@ def test_mouse_click_token_execute():
     token = MouseClickToken(button="right", clicks=2, interval=0.1)
     token.execute(executor)
     assert executor.actions[0] == ("click", "right", 2, 0.1)
+
+
+class BatchExecutor(DummyExecutor):
+    def write_batch(self, text, intervals):
+        self.actions.append(("write_batch", text, list(intervals)))
+
+
+def test_text_token_uses_write_batch_with_per_key_intervals():
+    executor = BatchExecutor()
+    executor.typing_speed = 0.1
+    executor.typing_variance = 0.05
+    TextToken("abc\ndef").execute(executor)
+    assert [a[:2] for a in executor.actions] == [
+        ("write_batch", "abc"),
+        ("press", "enter"),
+        ("write_batch", "def"),
+    ]
+    for _, text, intervals in (executor.actions[0], executor.actions[2]):
+        assert len(intervals) == len(text)
+        assert all(0.05 <= d <= 0.15 for d in intervals)
+
+
+def test_text_token_write_without_batch_keeps_per_key_intervals():
+    executor = DummyExecutor()
+    executor.typing_speed = 0.1
+    TextToken("x" * 20).execute(executor)
+    (action,) = executor.actions
+    assert action[:2] == ("write", "x" * 20)
+    assert action[2] == pytest.approx(0.1)
+
+    executor = DummyExecutor()
+    executor.typing_speed = 0.1
+    executor.typing_variance = 0.05
+    TextToken("x" * 200).execute(executor)
+    assert [a[1] for a in executor.actions] == ["x"] * 200
+    intervals = [a[2] for a in executor.actions]
+    assert all(0.05 <= d <= 0.15 for d in intervals)
+    assert len(set(intervals)) > 1
+    assert sum(intervals) / 200 == pytest.approx(0.1, abs=0.02)
+
+
+def test_draw_intervals_clamps_and_matches_speed():
+    from type_simulator.text_typer.token import draw_intervals
+
+    assert draw_intervals(3, 0.2, 0) == [0.2, 0.2, 0.2]
+    delays = draw_intervals(5000, 0.0, 0.1)
+    assert min(delays) == 0.0 and max(delays) <= 0.1
+    assert sum(delays) / len(delays) == pytest.approx(0.025, abs=0.005)
+
+
+def _record_copies(monkeypatch, ok=True):
+    from type_simulator.text_typer import token as token_mod
+
+    copies = []
+
+    def fake_copy(text):
+        copies.append(text)
+        return ok
+
+    monkeypatch.setattr(token_mod, "_copy_to_primary_x11", fake_copy)
+    return copies
+
+
+def test_text_token_pastes_special_run_once(monkeypatch):
+    copies = _record_copies(monkeypatch)
+    executor = DummyExecutor()
+    TextToken("f{();}x").execute(executor)
+    assert copies == ["{();}"]
+    assert executor.actions == [
+        ("write", "f", 0),
+        ("hotkey", ("shift", "insert")),
+        ("write", "x", 0),
+    ]
+
+
+def test_text_token_paste_run_limit(monkeypatch):
+    copies = _record_copies(monkeypatch)
+    executor = DummyExecutor()
+    executor.paste_run_limit = 2
+    TextToken("{();}\n[]").execute(executor)
+    assert copies == ["{(", ");", "}", "[]"]
+    assert executor.actions.count(("hotkey", ("shift", "insert"))) == 4
+
+
+def test_text_token_failed_paste_falls_back_per_character(monkeypatch):
+    from type_simulator.text_typer import token as token_mod
+
+    copies = _record_copies(monkeypatch, ok=False)
+    typed = []
+    monkeypatch.setattr(
+        token_mod.TextToken,
+        "_fallback_type",
+        staticmethod(lambda ch, executor, interval: typed.append(ch)),
+    )
+    TextToken("a<>b").execute(DummyExecutor())
+    assert copies == ["<>"]
+    assert typed == ["<", ">"]
+
+
+def test_text_token_paste_run_spans_short_plain_gaps(monkeypatch):
+    copies = _record_copies(monkeypatch)
+    executor = DummyExecutor()
+    TextToken("x = f(a[i]);\n(abcdefghij)").execute(executor)
+    assert copies == ["(a[i]);", "(", ")"]
+    assert ("write", "abcdefghij", 0) in executor.actions
+
+
+def test_text_token_routes_character_classes(monkeypatch):
+    from type_simulator.text_typer import token as token_mod
+
+    monkeypatch.setattr(token_mod.sys, "platform", "linux")
+    typed = []
+    executor = DummyExecutor()
+    executor.pynput = type("P", (), {"type": lambda self, ch: typed.append(ch)})()
+    executor.routes = {
+        "text": ("keys",),
+        "special": ("paste", "pynput"),
+        "unicode": ("unicode",),
+    }
+    copies = _record_copies(monkeypatch, ok=False)
+    TextToken("ab{}é").execute(executor)
+    assert copies == ["{}"]  # paste tried once, then skipped
+    assert typed == ["{", "}"]
+    assert executor.actions[0] == ("write", "ab", 0)
+    assert ("hotkey", ("ctrl", "shift", "u")) in executor.actions
+    assert ("write", "e9", None) in executor.actions
@@ -0,0 +1,150 @@
+import io
+
+import pytest
+
+from type_simulator.text_typer.__main__ import TextTyper
+from type_simulator.text_typer.virtual import VirtualClock, VirtualDocument
+
+
+def render(script, **kwargs):
+    document = VirtualDocument()
+    TextTyper(
+        script, backend=document, input_backend="keys", **kwargs
+    ).simulate_typing()
+    return document
+
+
+def test_editing_keys():
+    doc = render(
+        "helo{<left>}l{<end>} world{<backspace>}D\n"
+        "second{<up>}{<home>}> {<ctrl>+<end>}!{<ctrl>+<home>}{<del>}",
+        typing_speed=0,
+        typing_variance=0,
+    )
+    assert doc.text == " hello worlD\nsecond!"
+
+
+def test_select_all_replace_and_clipboard():
+    doc = render(
+        "draft{<ctrl>+a}{<ctrl>+c}final {<ctrl>+v}"
+        "{<ctrl>+a}{<ctrl>+x}x{<shift>+<insert>}",
+        typing_speed=0,
+        typing_variance=0,
+    )
+    assert doc.text == "xfinal draft"
+
+
+def test_shift_combinations():
+    doc = render("x{<shift>+a}", typing_speed=0, typing_variance=0)
+    assert doc.text == "xA"
+    for key in ("1", "[", "/"):
+        doc.hotkey("shift", key)
+    doc.write("ab")
+    doc.hotkey("shift", "left")  # no selection: a plain move
+    doc.hotkey("shift", "enter")
+    assert doc.text == "xA!{?a\nb"
+
+
+def test_up_down_keep_column():
+    doc = VirtualDocument("abcdef\nxy\nlonger line")
+    doc.press("up")  # from the end of line 3 (col 11) to the end of "xy"
+    doc.write("!")
+    doc.press("up")
+    doc.write("^")
+    doc.press("down")
+    doc.press("down")
+    doc.write("v")
+    assert doc.text == "abc^def\nxy!\nlonvger line"
+
+
+def test_repeat_random_unicode_and_virtual_clock():
+    doc = render(
+        "{REPEAT_3}ab{/REPEAT}{RANDOM_4}{WAIT_3600}é",
+        typing_speed=0.1,
+        typing_variance=0,
+    )
+    assert doc.text.startswith("ababab") and doc.text.endswith("é")
+    assert len(doc.text) == 11
+    # 11 keys at 0.1s plus an hour, with no real sleeping
+    assert abs(doc.clock.elapsed - 3601.1) < 1e-6
+
+
+def test_unicode_hex_entry():
+    doc = VirtualDocument()
+    doc.hotkey("ctrl", "shift", "u")
+    doc.write("e9")
+    doc.press("space")
+    assert doc.text == "é"
+
+
+def test_clock_advances_exactly():
+    clock = VirtualClock()
+    clock.sleep(0.1)
+    clock.sleep(-1)
+    assert clock.monotonic_ns() == 100_000_000
+
+
+class Sink(io.StringIO):
+    """In-memory stand-in for AtomicWriter."""
+
+    def chunks(self):
+        self.seek(0)
+        for line in self:
+            yield line
+
+    def discard(self):
+        self.seek(0)
+        self.truncate()
+
+
+def test_streams_to_sink_with_bounded_buffer():
+    sink = Sink()
+    document = VirtualDocument(sink=sink, window=8)
+    TextTyper(
+        "{REPEAT_50}abc\n{/REPEAT}x{<backspace>}{<up>}{<end>}!",
+        backend=document,
+        input_backend="keys",
+        typing_speed=0,
+        typing_variance=0,
+    ).simulate_typing()
+    assert len(document._left) + len(document._right) < 2 * document.window
+    with pytest.raises(RuntimeError):
+        document.text
+    document.close()
+    assert sink.getvalue() == "abc\n" * 49 + "abc!\n"
+
+    document.hotkey("ctrl", "a")
+    document.write("fresh")
+    document.close()
+    assert sink.getvalue() == "fresh"
+
+
+def test_cursor_into_streamed_text_reads_it_back():
+    sink = Sink()
+    document = VirtualDocument(sink=sink, window=2)
+    document.write("0123456789\nab")
+    assert document.streamed
+    document.press("up")  # the line start lies in written-out text
+    document.write("^")
+    for _ in range(2):  # "^" and "1"
+        document.press("backspace")
+    document.hotkey("ctrl", "home")
+    document.write(">")
+    document.close()
+    assert sink.getvalue() == ">023456789\nab"
+
+
+def test_copy_of_streamed_document_stays_out_of_memory(monkeypatch):
+    sink = Sink()
+    document = VirtualDocument(sink=sink, window=4)
+    document.write("0123456789" * 3)
+    monkeypatch.setattr(Sink, "getvalue", None)  # no full read-back
+    document.hotkey("ctrl", "a")
+    document.hotkey("ctrl", "x")
+    assert document.streamed == 0 and not document._left
+    document.write(">")
+    document.hotkey("ctrl", "v")
+    document.hotkey("shift", "insert")
+    monkeypatch.undo()
+    document.close()
+    assert sink.getvalue() == ">" + "0123456789" * 6
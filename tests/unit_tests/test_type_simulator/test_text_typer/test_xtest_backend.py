@@ -0,0 +1,125 @@
+from types import SimpleNamespace
+
+import pytest
+from Xlib import X
+from Xlib.ext import xtest
+
+from type_simulator.text_typer.xtest_backend import XTestBackend, char_to_keysym
+
+# keycode -> (unshifted, shifted) keysyms
+KEYMAP = {
+    10: (ord("a"), ord("A")),
+    11: (ord("1"), ord("!")),
+    12: (0xFF0D, 0),  # Return
+    13: (0xFFE1, 0),  # Shift_L
+    14: (0xFFE3, 0),  # Control_L
+    15: (ord("c"), ord("C")),
+    16: (0, 0),  # unused, becomes the spare keycode
+}
+
+
+class FakeDisplay:
+    def __init__(self):
+        self.display = SimpleNamespace(
+            info=SimpleNamespace(min_keycode=10, max_keycode=16)
+        )
+        self.flushes = 0
+        self.remapped = []
+
+    def has_extension(self, name):
+        return name == "XTEST"
+
+    def get_keyboard_mapping(self, first, count):
+        return [list(KEYMAP[code]) for code in range(first, first + count)]
+
+    def change_keyboard_mapping(self, first, keysyms):
+        self.remapped.append((first, keysyms))
+
+    def sync(self):
+        pass
+
+    def flush(self):
+        self.flushes += 1
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    events = []
+
+    def fake_input(display, event_type, detail=0, x=0, y=0):
+        events.append((event_type, detail) if detail else (event_type, x, y))
+
+    monkeypatch.setattr(xtest, "fake_input", fake_input)
+    return events
+
+
+def test_write_uses_keycode_table_and_shift(recorded):
+    display = FakeDisplay()
+    backend = XTestBackend(display)
+    backend.write("aA!")
+    assert recorded == [
+        (X.KeyPress, 10),
+        (X.KeyRelease, 10),
+        (X.KeyPress, 13),
+        (X.KeyPress, 10),
+        (X.KeyRelease, 10),
+        (X.KeyRelease, 13),
+        (X.KeyPress, 13),
+        (X.KeyPress, 11),
+        (X.KeyRelease, 11),
+        (X.KeyRelease, 13),
+    ]
+    assert display.flushes == 1  # no delays: one flush for the whole run
+
+
+def test_flush_batches_and_delays(recorded, monkeypatch):
+    import time
+
+    sleeps = []
+    monkeypatch.setattr(time, "sleep", sleeps.append)
+    display = FakeDisplay()
+    backend = XTestBackend(display, flush_every=4)
+    backend.write("a" * 5)
+    assert display.flushes == 3  # after 4 and 8 events, then the rest
+    backend.write_batch("aa", [0.01, 0.0])
+    assert sleeps == [0.01]
+
+
+def test_hotkey_press_and_unmapped_characters(recorded):
+    display = FakeDisplay()
+    backend = XTestBackend(display)
+    backend.hotkey("ctrl", "c")
+    assert recorded == [
+        (X.KeyPress, 14),
+        (X.KeyPress, 15),
+        (X.KeyRelease, 15),
+        (X.KeyRelease, 14),
+    ]
+    recorded.clear()
+    backend.press("enter")
+    assert recorded == [(X.KeyPress, 12), (X.KeyRelease, 12)]
+    recorded.clear()
+    backend.write("éé")
+    # bound to the spare keycode once, then reused
+    assert display.remapped == [(16, [(char_to_keysym("é"),) * 2])]
+    assert recorded[0] == (X.KeyPress, 16)
+    with pytest.raises(ValueError):
+        backend.press("no-such-key")
+    backend.close()
+    assert display.remapped[-1] == (16, [(0, 0)])
+
+
+def test_mouse(recorded):
+    backend = XTestBackend(FakeDisplay())
+    backend.moveTo(5, 7)
+    backend.click(button="right", clicks=2)
+    assert recorded == [
+        (X.MotionNotify, 5, 7),
+        (X.ButtonPress, 3),
+        (X.ButtonRelease, 3),
+        (X.ButtonPress, 3),
+        (X.ButtonRelease, 3),
+    ]
@@ -64,3 +64,91 @@ def test_type_simulator_text_priority():
                 simulator = TypeSimulator(text=tf.name)
                 assert simulator.text == "from stdin"
         os.unlink(tf.name)
+
+
+def test_type_simulator_direct_mode_builds_no_typer():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sim = TypeSimulator(Path(tmpdir) / "out.txt", "abc", mode=Mode.DIRECT)
+        sim.run()
+        assert sim._texter is None  # no keyboard backend needed
+
+
+def test_type_simulator_direct_mode_applies_macros():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file_path = Path(tmpdir) / "out.txt"
+        text = "teh{<backspace>}{<backspace>}he{REPEAT_2}!{/REPEAT}{WAIT_60}"
+        TypeSimulator(file_path, text, mode=Mode.DIRECT).run()
+        assert FileManager(file_path).load_text() == "the!!"
+
+
+def _editor(script, tmpdir):
+    import subprocess
+
+    return subprocess.Popen(["sh", "-c", script], cwd=tmpdir)
+
+
+def test_await_editor_returns_when_saved_file_editor_exits(monkeypatch):
+    from type_simulator import type_simulator
+
+    # Writes keep resetting the short watchdog until the editor exits
+    monkeypatch.setattr(type_simulator, "IDLE_TIMEOUT", 0.3)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sim = TypeSimulator(Path(tmpdir) / "out.txt", "x", mode=Mode.DIRECT)
+        watch = sim._watch_output()
+        proc = _editor(
+            "for i in 1 2 3 4 5; do sleep 0.1; echo $i >> .out.txt.swp; done;"
+            " echo done > out.txt",
+            tmpdir,
+        )
+        sim._await_editor(proc, watch)
+        watch.close()
+        assert proc.returncode == 0
+        assert (Path(tmpdir) / "out.txt").read_text() == "done\n"
+
+
+def test_await_editor_gives_up_on_editor_that_saves_but_stays(monkeypatch):
+    import time
+    from type_simulator import type_simulator
+
+    monkeypatch.setattr(type_simulator, "EXIT_GRACE", 0.1)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sim = TypeSimulator(Path(tmpdir) / "out.txt", "x", mode=Mode.DIRECT)
+        watch = sim._watch_output()
+        proc = _editor("echo saved > out.txt; sleep 30", tmpdir)
+        start = time.monotonic()
+        sim._await_editor(proc, watch)
+        watch.close()
+        assert proc.poll() is None and time.monotonic() - start < 5
+        proc.kill()
+        proc.wait()
+
+
+class _FakeTexter:
+    def __init__(self, compiled):
+        self.compiled = compiled
+        self.calls = []
+
+    def estimate(self):
+        self.calls.append("estimate")
+        return "est"
+
+    def simulate_typing(self):
+        self.calls.append("type")
+
+
+def test_streamed_script_is_not_estimated_before_typing():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sim = TypeSimulator(Path(tmpdir) / "out.txt", "abc", mode=Mode.TERMINAL)
+        sim.texter = _FakeTexter(compiled=False)
+        sim._type_content()
+        assert sim.texter.calls == ["type"] and sim.estimate is None
+        # ... but still on demand, e.g. for the exit-wait fallback
+        assert sim._estimate() == "est"
+
+        sim = TypeSimulator(Path(tmpdir) / "out.txt", "abc", mode=Mode.TERMINAL)
+        sim.texter = _FakeTexter(compiled=True)
+        with mock.patch(
+            "type_simulator.type_simulator.format_estimate", return_value=""
+        ):
+            sim._type_content()
+        assert sim.texter.calls == ["estimate", "type"]
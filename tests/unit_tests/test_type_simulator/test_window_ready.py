@@ -0,0 +1,149 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+from Xlib import X, Xatom
+
+from type_simulator.window_ready import (
+    DEFAULT_RULE,
+    ReadinessRule,
+    WindowWatcher,
+    rule_for,
+)
+
+PID, NET_NAME, UTF8 = 900, 901, 902
+
+
+class FakeWindow:
+    def __init__(self, display, wid, pid=None, title="", mapped=False):
+        self.display, self.id = display, wid
+        self.pid, self.title, self.mapped = pid, title, mapped
+        self.masks = 0
+
+    def change_attributes(self, event_mask):
+        self.masks = event_mask
+
+    def get_attributes(self):
+        state = X.IsViewable if self.mapped else X.IsUnmapped
+        return SimpleNamespace(map_state=state)
+
+    def get_full_property(self, atom, kind):
+        if atom == PID and self.pid is not None:
+            return SimpleNamespace(value=[self.pid])
+        if atom in (NET_NAME, Xatom.WM_NAME) and self.title:
+            return SimpleNamespace(value=self.title.encode())
+        return None
+
+    def set_input_focus(self, revert, when, onerror=None):
+        if not self.mapped:
+            onerror("BadMatch")
+        else:
+            self.display.focus = self
+
+    def query_tree(self):
+        return SimpleNamespace(children=self.display.existing)
+
+
+class FakeDisplay:
+    """Replays scripted events; ``(event, effect)`` runs effect on delivery."""
+
+    def __init__(self, existing=(), script=()):
+        self.root = FakeWindow(self, 1, mapped=True)
+        self.existing = list(existing)
+        self.script = list(script)
+        self.focus = self.root
+        self._r, self._w = os.pipe()
+
+    def screen(self):
+        return SimpleNamespace(root=self.root)
+
+    def intern_atom(self, name):
+        return {"_NET_WM_PID": PID, "_NET_WM_NAME": NET_NAME, "UTF8_STRING": UTF8}[
+            name
+        ]
+
+    def sync(self):
+        pass
+
+    def fileno(self):
+        return self._r
+
+    def pending_events(self):
+        return len(self.script)
+
+    def next_event(self):
+        event, effect = self.script.pop(0)
+        if effect is not None:
+            effect()
+        return event
+
+    def get_input_focus(self):
+        return SimpleNamespace(focus=self.focus)
+
+    def close(self):
+        os.close(self._r)
+        os.close(self._w)
+
+
+def created(d, window):
+    return SimpleNamespace(type=X.CreateNotify, window=window, parent=d.root), None
+
+
+def mapped(window):
+    def effect():
+        window.mapped = True
+
+    return SimpleNamespace(type=X.MapNotify, window=window), effect
+
+
+def retitled(window, title):
+    def effect():
+        window.title = title
+
+    return SimpleNamespace(type=X.PropertyNotify, window=window), effect
+
+
+def test_waits_for_the_window_of_the_pid_to_map_and_take_focus():
+    d = FakeDisplay()
+    other = FakeWindow(d, 10, pid=1)
+    editor = FakeWindow(d, 11, pid=42)
+    d.script = [created(d, other), created(d, editor), mapped(other), mapped(editor)]
+    watcher = WindowWatcher(d)
+    window = watcher.wait_ready(pid=42, timeout=1)
+    assert window.window_id == 11
+    assert d.focus is editor
+    assert editor.masks & X.PropertyChangeMask
+    watcher.close()
+
+
+def test_matches_by_title_and_waits_for_the_rule_title():
+    d = FakeDisplay()
+    term = FakeWindow(d, 12, title="vi")
+    d.script = [
+        created(d, term),
+        mapped(term),
+        retitled(term, "vi out.txt"),
+        retitled(term, "out.txt (/tmp) - VIM"),
+    ]
+    watcher = WindowWatcher(d)
+    window = watcher.wait_ready(name="out.txt", rule=rule_for("xterm -e vim"))
+    assert window.title == "out.txt (/tmp) - VIM" and window.title_matched
+    watcher.close()
+
+
+def test_missing_title_is_tolerated_but_missing_window_times_out():
+    d = FakeDisplay(existing=[FakeWindow(None, 13, pid=7, mapped=True)])
+    d.existing[0].display = d
+    watcher = WindowWatcher(d)
+    rule = ReadinessRule(title="*never*", title_wait=0.01)
+    window = watcher.wait_ready(pid=7, rule=rule, timeout=1)
+    assert window.window_id == 13 and not window.title_matched
+    with pytest.raises(TimeoutError, match="mapped"):
+        watcher.wait_ready(pid=8, timeout=0.01)
+    watcher.close()
+
+
+def test_rule_for_editor_commands():
+    assert rule_for('xterm -fa "Monospace" -e vi').title == "*{name}*"
+    assert rule_for("gedit") is not DEFAULT_RULE
+    assert rule_for("xterm -e nano") is DEFAULT_RULE
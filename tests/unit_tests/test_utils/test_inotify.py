@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+from utils.inotify import (
+    IN_CLOSE_WRITE,
+    IN_CREATE,
+    IN_MOVED_TO,
+    Inotify,
+    PathWatch,
+    available,
+)
+
+pytestmark = pytest.mark.skipif(not available(), reason="inotify not available")
+
+
+def test_inotify_reports_created_and_written_files(tmp_path):
+    with Inotify() as ino:
+        ino.add_watch(tmp_path, IN_CREATE | IN_CLOSE_WRITE)
+        assert ino.read(0) == []
+        (tmp_path / "a.txt").write_text("hi")
+        events = ino.read(1)
+    assert [(e.name, e.mask) for e in events] == [
+        ("a.txt", IN_CREATE),
+        ("a.txt", IN_CLOSE_WRITE),
+    ]
+    assert events[1].saves and not events[0].saves
+
+
+def test_path_watch_sees_rename_saves_and_ignores_other_files(tmp_path):
+    target = tmp_path / "out.txt"
+    with PathWatch(target) as watch:
+        (tmp_path / "other.txt").write_text("x")
+        (tmp_path / ".out.txt.swp").write_text("swap")
+        (tmp_path / "tmp").write_text("new")
+        os.replace(tmp_path / "tmp", target)
+        events = watch.read(1)
+    assert {e.name for e in events} == {".out.txt.swp", "out.txt"}
+    saves = [e for e in events if e.saves and watch.is_target(e)]
+    assert [e.mask for e in saves] == [IN_MOVED_TO]
+
+
+def test_add_watch_on_missing_path_raises(tmp_path):
+    with Inotify() as ino:
+        with pytest.raises(FileNotFoundError):
+            ino.add_watch(tmp_path / "missing", IN_CREATE)
@@ -12,6 +12,7 @@ from utils.text_input import (
     FileSizeError,
     MAX_FILE_SIZE,
     MAX_STDIN_SIZE,
+    read_file,
 )
 
 
@@ -108,6 +109,16 @@ def test_get_text_content_file_various_encodings():
             Path(tf.name).unlink()
 
 
+def test_read_file_strips_bom_and_enforces_size(tmp_path):
+    path = tmp_path / "bom.txt"
+    path.write_bytes("\ufeffhello".encode("utf-8"))
+    assert read_file(path) == "hello"
+    with pytest.raises(FileSizeError):
+        read_file(path, max_size=2)
+    with pytest.raises(FileReadError):
+        read_file(tmp_path / "missing.txt")
+
+
 def test_get_text_content_literal():
     assert get_text_content("literal text") == "literal text"
 
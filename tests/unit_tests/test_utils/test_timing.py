@@ -0,0 +1,31 @@
+import time
+
+from utils.timing import TimingReport, _process_age
+
+
+def test_phases_accumulate_and_milestones_keep_first():
+    report = TimingReport(start=time.perf_counter())
+    with report.phase("parse"):
+        time.sleep(0.01)
+    with report.phase("parse"):
+        pass
+    report.milestone("first keystroke")
+    first = report.milestones["first keystroke"]
+    report.milestone("first keystroke")
+    assert report.phases["parse"] >= 0.01
+    assert report.milestones["first keystroke"] == first
+    summary = report.summary()
+    assert "parse:" in summary and "first keystroke at:" in summary
+
+
+def test_process_age_is_plausible():
+    age = _process_age()
+    assert age is None or 0 <= age < 24 * 3600
+
+
+def test_record_adds_measured_durations():
+    report = TimingReport(start=time.perf_counter())
+    report.record("editor ready", 0.25)
+    report.record("editor ready", 0.25)
+    assert report.phases["editor ready"] == 0.5
+    assert "editor ready:" in report.summary()